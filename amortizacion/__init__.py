@@ -0,0 +1,48 @@
+"""
+Motor de amortización vectorizado del proyecto de Ingeniería Financiera
+"""
+
+from .abonos import columnas_con_abonos, tabla_con_abonos, vector_abonos
+from .cargos import CargoFijo, ImpuestoInteres, SeguroSaldo, aplicar_cargos
+from .credito import Credito
+from .escenarios import ConjuntoEscenarios
+from .exportacion import reporte_csv, reporte_excel, tabla_csv, tabla_excel
+from .extractos import escribir_extractos, extractos
+from .fechas import CalendarioPagos, cargar_festivos
+from .indice_abonos import IndiceAbonos
+from .kernel import NUMBA_DISPONIBLE, recurrencia_abonos, recurrencia_eventos
+from .monedas import CurvaIndice, cargar_curvas, tabla_en_moneda_local
+from .mora import COLUMNAS_MORA, resumen_mora, simular_mora, tabla_mora
+from .motor import COLUMNAS, SISTEMAS, MotorAmortizacion, a_centavos, cuota_fija
+from .paralelo import MotorParalelo, generar_paralelo
+from .portafolio import proyectar_portafolio
+from .refinanciacion import AnalizadorRefinanciacion, grilla_ofertas
+from .resumen import ResumenComparacion, ResumenTabla
+from .sensibilidad import superficie_sensibilidad
+from .sesiones import cargar_sesion, guardar_sesion
+from .tasas import (
+    FRECUENCIAS, FRECUENCIAS_EQUIVALENTES, conversion_completa, conversion_tasa, tabla_equivalencias,
+    tasa_periodo
+)
+from .trabajos import ColaTrabajos, TrabajoCancelado
+from .validacion import ValidadorLotes
+
+__all__ = [
+    'columnas_con_abonos', 'tabla_con_abonos', 'vector_abonos', 'IndiceAbonos',
+    'NUMBA_DISPONIBLE', 'recurrencia_abonos', 'recurrencia_eventos',
+    'CargoFijo', 'ImpuestoInteres', 'SeguroSaldo', 'aplicar_cargos',
+    'Credito', 'ConjuntoEscenarios',
+    'reporte_csv', 'reporte_excel', 'tabla_csv', 'tabla_excel',
+    'escribir_extractos', 'extractos',
+    'CalendarioPagos', 'cargar_festivos',
+    'CurvaIndice', 'cargar_curvas', 'tabla_en_moneda_local',
+    'COLUMNAS_MORA', 'resumen_mora', 'simular_mora', 'tabla_mora',
+    'COLUMNAS', 'SISTEMAS', 'MotorAmortizacion', 'a_centavos', 'cuota_fija',
+    'MotorParalelo', 'generar_paralelo',
+    'proyectar_portafolio', 'AnalizadorRefinanciacion', 'grilla_ofertas',
+    'ResumenComparacion', 'ResumenTabla',
+    'superficie_sensibilidad', 'cargar_sesion', 'guardar_sesion',
+    'FRECUENCIAS', 'FRECUENCIAS_EQUIVALENTES', 'conversion_completa', 'conversion_tasa',
+    'tabla_equivalencias', 'tasa_periodo', 'ColaTrabajos', 'TrabajoCancelado',
+    'ValidadorLotes',
+]
@@ -0,0 +1,9 @@
+"""
+Permite ejecutar la línea de comandos con python -m amortizacion
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Tablas con abonos extras para lotes de créditos
+La recurrencia del saldo depende de la trayectoria (un abono puede acortar el
+plazo); la recorre el kernel de `kernel.py`, compilado con Numba si está
+disponible o período a período sobre todo el lote con NumPy
+"""
+
+import numpy as np
+import pandas as pd
+
+from .indice_abonos import IndiceAbonos
+from .kernel import recurrencia_abonos
+from .motor import COLUMNAS, COLUMNAS_MONTO, cuota_fija
+
+
+def vector_abonos(abonos_programados, abonos_adhoc, num_pagos):
+    """
+    Abono extra de cada período (posición 0 = período 1) para un crédito
+
+    Usa las mismas estructuras que ManejoAbonos: programados con
+    'periodo_inicio', 'monto' y 'frecuencia'; ad-hoc con 'periodo' y 'monto'.
+    """
+    return IndiceAbonos(abonos_programados, abonos_adhoc, num_pagos).por_periodo.copy()
+
+
+def columnas_con_abonos(monto, tasa_periodo, num_pagos, abonos, cuota=None, usar_numba=None,
+                        pago_interes=None):
+    """
+    Columnas de la tabla con abonos extras para un lote
+
+    La regla de pago se mantiene y los abonos reducen el plazo: el abono de
+    cada período se aplica después de la cuota, limitado al saldo restante, y
+    la última cuota se limita al saldo más intereses. Por defecto la regla es
+    la del sistema francés; los demás sistemas y la gracia pasan la regla de
+    cada período de MotorAmortizacion.plan_pagos (ver kernel.py).
+
+    Args:
+        monto, num_pagos: arreglos de longitud L
+        tasa_periodo: tasa de cada crédito (L) o de cada período (L, N)
+        abonos: matriz (L, N) de abonos por período
+        cuota: parte fija de la cuota por crédito o por período (por defecto
+            la cuota del sistema francés)
+        usar_numba: fuerza el kernel compilado o el de NumPy (por defecto,
+            Numba si está instalado y, si no, la forma por eventos en lotes
+            pequeños del sistema francés; ver recurrencia_abonos)
+        pago_interes: matriz (L, N) con la fracción del interés que se suma a
+            la cuota de cada período (None en el sistema francés)
+
+    Returns:
+        (columnas, periodos): dict de matrices (L, N) redondeadas a 2
+        decimales y el número de períodos efectivos de cada crédito
+    """
+    monto = np.atleast_1d(np.asarray(monto, dtype=float))
+    tasa = np.atleast_1d(np.asarray(tasa_periodo, dtype=float))
+    num_pagos = np.atleast_1d(np.asarray(num_pagos, dtype=np.int64))
+    abonos = np.atleast_2d(np.asarray(abonos, dtype=float))
+    if cuota is None:
+        cuota = cuota_fija(monto, tasa, num_pagos)
+    cuota = np.atleast_1d(np.asarray(cuota, dtype=float))
+
+    columnas, periodos = recurrencia_abonos(monto, tasa, num_pagos, abonos, cuota, usar_numba,
+                                            pago_interes)
+    return {nombre: np.round(valor, 2) for nombre, valor in zip(COLUMNAS_MONTO, columnas)}, periodos
+
+
+def tabla_con_abonos(monto, tasa_periodo, num_pagos, abonos, cuota=None, pago_interes=None):
+    """
+    Tabla de un crédito con abonos, con el esquema estándar de columnas
+
+    `abonos` es un IndiceAbonos o un vector denso por período; `tasa_periodo`
+    y `cuota` pueden ser valores únicos o vectores por período y
+    `pago_interes` un vector por período (ver columnas_con_abonos). La tabla
+    termina en el período de cancelación; la columna 'Fecha' queda vacía
+    para que la complete el calendario de pagos.
+    """
+    if isinstance(abonos, IndiceAbonos):
+        abonos = abonos.por_periodo
+    tasa_periodo, cuota = (valor if valor is None or np.ndim(valor) == 0 else np.atleast_2d(valor)
+                           for valor in (tasa_periodo, cuota))
+    if pago_interes is not None:
+        pago_interes = np.atleast_2d(pago_interes)
+    columnas, periodos = columnas_con_abonos(monto, tasa_periodo, num_pagos,
+                                             np.atleast_2d(abonos), cuota, pago_interes=pago_interes)
+    n = int(periodos[0])
+    datos = {'Período': np.arange(1, n + 1), 'Fecha': pd.Series([None] * n, dtype=object)}
+    for nombre in COLUMNAS_MONTO:
+        datos[nombre] = columnas[nombre][0, :n]
+    return pd.DataFrame(datos, columns=COLUMNAS)
@@ -0,0 +1,159 @@
+"""
+Capas de cargos por período: comisiones, seguros e impuestos
+Cada capa se calcula como una operación de arreglos sobre las columnas
+Saldo_Inicial e Interés de la tabla y se agrega como una columna adicional
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+COLUMNA_TOTAL = 'Total_Cargos'
+
+
+class CapaCargo(ABC):
+    """
+    Capa base de cargos; las subclases implementan `calcular`
+
+    Los parámetros pueden ser escalares o arreglos con un valor por crédito;
+    en tablas de formato largo se asignan a cada fila según la columna
+    'Crédito'.
+    """
+
+    nombre = 'Cargo'
+
+    def __init__(self, valor, nombre=None):
+        """
+        Inicializa la capa con su parámetro y el nombre de la columna
+        """
+        self.valor = np.asarray(valor, dtype=float)
+        if nombre:
+            self.nombre = nombre
+
+    def _valor_por_fila(self, creditos):
+        """
+        Expande el parámetro a un valor por fila de la tabla
+        """
+        if self.valor.ndim == 0 or creditos is None:
+            return self.valor
+        return self.valor[creditos]
+
+    @abstractmethod
+    def calcular(self, saldo_inicial, interes, creditos=None):
+        """
+        Cargo de cada período a partir del saldo inicial y el interés
+        """
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.valor!r}, nombre={self.nombre!r})"
+
+
+class CargoFijo(CapaCargo):
+    """
+    Comisión fija por cada período con pago
+    """
+
+    nombre = 'Comisión'
+
+    def calcular(self, saldo_inicial, interes, creditos=None):
+        return np.broadcast_to(self._valor_por_fila(creditos), np.shape(saldo_inicial))
+
+
+class SeguroSaldo(CapaCargo):
+    """
+    Seguro proporcional al saldo al inicio del período (tasa por período)
+    """
+
+    nombre = 'Seguro'
+
+    def calcular(self, saldo_inicial, interes, creditos=None):
+        return saldo_inicial * self._valor_por_fila(creditos)
+
+
+class ImpuestoInteres(CapaCargo):
+    """
+    Impuesto sobre los intereses del período
+    """
+
+    nombre = 'Impuesto'
+
+    def calcular(self, saldo_inicial, interes, creditos=None):
+        return interes * self._valor_por_fila(creditos)
+
+
+def calcular_cargos(saldo_inicial, interes, capas, creditos=None, num_pagos=None):
+    """
+    Calcula todas las capas sobre arreglos (1-D por fila o matrices del motor)
+
+    Con matrices (créditos × períodos) `num_pagos` es obligatorio: los
+    períodos de relleno posteriores al último pago quedan sin cargos (una
+    comisión fija, por ejemplo, no se cobra donde no hay cuota). Cada capa es
+    una columna, así que sus nombres deben ser distintos (use `nombre` al
+    crear dos capas del mismo tipo). Retorna un dict {nombre de columna:
+    arreglo redondeado a 2 decimales} que incluye la columna 'Total_Cargos'.
+    """
+    nombres = [capa.nombre for capa in capas]
+    repetidos = sorted({nombre for nombre in nombres if nombres.count(nombre) > 1})
+    if repetidos or COLUMNA_TOTAL in nombres:
+        raise ValueError(f"Nombres de capa repetidos o reservados: {repetidos or [COLUMNA_TOTAL]}; "
+                         "asigne un nombre distinto a cada capa")
+
+    saldo_inicial = np.asarray(saldo_inicial, dtype=float)
+    interes = np.asarray(interes, dtype=float)
+
+    mascara = True
+    if saldo_inicial.ndim == 2:
+        if num_pagos is None:
+            raise ValueError("Con matrices del motor indique num_pagos por crédito")
+        periodos = np.arange(1, saldo_inicial.shape[1] + 1)
+        mascara = periodos[None, :] <= np.asarray(num_pagos)[:, None]
+        if creditos is None:
+            # Los parámetros por crédito se aplican a cada fila de la matriz
+            creditos = np.arange(len(saldo_inicial))[:, None]
+
+    cargos = {}
+    for capa in capas:
+        cargo = capa.calcular(saldo_inicial, interes, creditos)
+        cargos[capa.nombre] = np.round(np.where(mascara, cargo, 0.0), 2)
+    cargos[COLUMNA_TOTAL] = np.round(sum(cargos.values(), np.zeros_like(saldo_inicial)), 2)
+    return cargos
+
+
+def aplicar_cargos(tabla, capas):
+    """
+    Agrega las columnas de cargos a una tabla (o lote en formato largo)
+
+    Los cargos no modifican la Cuota ni el saldo: son pagos adicionales que
+    acompañan a cada cuota. Sin capas la tabla se retorna sin cambios.
+    """
+    if not capas or tabla is None:
+        return tabla
+
+    creditos = tabla['Crédito'].to_numpy() if 'Crédito' in tabla.columns else None
+    cargos = calcular_cargos(tabla['Saldo_Inicial'].to_numpy(),
+                             tabla['Interés'].to_numpy(), capas, creditos)
+
+    resultado = tabla.copy()
+    for nombre, valores in cargos.items():
+        resultado[nombre] = valores
+    return resultado
+
+
+def columnas_cargos(tabla):
+    """
+    Nombres de las columnas de cargos presentes en una tabla
+    """
+    if tabla is None or COLUMNA_TOTAL not in tabla.columns:
+        return []
+    inicio = tabla.columns.get_loc('Saldo_Final') + 1
+    return list(tabla.columns[inicio:tabla.columns.get_loc(COLUMNA_TOTAL) + 1])
+
+
+def total_cargos(tabla):
+    """
+    Suma de todos los cargos de una tabla (cero si no tiene cargos)
+    """
+    if tabla is None or COLUMNA_TOTAL not in tabla.columns:
+        return 0.0
+    return float(pd.to_numeric(tabla[COLUMNA_TOTAL]).sum())
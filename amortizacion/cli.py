@@ -0,0 +1,245 @@
+"""
+Línea de comandos del paquete amortizacion
+Genera tablas y reportes, convierte tasas y proyecta portafolios sin
+Streamlit:
+
+    amortizacion tabla --monto 100000000 --tasa 12 --pagos 60 --abono 12:5000000
+    amortizacion tasa --tasa 24 --tipo Nominal --frecuencia Mensual --salida-tipo Efectiva
+    amortizacion portafolio creditos.csv --agrupacion mes --salida flujos.csv
+    amortizacion extractos creditos.csv --fecha-corte 2025-06-30 --salida extractos.parquet
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+from .credito import Credito
+from .exportacion import reporte_csv, reporte_excel, tabla_csv, tabla_excel
+from .extractos import escribir_extractos, extractos
+from .fechas import BASES_DIAS
+from .monedas import MONEDA_LOCAL, cargar_curvas
+from .motor import SISTEMAS
+from .portafolio import AGRUPACIONES, proyectar_portafolio
+from .tasas import FRECUENCIAS, conversion_completa
+
+TIPOS_TASA = ("Efectiva", "Nominal")
+MODALIDADES = ("Vencida", "Anticipada")
+
+
+def _abono_programado(texto):
+    """
+    'inicio:monto:cada' → abono programado
+    """
+    try:
+        inicio, monto, frecuencia = texto.split(':')
+        return {'periodo_inicio': int(inicio), 'monto': float(monto), 'frecuencia': int(frecuencia)}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Abono programado inválido '{texto}'; use inicio:monto:cada")
+
+
+def _abono_adhoc(texto):
+    """
+    'periodo:monto' → abono ad-hoc
+    """
+    try:
+        periodo, monto = texto.split(':')
+        return {'periodo': int(periodo), 'monto': float(monto)}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Abono inválido '{texto}'; use periodo:monto")
+
+
+def _escribir(contenido, salida):
+    """
+    Escribe texto o bytes en `salida`; sin salida, el texto va a stdout
+    """
+    if salida is None:
+        if isinstance(contenido, bytes):
+            raise SystemExit("Los archivos Excel requieren --salida")
+        sys.stdout.write(contenido)
+        return
+    modo = 'wb' if isinstance(contenido, bytes) else 'w'
+    with open(salida, modo, **({} if modo == 'wb' else {'encoding': 'utf-8', 'newline': ''})) as archivo:
+        archivo.write(contenido)
+
+
+def _es_excel(salida):
+    return salida is not None and salida.lower().endswith('.xlsx')
+
+
+def comando_tabla(args):
+    """
+    Tabla básica o con abonos de un crédito, o el reporte completo
+    """
+    credito = Credito({
+        'monto': args.monto,
+        'tasa_anual_original': args.tasa,
+        'tipo_tasa': args.tipo,
+        'modalidad': args.modalidad,
+        'frecuencia': FRECUENCIAS[args.frecuencia],
+        'frecuencia_texto': args.frecuencia,
+        'num_pagos': args.pagos,
+        'fecha_inicio': args.fecha_inicio,
+        'sistema': args.sistema,
+        'periodos_gracia': args.gracia,
+        'tipo_gracia': args.tipo_gracia,
+        'comision': args.comision,
+        'seguro': args.seguro,
+        'impuesto': args.impuesto,
+        'unidad': args.unidad,
+        'base_dias': args.base_dias,
+    }, curvas=cargar_curvas(args.curvas), festivos=args.festivos)
+
+    indice = credito.indice_abonos(args.abono_programado, args.abono)
+    tabla_basica = credito.tabla_basica()
+    tabla_abonos = credito.tabla_con_abonos(indice) if len(indice) else None
+
+    if args.reporte:
+        if _es_excel(args.salida):
+            contenido = reporte_excel(credito.datos, tabla_basica, tabla_abonos, indice_abonos=indice)
+        else:
+            contenido = reporte_csv(credito.datos, tabla_basica, tabla_abonos)
+    else:
+        tabla = tabla_abonos if tabla_abonos is not None else tabla_basica
+        if _es_excel(args.salida):
+            nombre_hoja = 'Tabla_con_Abonos' if tabla_abonos is not None else 'Tabla_Basica'
+            contenido = tabla_excel(tabla, nombre_hoja, credito.datos)
+        else:
+            contenido = tabla_csv(tabla)
+    _escribir(contenido, args.salida)
+    return 0
+
+
+def comando_tasa(args):
+    """
+    Conversión completa de una tasa, paso a paso
+    """
+    resultado, pasos = conversion_completa(
+        args.tasa / 100, args.tipo, args.modalidad, FRECUENCIAS[args.frecuencia],
+        args.salida_tipo, args.salida_modalidad, FRECUENCIAS[args.salida_frecuencia]
+    )
+    for descripcion, valor in pasos:
+        print(f"{descripcion:<35}{valor * 100:>12.4f}%")
+    print(f"{'Resultado':<35}{resultado * 100:>12.4f}%")
+    return 0
+
+
+def comando_portafolio(args):
+    """
+    Proyección agregada de flujos de un archivo de portafolio
+    """
+    proyeccion, resumen = proyectar_portafolio(
+        args.archivo, agrupacion=args.agrupacion, presupuesto_mb=args.presupuesto_mb,
+        fecha_base=args.fecha_base, curvas=args.curvas, procesos=args.procesos
+    )
+    _escribir(tabla_csv(proyeccion), args.salida)
+    print(f"{resumen['creditos']:,} créditos procesados, {resumen['rechazados']:,} rechazados "
+          f"en {resumen['bloques']} bloques", file=sys.stderr)
+    return 0
+
+
+def comando_extractos(args):
+    """
+    Extractos de los períodos pedidos (o del mes de corte) de un portafolio
+    """
+    if (args.periodo is None) == (args.fecha_corte is None):
+        raise ValueError("Indique --periodo o --fecha-corte")
+    bloques = extractos(args.archivo, periodos=args.periodo, fecha_corte=args.fecha_corte,
+                        presupuesto_mb=args.presupuesto_mb, fecha_base=args.fecha_base,
+                        festivos=args.festivos)
+    filas = escribir_extractos(bloques, args.salida if args.salida is not None else sys.stdout,
+                               formato='csv' if args.salida is None else None)
+    print(f"{filas:,} extractos", file=sys.stderr)
+    return 0
+
+
+def _argumentos_tasa(parser, prefijo='', ayuda=''):
+    parser.add_argument(f"--{prefijo}tipo", choices=TIPOS_TASA, default="Efectiva",
+                        help=f"Tipo de tasa{ayuda}")
+    parser.add_argument(f"--{prefijo}modalidad", choices=MODALIDADES, default="Vencida",
+                        help=f"Modalidad{ayuda}")
+    parser.add_argument(f"--{prefijo}frecuencia", choices=list(FRECUENCIAS), default="Mensual",
+                        help=f"Frecuencia{ayuda}")
+
+
+def crear_parser():
+    """
+    Parser de la línea de comandos con los subcomandos tabla, tasa, portafolio y extractos
+    """
+    parser = argparse.ArgumentParser(prog="amortizacion",
+                                     description="Tablas de amortización, tasas y portafolios")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    tabla = subparsers.add_parser("tabla", help="Tabla de amortización de un crédito")
+    tabla.add_argument("--monto", type=float, required=True, help="Monto del crédito")
+    tabla.add_argument("--tasa", type=float, required=True, help="Tasa anual en porcentaje")
+    _argumentos_tasa(tabla)
+    tabla.add_argument("--pagos", type=int, required=True, help="Número de pagos")
+    tabla.add_argument("--fecha-inicio", default=datetime.now().strftime('%Y-%m-%d'),
+                       help="Fecha de inicio AAAA-MM-DD (por defecto hoy)")
+    tabla.add_argument("--sistema", choices=SISTEMAS, default="frances", help="Sistema de amortización")
+    tabla.add_argument("--gracia", type=int, default=0, help="Períodos de gracia")
+    tabla.add_argument("--tipo-gracia", choices=("Capital", "Total"), default="Capital",
+                       help="Tipo de gracia")
+    tabla.add_argument("--comision", type=float, default=0.0, help="Comisión fija por período, en moneda local")
+    tabla.add_argument("--seguro", type=float, default=0.0, help="Seguro, %% del saldo por período")
+    tabla.add_argument("--impuesto", type=float, default=0.0, help="Impuesto, %% sobre intereses")
+    tabla.add_argument("--unidad", default=MONEDA_LOCAL, help="Unidad del crédito (por defecto moneda local)")
+    tabla.add_argument("--curvas", default="curvas_indice.csv", help="Archivo de curvas de las unidades")
+    tabla.add_argument("--festivos", default=None, help="Archivo de festivos del calendario de pagos")
+    tabla.add_argument("--base-dias", choices=BASES_DIAS, default=None,
+                       help="Interés por los días reales de cada período (por defecto períodos iguales)")
+    tabla.add_argument("--abono-programado", type=_abono_programado, action="append", default=[],
+                       metavar="INICIO:MONTO:CADA", help="Abono programado (se puede repetir)")
+    tabla.add_argument("--abono", type=_abono_adhoc, action="append", default=[],
+                       metavar="PERIODO:MONTO", help="Abono ad-hoc (se puede repetir)")
+    tabla.add_argument("--reporte", action="store_true",
+                       help="Reporte completo (datos, comparación y ambas tablas)")
+    tabla.add_argument("--salida", default=None, help="Archivo .csv o .xlsx (por defecto CSV en stdout)")
+    tabla.set_defaults(funcion=comando_tabla)
+
+    tasa = subparsers.add_parser("tasa", help="Conversión completa de una tasa")
+    tasa.add_argument("--tasa", type=float, required=True, help="Tasa en porcentaje")
+    _argumentos_tasa(tasa, ayuda=" de entrada")
+    _argumentos_tasa(tasa, prefijo="salida-", ayuda=" de salida")
+    tasa.set_defaults(funcion=comando_tasa)
+
+    portafolio = subparsers.add_parser("portafolio", help="Proyección de flujos de un portafolio")
+    portafolio.add_argument("archivo", help="Archivo CSV o Parquet con una fila por crédito")
+    portafolio.add_argument("--agrupacion", choices=AGRUPACIONES, default="periodo",
+                            help="Agrupar por número de pago o por mes calendario")
+    portafolio.add_argument("--presupuesto-mb", type=int, default=256, help="Memoria aproximada por bloque")
+    portafolio.add_argument("--procesos", type=int, default=1,
+                            help="Procesos en paralelo (memoria compartida)")
+    portafolio.add_argument("--fecha-base", default=None, help="Inicio de los créditos sin fecha_inicio")
+    portafolio.add_argument("--curvas", default="curvas_indice.csv", help="Archivo de curvas de las unidades")
+    portafolio.add_argument("--salida", default=None, help="Archivo CSV (por defecto stdout)")
+    portafolio.set_defaults(funcion=comando_portafolio)
+
+    extracto = subparsers.add_parser("extractos", help="Filas de extracto de un portafolio, sin tablas completas")
+    extracto.add_argument("archivo", help="Archivo CSV o Parquet con una fila por crédito")
+    extracto.add_argument("--periodo", type=int, action="append", default=None,
+                          help="Período a extraer de cada crédito (se puede repetir)")
+    extracto.add_argument("--fecha-corte", default=None, help="Extraer el pago que vence en el mes de esta fecha")
+    extracto.add_argument("--presupuesto-mb", type=int, default=256, help="Memoria aproximada por bloque")
+    extracto.add_argument("--fecha-base", default=None, help="Inicio de los créditos sin fecha_inicio")
+    extracto.add_argument("--festivos", default=None, help="Archivo de festivos del calendario de pagos")
+    extracto.add_argument("--salida", default=None, help="Archivo .csv o .parquet (por defecto CSV en stdout)")
+    extracto.set_defaults(funcion=comando_extractos)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Punto de entrada de la consola; retorna el código de salida
+    """
+    args = crear_parser().parse_args(argv)
+    try:
+        return args.funcion(args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
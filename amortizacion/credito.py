@@ -0,0 +1,154 @@
+"""
+Construcción de un crédito sin interfaz gráfica
+A partir de los mismos datos que guarda el aplicativo (formulario o sesión
+restaurada) calcula la tasa por período, el motor, los cargos y las tablas
+básica y con abonos, de modo que los procesos por lotes y la línea de
+comandos obtienen exactamente las tablas del aplicativo sin importar Streamlit
+"""
+
+from datetime import datetime
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .abonos import tabla_con_abonos
+from .cargos import CargoFijo, ImpuestoInteres, SeguroSaldo
+from .extractos import extracto_indice
+from .fechas import CalendarioPagos
+from .indice_abonos import IndiceAbonos
+from .monedas import MONEDA_LOCAL, CurvaIndice, aplicar_cargos_en_unidad
+from .motor import MotorAmortizacion
+from .tasas import FRECUENCIAS, tasa_periodo
+
+# Datos opcionales del crédito y su valor cuando no vienen
+VALORES_POR_DEFECTO = {
+    'tipo_tasa': "Efectiva",
+    'modalidad': "Vencida",
+    'frecuencia': 12,
+    'sistema': "frances",
+    'periodos_gracia': 0,
+    'tipo_gracia': "Capital",
+    'comision': 0.0,
+    'seguro': 0.0,
+    'impuesto': 0.0,
+    'unidad': MONEDA_LOCAL,
+    'base_dias': None,
+}
+
+FRECUENCIAS_TEXTO = {periodos: texto for texto, periodos in FRECUENCIAS.items()}
+
+
+class Credito:
+    """
+    Crédito configurado con el esquema de datos del aplicativo
+
+    `datos` usa las claves de datos_credito: 'monto', 'tasa_anual_original'
+    (en porcentaje), 'num_pagos', 'fecha_inicio' ('AAAA-MM-DD') y las
+    opcionales de VALORES_POR_DEFECTO; 'seguro' e 'impuesto' van en
+    porcentaje y 'base_dias' (None, 'actual/365' o '30/360') fija el interés
+    de cada período por los días reales del calendario. `datos` completa además 'frecuencia_texto', 'tasa_periodo'
+    (en porcentaje) y 'cuota_fija', listos para los reportes.
+    """
+
+    def __init__(self, datos: Mapping, curvas: Optional[Mapping[str, CurvaIndice]] = None,
+                 festivos=None):
+        """
+        Valida los datos y prepara el motor y las capas de cargos
+        """
+        datos = {**VALORES_POR_DEFECTO, **datos}
+        datos.setdefault('fecha_inicio', datetime.now().strftime('%Y-%m-%d'))
+        datos.setdefault('frecuencia_texto', FRECUENCIAS_TEXTO.get(datos['frecuencia'],
+                                                                  str(datos['frecuencia'])))
+        curvas = curvas or {}
+        if datos['unidad'] != MONEDA_LOCAL and datos['unidad'] not in curvas:
+            raise ValueError(f"No hay curva para la unidad {datos['unidad']}")
+
+        self.tasa_periodo = float(tasa_periodo(datos['tasa_anual_original'] / 100, datos['tipo_tasa'],
+                                               datos['modalidad'], datos['frecuencia']))
+        self.calendario = CalendarioPagos(datos['frecuencia'], festivos=festivos,
+                                          base_dias=datos['base_dias'])
+        self.curva = curvas.get(datos['unidad'])
+        self.motor = MotorAmortizacion(
+            monto=datos['monto'],
+            tasa_periodo=self.tasa_periodo,
+            num_pagos=datos['num_pagos'],
+            fecha_inicio=datetime.strptime(datos['fecha_inicio'], '%Y-%m-%d'),
+            calendario=self.calendario,
+            sistema=datos['sistema'],
+            periodos_gracia=datos['periodos_gracia'],
+            tipo_gracia=datos['tipo_gracia'].lower()
+        )
+
+        # Capas de cargos que se agregan a cada tabla generada (la comisión va
+        # en moneda local aunque el crédito esté en una unidad)
+        seguro = datos['seguro'] / 100
+        impuesto = datos['impuesto'] / 100
+        self.cargos = [
+            capa for capa, valor in [
+                (CargoFijo(datos['comision']), datos['comision']),
+                (SeguroSaldo(seguro), seguro),
+                (ImpuestoInteres(impuesto), impuesto)
+            ] if valor > 0
+        ]
+
+        datos['tasa_periodo'] = self.tasa_periodo * 100
+        datos['cuota_fija'] = float(self.motor.cuota_fija[0])
+        self.datos = datos
+
+    @property
+    def frances_simple(self):
+        """
+        Sistema francés sin gracia ni base de días: cuota fija y tasa constante
+        """
+        datos = self.datos
+        return datos['sistema'] == "frances" and datos['periodos_gracia'] == 0 and datos['base_dias'] is None
+
+    def indice_abonos(self, abonos_programados: Sequence[Mapping] = (),
+                      abonos_adhoc: Sequence[Mapping] = ()) -> IndiceAbonos:
+        return IndiceAbonos(abonos_programados, abonos_adhoc, self.datos['num_pagos'])
+
+    def tabla_basica(self) -> pd.DataFrame:
+        """
+        Tabla sin abonos, con cargos y columnas en moneda local si aplica
+        """
+        return self._completar(self.motor.tabla())
+
+    def tabla_con_abonos(self, abonos) -> pd.DataFrame:
+        """
+        Tabla con abonos (IndiceAbonos o vector por período) en cualquier sistema
+
+        En el francés simple se mantiene datos['cuota_fija']; en los demás
+        casos cada período sigue la regla de pago de motor.plan_pagos.
+        """
+        datos = self.datos
+        if self.frances_simple:
+            tabla = tabla_con_abonos(datos['monto'], self.tasa_periodo, datos['num_pagos'],
+                                     abonos, cuota=datos['cuota_fija'])
+        else:
+            tasas, cuota, pago_interes = self.motor.plan_pagos()
+            tabla = tabla_con_abonos(datos['monto'], tasas[0], datos['num_pagos'], abonos,
+                                     cuota=cuota[0], pago_interes=pago_interes[0])
+        fechas = self.calendario.fechas(datos['fecha_inicio'], len(tabla))[0]
+        tabla['Fecha'] = np.datetime_as_string(fechas, unit='D')
+        return self._completar(tabla)
+
+    def extracto(self, periodos, abonos=None) -> pd.DataFrame:
+        """
+        Filas de los períodos pedidos sin generar la tabla completa
+
+        Con `abonos` (IndiceAbonos) el saldo descuenta los abonos previos en
+        forma cerrada; los períodos posteriores a la cancelación se omiten.
+        """
+        if not self.frances_simple:
+            raise ValueError("Los extractos se calculan sobre el sistema francés sin gracia ni base de días")
+        datos = self.datos
+        indice = abonos if abonos is not None else self.indice_abonos()
+        filas = extracto_indice(datos['monto'], self.tasa_periodo, datos['num_pagos'], indice,
+                                periodos, cuota=datos['cuota_fija'])
+        fechas = self.calendario.fechas_periodo(datos['fecha_inicio'], filas['Período'].to_numpy())
+        filas.insert(1, 'Fecha', np.datetime_as_string(fechas, unit='D'))
+        return self._completar(filas)
+
+    def _completar(self, tabla):
+        return aplicar_cargos_en_unidad(tabla, self.cargos, self.curva)
@@ -0,0 +1,148 @@
+"""
+Espacio de trabajo de escenarios con almacenamiento columnar
+Cada escenario es una configuración de crédito y abonos; los parámetros se
+guardan en arreglos (una posición por escenario) y los abonos como tripletas
+(escenario, período, monto), de modo que las métricas de todos los
+escenarios se calculan en una sola pasada vectorizada
+"""
+
+import numpy as np
+import pandas as pd
+
+from .abonos import columnas_con_abonos
+from .indice_abonos import IndiceAbonos
+
+
+class ConjuntoEscenarios:
+    """
+    Conjunto de N escenarios de crédito almacenados por columnas
+    """
+
+    def __init__(self):
+        """
+        Inicializa un conjunto vacío
+        """
+        self.nombres = []
+        self.monto = np.array([], dtype=float)
+        self.tasa_periodo = np.array([], dtype=float)
+        self.num_pagos = np.array([], dtype=np.int64)
+        self.frecuencia = np.array([], dtype=np.int64)
+
+        # Abonos en formato disperso: escenario, período (1..n) y monto
+        self.abono_escenario = np.array([], dtype=np.int64)
+        self.abono_periodo = np.array([], dtype=np.int64)
+        self.abono_monto = np.array([], dtype=float)
+
+        self._resultado = None
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def agregar(self, nombre, monto, tasa_periodo, num_pagos, frecuencia=12,
+                abonos_programados=(), abonos_adhoc=()):
+        """
+        Agrega un escenario y retorna su posición
+
+        Los abonos usan las mismas estructuras de diccionarios que ManejoAbonos.
+        """
+        if nombre in self.nombres:
+            raise ValueError(f"Ya existe un escenario llamado '{nombre}'")
+
+        indice = len(self.nombres)
+        self.nombres.append(nombre)
+        self.monto = np.append(self.monto, float(monto))
+        self.tasa_periodo = np.append(self.tasa_periodo, float(tasa_periodo))
+        self.num_pagos = np.append(self.num_pagos, int(num_pagos))
+        self.frecuencia = np.append(self.frecuencia, int(frecuencia))
+
+        abonos = IndiceAbonos(abonos_programados, abonos_adhoc, int(num_pagos))
+        self.abono_escenario = np.append(self.abono_escenario, np.full(len(abonos.periodos), indice))
+        self.abono_periodo = np.append(self.abono_periodo, abonos.periodos)
+        self.abono_monto = np.append(self.abono_monto, abonos.montos)
+
+        self._resultado = None
+        return indice
+
+    def eliminar(self, indice):
+        """
+        Elimina un escenario y renumera los abonos de los siguientes
+        """
+        del self.nombres[indice]
+        conservar = np.arange(len(self.monto)) != indice
+        self.monto = self.monto[conservar]
+        self.tasa_periodo = self.tasa_periodo[conservar]
+        self.num_pagos = self.num_pagos[conservar]
+        self.frecuencia = self.frecuencia[conservar]
+
+        conservar_abonos = self.abono_escenario != indice
+        self.abono_escenario = self.abono_escenario[conservar_abonos]
+        self.abono_escenario -= self.abono_escenario > indice
+        self.abono_periodo = self.abono_periodo[conservar_abonos]
+        self.abono_monto = self.abono_monto[conservar_abonos]
+
+        self._resultado = None
+
+    def abonos_densos(self):
+        """
+        Matriz (escenarios × períodos) con el abono extra de cada período
+        """
+        max_pagos = int(self.num_pagos.max()) if len(self) else 0
+        abonos = np.zeros((len(self), max_pagos))
+        np.add.at(abonos, (self.abono_escenario, self.abono_periodo - 1), self.abono_monto)
+        return abonos
+
+    def calcular(self):
+        """
+        Genera las columnas de todos los escenarios en una sola pasada
+
+        Returns:
+            (columnas, periodos) como en columnas_con_abonos
+        """
+        if self._resultado is None:
+            self._resultado = columnas_con_abonos(
+                self.monto, self.tasa_periodo, self.num_pagos, self.abonos_densos()
+            )
+        return self._resultado
+
+    def metricas(self, referencia=0):
+        """
+        Métricas comparativas de todos los escenarios frente a uno de referencia
+
+        Returns:
+            DataFrame con una fila por escenario
+        """
+        columnas, periodos = self.calcular()
+        total_cuotas = columnas['Cuota'].sum(axis=1)
+        total_intereses = columnas['Interés'].sum(axis=1)
+        total_abonos = columnas['Abono_Extra'].sum(axis=1)
+        total_pagado = total_cuotas + total_abonos
+
+        ahorro_intereses = total_intereses[referencia] - total_intereses
+        con_abonos = total_abonos > 0
+        roi = np.divide(ahorro_intereses, total_abonos,
+                        out=np.zeros_like(total_abonos), where=con_abonos) * 100
+
+        return pd.DataFrame({
+            'Escenario': self.nombres,
+            'Monto': self.monto,
+            'Tasa Período (%)': self.tasa_periodo * 100,
+            'Pagos por Año': self.frecuencia,
+            'Períodos': periodos,
+            'Años': periodos / self.frecuencia,
+            'Total Cuotas': total_cuotas,
+            'Total Intereses': total_intereses,
+            'Total Abonos': total_abonos,
+            'Total Pagado': total_pagado,
+            'Ahorro en Intereses': ahorro_intereses,
+            'Ahorro vs Referencia': total_pagado[referencia] - total_pagado,
+            'ROI Abonos (%)': roi,
+        })
+
+    def curvas_saldo(self):
+        """
+        Saldo al final de cada período de todos los escenarios (NaN tras el pago final)
+        """
+        columnas, periodos = self.calcular()
+        saldos = columnas['Saldo_Final'].copy()
+        saldos[np.arange(saldos.shape[1])[None, :] >= periodos[:, None]] = np.nan
+        return saldos
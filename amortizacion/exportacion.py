@@ -0,0 +1,276 @@
+"""
+Exportación de tablas y reportes sin interfaz gráfica
+Construye los archivos CSV y Excel de las tablas y del reporte completo a
+partir de datos explícitos (datos del crédito, tablas, abonos y resúmenes),
+sin leer el estado de Streamlit, de modo que el aplicativo, la línea de
+comandos y los procesos por lotes generan exactamente los mismos archivos
+"""
+
+import io
+from datetime import datetime
+from typing import Callable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .indice_abonos import IndiceAbonos
+from .resumen import ResumenComparacion, ResumenTabla
+
+# Firma de la función de avance del reporte Excel: (progreso 0-1, mensaje)
+Reportar = Callable[[float, str], None]
+
+
+def tabla_csv(tabla: pd.DataFrame) -> str:
+    """
+    Tabla en formato CSV
+    """
+    output = io.StringIO()
+    tabla.to_csv(output, index=False)
+    return output.getvalue()
+
+
+def tabla_excel(tabla: pd.DataFrame, nombre_hoja: str,
+                datos_credito: Optional[Mapping] = None,
+                resumen: Optional[ResumenTabla] = None) -> bytes:
+    """
+    Tabla en un libro de Excel, con una hoja de resumen si hay datos del crédito
+    """
+    output = io.BytesIO()
+
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        tabla.to_excel(writer, sheet_name=nombre_hoja, index=False)
+
+        # Agregar hoja de resumen si hay datos del crédito
+        if datos_credito:
+            if resumen is None:
+                resumen = ResumenTabla.desde_tabla(tabla)
+            resumen_data = {
+                'Concepto': [
+                    'Monto del Crédito',
+                    'Tasa Original',
+                    'Tipo de Tasa',
+                    'Modalidad',
+                    'Frecuencia',
+                    'Número de Pagos',
+                    'Fecha de Inicio',
+                    'Cuota Fija',
+                    'Total Intereses',
+                    'Total a Pagar'
+                ],
+                'Valor': [
+                    f"${datos_credito['monto']:,.2f}",
+                    f"{datos_credito['tasa_anual_original']:.2f}%",
+                    datos_credito['tipo_tasa'],
+                    datos_credito['modalidad'],
+                    datos_credito['frecuencia_texto'],
+                    datos_credito['num_pagos'],
+                    datos_credito['fecha_inicio'],
+                    f"${datos_credito['cuota_fija']:,.2f}",
+                    f"${resumen.total_intereses:,.2f}",
+                    f"${resumen.total_pagado:,.2f}"
+                ]
+            }
+
+            resumen_df = pd.DataFrame(resumen_data)
+            resumen_df.to_excel(writer, sheet_name='Resumen', index=False)
+
+    return output.getvalue()
+
+
+def reporte_csv(datos_credito: Optional[Mapping], tabla_basica: Optional[pd.DataFrame] = None,
+                tabla_abonos: Optional[pd.DataFrame] = None,
+                resumen: Optional[ResumenComparacion] = None,
+                generado: Optional[datetime] = None) -> str:
+    """
+    Reporte CSV completo: datos del crédito, comparación y ambas tablas
+    """
+    output = io.StringIO()
+
+    # Encabezado del reporte
+    output.write("REPORTE COMPLETO DE AMORTIZACIÓN\n")
+    output.write("=" * 50 + "\n")
+    output.write(f"Generado el: {(generado or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+    # Información del crédito
+    if datos_credito:
+        output.write("INFORMACIÓN DEL CRÉDITO\n")
+        output.write("-" * 30 + "\n")
+        output.write(f"Monto: ${datos_credito['monto']:,.2f}\n")
+        output.write(f"Tasa: {datos_credito['tasa_anual_original']:.2f}% ({datos_credito['tipo_tasa']} {datos_credito['modalidad']})\n")
+        output.write(f"Frecuencia: {datos_credito['frecuencia_texto']}\n")
+        output.write(f"Plazo: {datos_credito['num_pagos']} pagos\n")
+        output.write(f"Cuota Fija: ${datos_credito['cuota_fija']:,.2f}\n")
+        output.write(f"Denominación: {datos_credito.get('unidad') or 'Moneda local'}\n")
+        output.write(f"Base de días: {datos_credito.get('base_dias') or 'Períodos iguales'}\n\n")
+
+    # Resumen comparativo
+    if tabla_basica is not None and tabla_abonos is not None:
+        if resumen is None:
+            resumen = ResumenComparacion.desde_tablas(tabla_basica, tabla_abonos)
+        sin, con = resumen.sin_abonos, resumen.con_abonos
+
+        output.write("RESUMEN COMPARATIVO\n")
+        output.write("-" * 30 + "\n")
+        output.write(f"Sin abonos - Períodos: {sin.periodos}, Intereses: ${sin.total_intereses:,.2f}\n")
+        output.write(f"Con abonos - Períodos: {con.periodos}, Intereses: ${con.total_intereses:,.2f}\n")
+        output.write(f"Ahorro en intereses: ${resumen.ahorro_intereses:,.2f}\n")
+        output.write(f"Ahorro en tiempo: {resumen.ahorro_tiempo} períodos\n")
+        if datos_credito and datos_credito.get('unidad'):
+            output.write(f"Total pagado en moneda local - Sin abonos: ${sin.total_pagado_local:,.2f}, "
+                         f"Con abonos: ${con.total_pagado_local:,.2f}\n")
+        output.write("\n")
+
+    # Tabla básica
+    output.write("TABLA BÁSICA\n")
+    output.write("-" * 20 + "\n")
+    if tabla_basica is not None:
+        tabla_basica.to_csv(output, index=False)
+
+    output.write("\n\nTABLA CON ABONOS\n")
+    output.write("-" * 20 + "\n")
+    if tabla_abonos is not None:
+        tabla_abonos.to_csv(output, index=False)
+
+    return output.getvalue()
+
+
+def reporte_excel(datos_credito: Optional[Mapping], tabla_basica: Optional[pd.DataFrame] = None,
+                  tabla_abonos: Optional[pd.DataFrame] = None,
+                  indice_abonos: Optional[IndiceAbonos] = None,
+                  resumen: Optional[ResumenComparacion] = None,
+                  reportar: Optional[Reportar] = None) -> bytes:
+    """
+    Reporte Excel completo con una hoja por sección
+
+    `reportar(progreso, mensaje)` se llama antes de cada hoja; un trabajo de
+    la cola puede pasar su método `reportar` para informar el avance y
+    atender la cancelación.
+    """
+    if reportar is None:
+        def reportar(progreso, mensaje):
+            pass
+
+    output = io.BytesIO()
+
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        # Hoja de resumen
+        reportar(0.05, "Resumen del crédito")
+        if datos_credito:
+            resumen_credito = {
+                'Concepto': [
+                    'Monto del Crédito',
+                    'Tasa Original',
+                    'Tipo de Tasa',
+                    'Modalidad',
+                    'Frecuencia',
+                    'Número de Pagos',
+                    'Fecha de Inicio',
+                    'Cuota Fija',
+                    'Comisión por Período',
+                    'Seguro (% saldo por período)',
+                    'Impuesto (% sobre intereses)',
+                    'Denominación',
+                    'Base de Días'
+                ],
+                'Valor': [
+                    f"${datos_credito['monto']:,.2f}",
+                    f"{datos_credito['tasa_anual_original']:.2f}%",
+                    datos_credito['tipo_tasa'],
+                    datos_credito['modalidad'],
+                    datos_credito['frecuencia_texto'],
+                    datos_credito['num_pagos'],
+                    datos_credito['fecha_inicio'],
+                    f"${datos_credito['cuota_fija']:,.2f}",
+                    f"${datos_credito['comision']:,.2f}",
+                    f"{datos_credito['seguro']:.4f}%",
+                    f"{datos_credito['impuesto']:.2f}%",
+                    datos_credito.get('unidad') or 'Moneda local',
+                    datos_credito.get('base_dias') or 'Períodos iguales'
+                ]
+            }
+            resumen_df = pd.DataFrame(resumen_credito)
+            resumen_df.to_excel(writer, sheet_name='1_Resumen_Credito', index=False)
+
+        # Hoja de comparación
+        reportar(0.1, "Comparación")
+        if resumen is None and tabla_basica is not None and tabla_abonos is not None:
+            resumen = ResumenComparacion.desde_tablas(tabla_basica, tabla_abonos)
+        if resumen is not None:
+            sin, con = resumen.sin_abonos, resumen.con_abonos
+
+            comparacion_data = {
+                'Concepto': [
+                    'Períodos Totales',
+                    'Total Cuotas',
+                    'Total Intereses',
+                    'Total Abonos Extra',
+                    'Total Cargos',
+                    'Total Pagado',
+                    'Ahorro en Intereses',
+                    'Ahorro en Tiempo (períodos)',
+                    'Porcentaje de Ahorro'
+                ],
+                'Sin Abonos': [
+                    sin.periodos,
+                    f"${sin.total_cuotas:,.2f}",
+                    f"${sin.total_intereses:,.2f}",
+                    "$0.00",
+                    f"${sin.total_cargos:,.2f}",
+                    f"${sin.total_pagado:,.2f}",
+                    "-",
+                    "-",
+                    "-"
+                ],
+                'Con Abonos': [
+                    con.periodos,
+                    f"${con.total_cuotas:,.2f}",
+                    f"${con.total_intereses:,.2f}",
+                    f"${con.total_abonos:,.2f}",
+                    f"${con.total_cargos:,.2f}",
+                    f"${con.total_pagado:,.2f}",
+                    f"${resumen.ahorro_intereses:,.2f}",
+                    f"{resumen.ahorro_tiempo}",
+                    f"{resumen.porcentaje_intereses:.1f}%"
+                ]
+            }
+            if datos_credito and datos_credito.get('unidad'):
+                comparacion_data['Concepto'].append('Total Pagado (moneda local)')
+                comparacion_data['Sin Abonos'].append(f"${sin.total_pagado_local:,.2f}")
+                comparacion_data['Con Abonos'].append(f"${con.total_pagado_local:,.2f}")
+            comparacion_df = pd.DataFrame(comparacion_data)
+            comparacion_df.to_excel(writer, sheet_name='2_Comparacion', index=False)
+
+        # Hoja tabla básica
+        reportar(0.15, "Tabla básica")
+        if tabla_basica is not None:
+            tabla_basica.to_excel(writer, sheet_name='3_Tabla_Basica', index=False)
+
+        # Hoja tabla con abonos
+        reportar(0.5, "Tabla con abonos")
+        if tabla_abonos is not None:
+            tabla_abonos.to_excel(writer, sheet_name='4_Tabla_con_Abonos', index=False)
+
+        # Hoja de abonos configurados
+        reportar(0.85, "Abonos configurados")
+        if indice_abonos is not None and len(indice_abonos):
+            abonos_df = indice_abonos.resumen()
+            programado = abonos_df['Tipo'] == 'Programado'
+            abonos_df['Descripción'] = np.where(
+                programado,
+                'Desde período ' + abonos_df['Período'].astype(str),
+                'Solo en período ' + abonos_df['Período'].astype(str)
+            )
+            abonos_df['Frecuencia'] = np.where(
+                programado,
+                'Cada ' + abonos_df['Frecuencia'].astype(str) + ' períodos',
+                'Una vez'
+            )
+            for columna in ('Monto', 'Total Programado'):
+                abonos_df[columna] = abonos_df[columna].map('${:,.2f}'.format)
+            abonos_df = abonos_df[['Tipo', 'Período', 'Monto', 'Frecuencia', 'Descripción',
+                                   'Aplicaciones', 'Total Programado']]
+            abonos_df.to_excel(writer, sheet_name='5_Abonos_Configurados', index=False)
+
+        reportar(0.95, "Escribiendo archivo")
+
+    return output.getvalue()
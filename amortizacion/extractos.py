@@ -0,0 +1,255 @@
+"""
+Extractos por período sin generar tablas completas
+El saldo al inicio de un período se obtiene en forma cerrada (sin abonos, con
+un abono periódico o con el índice de abonos de un crédito) y con él se arma
+solo la fila pedida: Saldo_Inicial, Cuota, Interés, Capital, Abono_Extra y
+Saldo_Final. Los portafolios se recorren por bloques y los extractos salen de
+un generador, de modo que millones de créditos se escriben a CSV o Parquet sin
+materializar ninguna tabla
+"""
+
+import numpy as np
+import pandas as pd
+
+from .fechas import CalendarioPagos
+from .kernel import SALDO_MINIMO
+from .motor import COLUMNAS_MONTO, cuota_fija, saldo_tras_pagos
+from .portafolio import (
+    _avance, _fechas_inicio, _tamano_origen, creditos_por_bloque, leer_portafolio, normalizar_bloque
+)
+from .tasas import tasa_periodo
+
+COLUMNAS_EXTRACTO = ['Crédito', 'Período', 'Fecha'] + COLUMNAS_MONTO
+
+
+def abonos_periodicos_acumulados(tasa_periodo, pagos, abono, desde, cada):
+    """
+    Valor al período `pagos` de los abonos periódicos aplicados hasta ese período
+
+    Σ A·(1+r)^(k-j) sobre j = desde, desde + cada, ... ≤ k, como serie geométrica.
+    """
+    tasa = np.asarray(tasa_periodo, dtype=float)
+    k = np.asarray(pagos, dtype=np.int64)
+    desde = np.asarray(desde, dtype=np.int64)
+    cada = np.asarray(cada, dtype=np.int64)
+
+    aplicados = np.where(k >= desde, (k - desde) // cada + 1, 0)
+    ultimo = desde + (aplicados - 1) * cada
+    con_tasa = tasa > 0
+    log_crecimiento = np.log1p(np.where(con_tasa, tasa, 1.0))
+    serie = np.where(
+        con_tasa,
+        np.exp((k - ultimo) * log_crecimiento) * np.expm1(cada * aplicados * log_crecimiento)
+        / np.expm1(cada * log_crecimiento),
+        aplicados
+    )
+    return np.where(aplicados > 0, np.asarray(abono, dtype=float) * serie, 0.0)
+
+
+def filas_periodo(saldo, tasa_periodo, cuota, num_pagos, periodo, abono):
+    """
+    Fila del período a partir del saldo inicial, con las reglas de la recurrencia
+
+    El abono se aplica después de la cuota, limitado al saldo restante; la
+    última cuota cancela el saldo. Retorna (columnas redondeadas, activo),
+    donde `activo` marca los períodos en que el crédito sigue vigente.
+    """
+    interes = saldo * tasa_periodo
+    ultimo = periodo == num_pagos
+    cuota_periodo = np.where(ultimo, saldo + interes, np.minimum(cuota, saldo + interes))
+    capital = cuota_periodo - interes
+    restante = saldo - capital
+    abono = np.minimum(abono, restante)
+    activo = (saldo > SALDO_MINIMO) & (periodo >= 1) & (periodo <= num_pagos)
+
+    valores = (saldo, cuota_periodo, interes, capital, abono, restante - abono)
+    return {nombre: np.round(valor, 2) for nombre, valor in zip(COLUMNAS_MONTO, valores)}, activo
+
+
+def extracto_indice(monto, tasa_periodo, num_pagos, indice, periodos, cuota=None):
+    """
+    Filas de los períodos pedidos de un crédito con su IndiceAbonos
+
+    El saldo descuenta los abonos previos con las sumas acumuladas del índice:
+    Bₖ₋₁ = B⁰ₖ₋₁ - (1+r)^(k-1)·Σⱼ₍ⱼ<ₖ₎ aⱼ·(1+r)^-j. Los períodos posteriores a la
+    cancelación se omiten.
+
+    Returns:
+        DataFrame con 'Período' y las columnas de COLUMNAS_MONTO
+    """
+    periodos = np.atleast_1d(np.asarray(periodos, dtype=np.int64))
+    if cuota is None:
+        cuota = cuota_fija(monto, tasa_periodo, num_pagos)
+
+    crecimiento = 1 + tasa_periodo
+    descuentos = crecimiento ** -indice.periodos.astype(float)
+    descontados = np.concatenate([[0.0], np.cumsum(indice.montos * descuentos)])
+    pagados = np.clip(periodos, 1, num_pagos) - 1
+    previos = np.searchsorted(indice.periodos, pagados, side='right')
+    saldo = (saldo_tras_pagos(monto, tasa_periodo, num_pagos, pagados, cuota)
+             - crecimiento ** pagados.astype(float) * descontados[previos])
+
+    # Abono de cada período; fuera del plazo del índice no hay abonos
+    abonos = np.concatenate([[0.0], indice.por_periodo, [0.0]])
+    abono = abonos[np.clip(periodos, 0, indice.num_pagos + 1)]
+    columnas, activo = filas_periodo(saldo, tasa_periodo, cuota, num_pagos, periodos, abono)
+
+    datos = {'Período': periodos[activo]}
+    datos.update({nombre: valor[activo] for nombre, valor in columnas.items()})
+    return pd.DataFrame(datos)
+
+
+def periodos_en_corte(bloque, fecha_corte, fecha_base):
+    """
+    Período de cada crédito cuyo pago contractual cae en el mes de `fecha_corte`
+
+    Los créditos sin pago ese mes (frecuencias no mensuales) reciben 0.
+    """
+    mes_inicio = _fechas_inicio(bloque, fecha_base).astype('datetime64[M]').astype(np.int64)
+    mes_corte = np.datetime64(pd.Timestamp(fecha_corte).date(), 'M').astype(np.int64)
+    meses_periodo = 12 // bloque['frecuencia'].to_numpy(dtype=np.int64)
+
+    transcurridos = mes_corte - mes_inicio
+    return np.where(transcurridos % meses_periodo == 0, transcurridos // meses_periodo, 0)
+
+
+def extracto_bloque(bloque, periodos=None, fecha_corte=None, fecha_base=None, festivos=None):
+    """
+    Filas de los períodos pedidos para un bloque normalizado del portafolio
+
+    `periodos` (lista de períodos, iguales para todos los créditos) o
+    `fecha_corte` (el período que vence en ese mes, uno por crédito).
+    'Crédito' es la posición del crédito en el archivo.
+    """
+    fecha_base = pd.Timestamp(fecha_base if fecha_base is not None else pd.Timestamp.today().normalize())
+    if fecha_corte is not None:
+        periodo = periodos_en_corte(bloque, fecha_corte, fecha_base)
+        fila = np.arange(len(bloque))
+    else:
+        pedidos = np.atleast_1d(np.asarray(periodos, dtype=np.int64))
+        fila = np.repeat(np.arange(len(bloque)), len(pedidos))
+        periodo = np.tile(pedidos, len(bloque))
+
+    monto = bloque['monto'].to_numpy(dtype=float)[fila]
+    num_pagos = bloque['num_pagos'].to_numpy(dtype=np.int64)[fila]
+    frecuencia = bloque['frecuencia'].to_numpy(dtype=np.int64)
+    tasa = tasa_periodo(
+        bloque['tasa_anual'].to_numpy(dtype=float),
+        bloque['tipo_tasa'].to_numpy(),
+        bloque['modalidad'].to_numpy(),
+        frecuencia.astype(float)
+    )[fila]
+    abono = bloque['abono_periodico'].to_numpy(dtype=float)[fila]
+    desde = bloque['abono_desde'].to_numpy(dtype=np.int64)[fila]
+    cada = bloque['abono_cada'].to_numpy(dtype=np.int64)[fila]
+
+    # Los períodos fuera del plazo se calculan acotados y luego se descartan
+    cuota = cuota_fija(monto, tasa, num_pagos)
+    pagados = np.clip(periodo, 1, num_pagos) - 1
+    saldo = (saldo_tras_pagos(monto, tasa, num_pagos, pagados)
+             - abonos_periodicos_acumulados(tasa, pagados, abono, desde, cada))
+    abono_periodo = np.where((periodo >= desde) & ((periodo - desde) % cada == 0), abono, 0.0)
+    columnas, activo = filas_periodo(saldo, tasa, cuota, num_pagos, periodo, abono_periodo)
+
+    fila, periodo = fila[activo], periodo[activo]
+    fechas = np.empty(len(fila), dtype='datetime64[D]')
+    inicio = _fechas_inicio(bloque, fecha_base)[fila]
+    for paso in np.unique(frecuencia[fila]):
+        grupo = frecuencia[fila] == paso
+        fechas[grupo] = CalendarioPagos(int(paso), festivos=festivos).fechas_periodo(inicio[grupo], periodo[grupo])
+
+    datos = {
+        'Crédito': bloque.index.to_numpy(dtype=np.int64)[fila],
+        'Período': periodo,
+        'Fecha': np.datetime_as_string(fechas, unit='D'),
+    }
+    datos.update({nombre: valor[activo] for nombre, valor in columnas.items()})
+    return pd.DataFrame(datos, columns=COLUMNAS_EXTRACTO)
+
+
+def extractos(origen, periodos=None, fecha_corte=None, presupuesto_mb=256, fecha_base=None,
+              festivos=None, nombre=None, trabajo=None):
+    """
+    Genera los extractos de un portafolio bloque a bloque
+
+    Args:
+        origen: DataFrame, ruta o archivo CSV/Parquet con el formato de
+            proyectar_portafolio
+        periodos: períodos a extraer de cada crédito
+        fecha_corte: en lugar de `periodos`, el período que vence en ese mes
+        presupuesto_mb: memoria aproximada por bloque
+        fecha_base: inicio de los créditos sin 'fecha_inicio' (por defecto hoy)
+        festivos: arreglo o archivo de festivos para las fechas de pago
+        nombre: nombre del archivo, si `origen` es un archivo sin nombre
+        trabajo: Trabajo de la cola para reportar avance y permitir cancelación
+
+    Yields:
+        DataFrame por bloque con COLUMNAS_EXTRACTO; los créditos inválidos
+        y los ya cancelados en el período pedido no generan filas
+    """
+    if (periodos is None) == (fecha_corte is None):
+        raise ValueError("Indique los períodos o la fecha de corte")
+
+    filas_por_credito = 1 if fecha_corte is not None else len(np.atleast_1d(periodos))
+    tamano = creditos_por_bloque(presupuesto_mb, max(filas_por_credito, 1))
+    total_bytes = _tamano_origen(origen)
+    resumen = {'creditos': 0, 'rechazados': 0}
+    for bloque in leer_portafolio(origen, tamano, nombre):
+        # El índice conserva la posición de cada crédito en el archivo
+        inicio = resumen['creditos'] + resumen['rechazados']
+        bloque = bloque.set_axis(pd.RangeIndex(inicio, inicio + len(bloque)))
+        bloque, rechazados = normalizar_bloque(bloque)
+        resumen['creditos'] += len(bloque)
+        resumen['rechazados'] += rechazados
+        yield extracto_bloque(bloque, periodos, fecha_corte, fecha_base, festivos)
+        if trabajo is not None:
+            trabajo.reportar(_avance(origen, resumen, total_bytes),
+                             f"{resumen['creditos']:,} créditos procesados")
+
+
+def escribir_extractos(bloques, destino, formato=None):
+    """
+    Escribe los bloques de extractos en CSV o Parquet a medida que llegan
+
+    `destino` es una ruta o un archivo abierto (de texto para CSV, binario
+    para Parquet); `formato` se deduce de la extensión si no se indica.
+    Retorna el número de filas escritas.
+    """
+    formato = formato or ('parquet' if str(destino).lower().endswith('.parquet') else 'csv')
+    filas = 0
+
+    if formato == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Escribir archivos Parquet requiere pyarrow (pip install pyarrow)") from e
+        escritor = None
+        try:
+            for bloque in bloques:
+                tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(destino, tabla.schema)
+                escritor.write_table(tabla)
+                filas += len(bloque)
+            if escritor is None:
+                pq.write_table(pa.Table.from_pandas(pd.DataFrame(columns=COLUMNAS_EXTRACTO),
+                                                    preserve_index=False), destino)
+        finally:
+            if escritor is not None:
+                escritor.close()
+        return filas
+
+    archivo = destino if hasattr(destino, 'write') else open(destino, 'w', encoding='utf-8', newline='')
+    try:
+        encabezado = True
+        for bloque in bloques:
+            bloque.to_csv(archivo, index=False, header=encabezado)
+            encabezado = False
+            filas += len(bloque)
+        if encabezado:
+            pd.DataFrame(columns=COLUMNAS_EXTRACTO).to_csv(archivo, index=False)
+    finally:
+        if archivo is not destino:
+            archivo.close()
+    return filas
@@ -0,0 +1,167 @@
+"""
+Calendario de pagos vectorizado
+Fechas con meses reales, regla de fin de mes, ajuste a días hábiles y bases
+de conteo de días, calculadas con numpy.datetime64 para lotes completos
+"""
+
+import os
+
+import numpy as np
+
+# Convenciones de ajuste a día hábil admitidas (nombre → roll de numpy)
+AJUSTES = {
+    'ninguno': None,
+    'siguiente': 'following',
+    'siguiente_modificado': 'modifiedfollowing',
+    'anterior': 'preceding',
+    'anterior_modificado': 'modifiedpreceding'
+}
+
+BASES_DIAS = ('actual/365', '30/360')
+
+
+def cargar_festivos(ruta):
+    """
+    Carga un archivo local de festivos con una fecha AAAA-MM-DD por línea
+
+    Se ignoran líneas vacías y comentarios que empiezan con '#'; si el archivo
+    tiene columnas separadas por comas, se toma la primera.
+    """
+    if not ruta or not os.path.exists(ruta):
+        return np.array([], dtype='datetime64[D]')
+
+    fechas = []
+    with open(ruta, encoding='utf-8') as archivo:
+        for linea in archivo:
+            linea = linea.split('#', 1)[0].strip()
+            if linea:
+                fechas.append(linea.split(',', 1)[0].strip())
+    return np.unique(np.array(fechas, dtype='datetime64[D]'))
+
+
+def _componentes(fechas):
+    """
+    Año, mes (1-12) y día de un arreglo datetime64[D]
+    """
+    meses = fechas.astype('datetime64[M]')
+    anios = meses.astype('datetime64[Y]')
+    anio = anios.astype(np.int64) + 1970
+    mes = (meses - anios).astype(np.int64) + 1
+    dia = (fechas - meses).astype(np.int64) + 1
+    return anio, mes, dia
+
+
+class CalendarioPagos:
+    """
+    Generador vectorizado de fechas de pago y fracciones de año por período
+
+    - frecuencia: pagos por año (12, 6, 4, 2 o 1, como en frecuencia_dict)
+    - fin_de_mes: si el crédito inicia el último día del mes, los pagos
+      caen siempre en el último día del mes correspondiente
+    - ajuste: convención de día hábil (ver AJUSTES)
+    - festivos: arreglo de fechas o ruta a un archivo de festivos
+    - base_dias: None (períodos iguales), 'actual/365' o '30/360'
+    """
+
+    def __init__(self, frecuencia=12, fin_de_mes=True, ajuste='siguiente',
+                 festivos=None, base_dias=None):
+        """
+        Inicializa el calendario
+        """
+        if 12 % frecuencia != 0:
+            raise ValueError(f"Frecuencia no soportada: {frecuencia} pagos por año")
+        if ajuste not in AJUSTES:
+            raise ValueError(f"Ajuste de día hábil desconocido: {ajuste}")
+        if base_dias is not None and base_dias not in BASES_DIAS:
+            raise ValueError(f"Base de días desconocida: {base_dias}")
+
+        self.frecuencia = frecuencia
+        self.meses_periodo = 12 // frecuencia
+        self.fin_de_mes = fin_de_mes
+        self.ajuste = ajuste
+        self.base_dias = base_dias
+        if isinstance(festivos, str):
+            festivos = cargar_festivos(festivos)
+        self.festivos = (np.array([], dtype='datetime64[D]') if festivos is None
+                         else np.asarray(festivos, dtype='datetime64[D]'))
+
+    def fechas_programadas(self, fecha_inicio, num_periodos):
+        """
+        Fechas contractuales sin ajuste a día hábil
+
+        `fecha_inicio` puede ser una fecha o un arreglo de fechas (una por
+        crédito). El resultado tiene forma (créditos, num_periodos + 1) e
+        incluye la fecha de inicio en la columna 0.
+        """
+        inicio = np.atleast_1d(np.asarray(fecha_inicio, dtype='datetime64[D]'))[:, None]
+        return self._contractuales(inicio, np.arange(num_periodos + 1)[None, :])
+
+    def fechas_periodo(self, fecha_inicio, periodos):
+        """
+        Fecha de pago ajustada de un período por crédito, sin generar el
+        calendario completo (fecha_inicio y periodos se combinan elemento a elemento)
+        """
+        inicio = np.asarray(fecha_inicio, dtype='datetime64[D]')
+        return self.ajustar(self._contractuales(inicio, np.asarray(periodos, dtype=np.int64)))
+
+    def _contractuales(self, inicio, periodos):
+        """
+        Fechas contractuales de los períodos dados (arreglos compatibles por broadcasting)
+        """
+        _, _, dia_inicio = _componentes(inicio)
+
+        meses = (inicio.astype('datetime64[M]')
+                 + (periodos * self.meses_periodo).astype('timedelta64[M]'))
+        primer_dia = meses.astype('datetime64[D]')
+        dias_mes = ((meses + 1).astype('datetime64[D]') - primer_dia).astype(np.int64)
+
+        dia = np.minimum(dia_inicio, dias_mes)
+        if self.fin_de_mes:
+            ultimo_dia_inicio = (inicio.astype('datetime64[M]') + 1).astype('datetime64[D]') - inicio == 1
+            dia = np.where(ultimo_dia_inicio, dias_mes, dia)
+        return primer_dia + (dia - 1).astype('timedelta64[D]')
+
+    def ajustar(self, fechas):
+        """
+        Ajusta las fechas a días hábiles según la convención y los festivos
+        """
+        roll = AJUSTES[self.ajuste]
+        if roll is None:
+            return fechas
+        return np.busday_offset(fechas, 0, roll=roll, holidays=self.festivos)
+
+    def fechas(self, fecha_inicio, num_periodos):
+        """
+        Fechas de pago ajustadas, forma (créditos, num_periodos)
+        """
+        return self.ajustar(self.fechas_programadas(fecha_inicio, num_periodos)[:, 1:])
+
+    def fracciones_anio(self, fecha_inicio, num_periodos):
+        """
+        Fracción de año de cada período según la base de días
+
+        Sin base de días cada período vale 1/frecuencia. 'actual/365' usa los
+        días calendario entre fechas de pago ajustadas; '30/360' usa las
+        fechas contractuales sin ajustar.
+        """
+        if self.base_dias is None:
+            inicio = np.atleast_1d(np.asarray(fecha_inicio, dtype='datetime64[D]'))
+            return np.full((len(inicio), num_periodos), 1 / self.frecuencia)
+
+        programadas = self.fechas_programadas(fecha_inicio, num_periodos)
+        if self.base_dias == 'actual/365':
+            fechas = np.concatenate([programadas[:, :1], self.ajustar(programadas[:, 1:])], axis=1)
+            return np.diff(fechas, axis=1).astype(np.int64) / 365
+
+        return dias_30_360(programadas[:, :-1], programadas[:, 1:]) / 360
+
+
+def dias_30_360(inicio, fin):
+    """
+    Días entre fechas con la convención 30/360 (bond basis)
+    """
+    anio1, mes1, dia1 = _componentes(inicio)
+    anio2, mes2, dia2 = _componentes(fin)
+    dia1 = np.minimum(dia1, 30)
+    dia2 = np.where((dia2 == 31) & (dia1 == 30), 30, dia2)
+    return 360 * (anio2 - anio1) + 30 * (mes2 - mes1) + (dia2 - dia1)
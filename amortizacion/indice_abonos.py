@@ -0,0 +1,143 @@
+"""
+Índice precompilado de abonos extras
+Convierte las listas de abonos de ManejoAbonos en un vector denso con el abono
+de cada período y un índice ordenado de eventos, construidos una sola vez, de
+modo que la generación de tablas, las exportaciones y las comparaciones no
+recorren las listas en cada período
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class IndiceAbonos:
+    """
+    Abonos de un crédito indexados por período
+
+    - `por_periodo[k - 1]`: abono total del período k (acceso O(1))
+    - `periodos`, `montos`: eventos ordenados (períodos con abono > 0)
+    - `acumulado[k]`: suma de abonos de los períodos 1..k (rangos en O(1))
+
+    Los abonos que caen fuera del plazo se conservan en las columnas de
+    configuración (y en `resumen`) pero no en el vector denso.
+    """
+
+    def __init__(self, abonos_programados=(), abonos_adhoc=(), num_pagos=0):
+        """
+        Construye el índice
+
+        Los programados se expanden sin recorrer sus aplicaciones: para cada
+        frecuencia f se marca el monto en el período de inicio y se hace una
+        suma acumulada con paso f, de modo que el costo es O(n · frecuencias
+        distintas + abonos) en lugar de O(n · abonos).
+        """
+        self.num_pagos = int(num_pagos)
+        n = self.num_pagos
+
+        # Columnas de los abonos configurados, en el orden original
+        self.inicio_programados = np.array([abono['periodo_inicio'] for abono in abonos_programados],
+                                           dtype=np.int64)
+        self.monto_programados = np.array([abono['monto'] for abono in abonos_programados], dtype=float)
+        self.frecuencia_programados = np.array([abono['frecuencia'] for abono in abonos_programados],
+                                               dtype=np.int64)
+        self.periodo_adhoc = np.array([abono['periodo'] for abono in abonos_adhoc], dtype=np.int64)
+        self.monto_adhoc = np.array([abono['monto'] for abono in abonos_adhoc], dtype=float)
+
+        por_periodo = np.zeros(n)
+        inicio, frecuencia, monto = self.inicio_programados, self.frecuencia_programados, self.monto_programados
+        valido = (inicio >= 1) & (inicio <= n) & (frecuencia >= 1)
+
+        for paso in np.unique(frecuencia[valido]):
+            seleccion = valido & (frecuencia == paso)
+            filas = -(-n // paso)
+            marcas = np.zeros(filas * paso)
+            np.add.at(marcas, inicio[seleccion] - 1, monto[seleccion])
+            por_periodo += marcas.reshape(filas, paso).cumsum(axis=0).ravel()[:n]
+
+        periodo = self.periodo_adhoc
+        dentro = (periodo >= 1) & (periodo <= n)
+        np.add.at(por_periodo, periodo[dentro] - 1, self.monto_adhoc[dentro])
+
+        self.por_periodo = por_periodo
+        self.periodos = np.flatnonzero(por_periodo) + 1
+        self.montos = por_periodo[self.periodos - 1]
+        self.acumulado = np.concatenate([[0.0], np.cumsum(por_periodo)])
+
+        for arreglo in (self.por_periodo, self.periodos, self.montos, self.acumulado):
+            arreglo.flags.writeable = False
+
+    @classmethod
+    def desde_manejo(cls, manejo_abonos, num_pagos):
+        """
+        Índice a partir de un ManejoAbonos (o None, que da un índice vacío)
+        """
+        if manejo_abonos is None:
+            return cls(num_pagos=num_pagos)
+        return cls(manejo_abonos.abonos_programados, manejo_abonos.abonos_adhoc, num_pagos)
+
+    def __len__(self):
+        """
+        Número de abonos configurados (programados + ad-hoc)
+        """
+        return len(self.inicio_programados) + len(self.periodo_adhoc)
+
+    @property
+    def vacio(self):
+        return len(self.periodos) == 0
+
+    def abono(self, periodo):
+        """
+        Abono total del período (cero fuera del plazo)
+        """
+        if not 1 <= periodo <= self.num_pagos:
+            return 0.0
+        return float(self.por_periodo[periodo - 1])
+
+    def total_entre(self, desde, hasta):
+        """
+        Suma de los abonos de los períodos desde..hasta (inclusive)
+        """
+        desde = min(max(int(desde), 1), self.num_pagos + 1)
+        hasta = min(max(int(hasta), desde - 1), self.num_pagos)
+        return float(self.acumulado[hasta] - self.acumulado[desde - 1])
+
+    @property
+    def total(self):
+        return float(self.acumulado[-1])
+
+    def siguiente(self, periodo):
+        """
+        Primer período >= `periodo` con abono (None si no hay más), por búsqueda binaria
+        """
+        posicion = np.searchsorted(self.periodos, periodo)
+        return int(self.periodos[posicion]) if posicion < len(self.periodos) else None
+
+    def resumen(self):
+        """
+        Un renglón por abono configurado, con sus aplicaciones dentro del plazo
+
+        Columnas: Tipo, Período, Monto, Frecuencia (0 en ad-hoc),
+        Aplicaciones y Total Programado.
+        """
+        n = self.num_pagos
+        inicio, frecuencia = self.inicio_programados, self.frecuencia_programados
+        aplicaciones = np.where(
+            (inicio >= 1) & (inicio <= n) & (frecuencia >= 1),
+            (n - inicio) // np.maximum(frecuencia, 1) + 1, 0
+        )
+        periodo = self.periodo_adhoc
+        unico = ((periodo >= 1) & (periodo <= n)).astype(np.int64)
+
+        resumen = pd.DataFrame({
+            'Tipo': ['Programado'] * len(inicio) + ['Ad-hoc'] * len(periodo),
+            'Período': np.concatenate([inicio, periodo]),
+            'Monto': np.concatenate([self.monto_programados, self.monto_adhoc]),
+            'Frecuencia': np.concatenate([frecuencia, np.zeros(len(periodo), dtype=np.int64)]),
+            'Aplicaciones': np.concatenate([aplicaciones, unico]),
+        })
+        resumen['Total Programado'] = resumen['Monto'] * resumen['Aplicaciones']
+        return resumen
+
+    def __repr__(self):
+        return (f"IndiceAbonos({len(self.inicio_programados)} programados, {len(self.periodo_adhoc)} ad-hoc, "
+                f"{len(self.periodos)} períodos con abono, total={self.total:,.2f})")
@@ -0,0 +1,184 @@
+"""
+Kernel de la recurrencia del saldo con abonos extras
+Con abonos el saldo depende de la trayectoria (un abono puede acortar el
+plazo). Si Numba está instalado la recurrencia se compila (kernel_numba) y se
+recorre crédito por crédito, en paralelo desde el hilo principal; si no, se
+usa la versión NumPy que avanza período a período sobre todo el lote. Ambas
+hacen las mismas operaciones en el mismo orden y producen columnas
+idénticas. La versión por eventos resuelve la misma recurrencia en forma
+cerrada, sin recorrer períodos, y coincide con ellas al centavo.
+
+La cuota de cada período sigue la regla pago_interesₖ·interés + cuotaₖ, que
+cubre todos los sistemas del motor: en el francés pago_interes es 0 y la cuota
+la anualidad; en el alemán, 1 y el capital constante; en el americano y la
+gracia de capital, 1 y 0; en la gracia total, 0 y 0. Sin pago_interes (o con
+tasa y cuota por crédito) es el francés de siempre
+"""
+
+import importlib.util
+import os
+import threading
+
+import numpy as np
+
+from .motor import saldo_tras_pagos
+
+# Saldo por debajo del cual el crédito se considera cancelado
+SALDO_MINIMO = 0.005
+
+# Numba es opcional y se importa solo al usar el kernel compilado (kernel_numba);
+# AMORTIZACION_SIN_NUMBA=1 fuerza la versión NumPy (útil para comparar)
+NUMBA_DISPONIBLE = (not os.environ.get('AMORTIZACION_SIN_NUMBA')
+                    and importlib.util.find_spec('numba') is not None)
+
+# Créditos por lote hasta los que la forma por eventos supera a la recurrencia
+# NumPy: en lotes pequeños domina el bucle por período en Python; en lotes
+# grandes, las exponenciales de la forma cerrada en cada celda
+LOTE_EVENTOS = 256
+
+
+def por_periodo(valor, forma):
+    """
+    Parámetro por crédito (L) o por período (L, N) como matriz (L, N), sin copiar
+
+    None es una matriz de ceros (el pago_interes del sistema francés).
+    """
+    if valor is None:
+        return np.broadcast_to(0.0, forma)
+    valor = np.asarray(valor, dtype=float)
+    return np.broadcast_to(valor[:, None] if valor.ndim == 1 else valor, forma)
+
+
+def recurrencia_numpy(monto, tasa, num_pagos, abonos, cuota, pago_interes=None):
+    """
+    Recurrencia vectorizada sobre el lote: un paso de NumPy por período
+
+    Args:
+        monto: arreglo float de longitud L
+        tasa, cuota: arreglos float por crédito (L) o por período (L, N)
+        num_pagos: arreglo int64 de longitud L
+        abonos: matriz (L, N) de abonos por período
+        pago_interes: matriz (L, N) con la fracción del interés que se suma
+            a la cuota de cada período (por defecto 0: sistema francés)
+
+    Returns:
+        (columnas, periodos): matrices (L, N) sin redondear en el orden
+        Saldo_Inicial, Cuota, Interés, Capital, Abono_Extra, Saldo_Final,
+        como arreglo (6, L, N), y los períodos efectivos de cada crédito
+    """
+    creditos, max_pagos = abonos.shape
+    tasa, cuota, pago_interes = (por_periodo(valor, abonos.shape) for valor in (tasa, cuota, pago_interes))
+    columnas = np.zeros((6, creditos, max_pagos))
+    periodos = np.zeros(creditos, dtype=np.int64)
+    saldo = monto.copy()
+
+    for k in range(max_pagos):
+        activo = (saldo > SALDO_MINIMO) & (k < num_pagos)
+        if not activo.any():
+            break
+
+        interes = saldo * tasa[:, k]
+        ultimo = k == num_pagos - 1
+        cuota_k = np.where(ultimo, saldo + interes,
+                           np.minimum(pago_interes[:, k] * interes + cuota[:, k], saldo + interes))
+        capital = cuota_k - interes
+        restante = saldo - capital
+        abono = np.minimum(abonos[:, k], restante)
+        saldo_final = restante - abono
+
+        for posicion, valor in enumerate((saldo, cuota_k, interes, capital, abono, saldo_final)):
+            columnas[posicion, :, k] = np.where(activo, valor, 0.0)
+
+        periodos += activo
+        saldo = np.where(activo, saldo_final, saldo)
+
+    return columnas, periodos
+
+
+def recurrencia_numba(monto, tasa, num_pagos, abonos, cuota, pago_interes=None):
+    """
+    Recurrencia compilada con Numba (mismo contrato que recurrencia_numpy)
+
+    Desde el hilo principal recorre los créditos en paralelo; desde otros
+    hilos (Streamlit, la cola de trabajos) usa la versión serial compilada.
+    """
+    if not NUMBA_DISPONIBLE:
+        raise RuntimeError("Numba no está disponible; use recurrencia_numpy")
+    from . import kernel_numba
+
+    creditos, max_pagos = abonos.shape
+    columnas = np.zeros((6, creditos, max_pagos))
+    periodos = np.zeros(creditos, dtype=np.int64)
+    if threading.current_thread() is threading.main_thread():
+        compilada = kernel_numba.recurrencia_paralela
+    else:
+        compilada = kernel_numba.recurrencia_serial
+    tasa, cuota, pago_interes = (por_periodo(valor, abonos.shape) for valor in (tasa, cuota, pago_interes))
+    compilada(monto, tasa, num_pagos, np.ascontiguousarray(abonos), cuota, pago_interes, columnas, periodos)
+    return columnas, periodos
+
+
+def recurrencia_eventos(monto, tasa, num_pagos, abonos, cuota):
+    """
+    Recurrencia en forma cerrada por eventos de abono (mismo contrato que
+    recurrencia_numpy con tasa y cuota por crédito y sin pago_interes), sin
+    bucle por período
+
+    Mientras el crédito no se cancela, cada abono aⱼ descuenta aⱼ·(1+r)^(k-j)
+    del saldo de la anualidad en los períodos k ≥ j, así que con los productos
+    acumulados de (1+r) entre eventos el saldo es
+    Bₖ = B⁰ₖ - (1+r)ᵏ·Σⱼ₍ⱼ≤ₖ₎ aⱼ·(1+r)^-j. El período de cancelación es el
+    primero con saldo ≤ SALDO_MINIMO: se cuentan los períodos cuyo mínimo
+    acumulado del saldo sigue por encima (el mínimo acumulado hace la fila no
+    creciente). Las columnas se truncan ahí y en la fila de cancelación la
+    cuota y el abono se limitan al saldo, con las reglas de la recurrencia.
+    """
+    creditos, max_pagos = abonos.shape
+    k = np.arange(1, max_pagos + 1)[None, :]
+    tasa_col, n_col, cuota_col = tasa[:, None], num_pagos[:, None], cuota[:, None]
+
+    # Exponentes acotados al plazo: después del plazo no hay períodos activos
+    crecimiento = np.exp(np.minimum(k, n_col) * np.log1p(tasa_col))
+    descontados = np.cumsum(abonos / crecimiento, axis=1)
+    saldo_final = (saldo_tras_pagos(monto[:, None], tasa_col, n_col, k, cuota_col)
+                   - crecimiento * descontados)
+
+    # Período de cancelación: primer saldo ≤ SALDO_MINIMO (el mínimo acumulado
+    # hace la fila no creciente aunque la cuota no amortice) o el plazo
+    vigentes = (np.minimum.accumulate(saldo_final, axis=1) > SALDO_MINIMO).sum(axis=1)
+    periodos = np.where(monto > SALDO_MINIMO, np.minimum(vigentes + 1, num_pagos), 0)
+
+    saldo = np.concatenate([monto[:, None], saldo_final[:, :-1]], axis=1)
+    interes = saldo * tasa_col
+    cuota_k = np.where(k == n_col, saldo + interes, np.minimum(cuota_col, saldo + interes))
+    capital = cuota_k - interes
+    restante = saldo - capital
+    abono = np.minimum(abonos, restante)
+    # Antes de la cancelación el saldo final es el inicial del período siguiente
+    saldo_final = np.where(k < periodos[:, None], saldo_final, restante - abono)
+
+    activo = k <= periodos[:, None]
+    columnas = np.zeros((6, creditos, max_pagos))
+    for posicion, valor in enumerate((saldo, cuota_k, interes, capital, abono, saldo_final)):
+        columnas[posicion] = np.where(activo, valor, 0.0)
+    return columnas, periodos.astype(np.int64)
+
+
+def recurrencia_abonos(monto, tasa, num_pagos, abonos, cuota, usar_numba=None, pago_interes=None):
+    """
+    Recurrencia con el kernel disponible (Numba si está instalado)
+
+    `usar_numba` fuerza una de las dos versiones período a período. Por
+    defecto se usa Numba cuando está disponible; si no, los lotes de hasta
+    LOTE_EVENTOS créditos (una tabla del aplicativo) del sistema francés van
+    por la forma por eventos y el resto por la recurrencia NumPy.
+    """
+    if usar_numba is None:
+        frances = pago_interes is None and np.ndim(tasa) == np.ndim(cuota) == 1
+        if NUMBA_DISPONIBLE:
+            usar_numba = True
+        elif frances and abonos.shape[0] <= LOTE_EVENTOS:
+            return recurrencia_eventos(monto, tasa, num_pagos, abonos, cuota)
+    if usar_numba:
+        return recurrencia_numba(monto, tasa, num_pagos, abonos, cuota, pago_interes)
+    return recurrencia_numpy(monto, tasa, num_pagos, abonos, cuota, pago_interes)
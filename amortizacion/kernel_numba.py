@@ -0,0 +1,60 @@
+"""
+Recurrencia del saldo con abonos compilada con Numba
+Solo la importa kernel.py la primera vez que se usa el kernel compilado, de
+modo que importar el paquete no carga numba ni llvmlite. La versión paralela
+reparte los créditos entre hilos de Numba y se usa solo desde el hilo
+principal: lanzada desde otro hilo (el del script de Streamlit o la cola de
+trabajos) la capa de hilos puede dejar el proceso colgado al salir, así que
+ahí se usa la versión serial, que hace las mismas operaciones
+"""
+
+import numba
+
+from .kernel import SALDO_MINIMO
+
+
+@numba.njit(cache=True)
+def _recorrer_credito(i, monto, tasa, num_pagos, abonos, cuota, pago_interes, columnas, periodos):
+    """
+    Recurrencia escalar de un crédito (tasa, cuota y pago_interes por período)
+    """
+    saldo = monto[i]
+    for k in range(min(num_pagos[i], abonos.shape[1])):
+        if saldo <= SALDO_MINIMO:
+            break
+        interes = saldo * tasa[i, k]
+        if k == num_pagos[i] - 1:
+            cuota_k = saldo + interes
+        else:
+            cuota_k = min(pago_interes[i, k] * interes + cuota[i, k], saldo + interes)
+        capital = cuota_k - interes
+        restante = saldo - capital
+        abono = min(abonos[i, k], restante)
+        saldo_final = restante - abono
+
+        columnas[0, i, k] = saldo
+        columnas[1, i, k] = cuota_k
+        columnas[2, i, k] = interes
+        columnas[3, i, k] = capital
+        columnas[4, i, k] = abono
+        columnas[5, i, k] = saldo_final
+        periodos[i] += 1
+        saldo = saldo_final
+
+
+@numba.njit(parallel=True, cache=True)
+def recurrencia_paralela(monto, tasa, num_pagos, abonos, cuota, pago_interes, columnas, periodos):
+    """
+    Un crédito por iteración paralela (solo desde el hilo principal)
+    """
+    for i in numba.prange(abonos.shape[0]):
+        _recorrer_credito(i, monto, tasa, num_pagos, abonos, cuota, pago_interes, columnas, periodos)
+
+
+@numba.njit(cache=True)
+def recurrencia_serial(monto, tasa, num_pagos, abonos, cuota, pago_interes, columnas, periodos):
+    """
+    Créditos en secuencia, segura desde cualquier hilo
+    """
+    for i in range(abonos.shape[0]):
+        _recorrer_credito(i, monto, tasa, num_pagos, abonos, cuota, pago_interes, columnas, periodos)
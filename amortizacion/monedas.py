@@ -0,0 +1,181 @@
+"""
+Créditos en otras monedas o en unidades indexadas (UVR, inflación)
+La tabla se calcula en la unidad del crédito y se lleva a moneda local
+multiplicando todas las columnas monetarias por el valor proyectado de la
+unidad en cada fecha de pago, en una sola operación sobre la matriz
+(créditos × períodos)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .cargos import COLUMNA_TOTAL, CargoFijo, aplicar_cargos, columnas_cargos
+from .motor import COLUMNAS_MONTO
+
+# Moneda del aplicativo: los créditos sin unidad no se convierten
+MONEDA_LOCAL = ''
+
+COLUMNA_VALOR = 'Valor_Unidad'
+SUFIJO_LOCAL = '_Local'
+
+# Decimales con que se publica el valor de la unidad (la UVR usa cuatro); la
+# conversión usa el valor publicado para que Cuota × Valor_Unidad = Cuota_Local
+DECIMALES_VALOR = 4
+
+
+class CurvaIndice:
+    """
+    Valor proyectado de una unidad en moneda local a lo largo del tiempo
+
+    Entre dos puntos de la curva el valor se interpola en forma geométrica
+    (variación diaria constante, como se construye la UVR); antes del primer
+    punto y después del último se extrapola con la variación del tramo
+    extremo. Una curva de un solo punto es un valor constante.
+    """
+
+    def __init__(self, nombre, fechas, valores):
+        """
+        Inicializa la curva; fechas repetidas conservan el último valor
+        """
+        fechas = np.asarray(fechas, dtype='datetime64[D]')
+        valores = np.asarray(valores, dtype=float)
+        if len(fechas) == 0:
+            raise ValueError(f"La curva '{nombre}' no tiene puntos")
+        if not (valores > 0).all():
+            raise ValueError(f"La curva '{nombre}' tiene valores no positivos")
+
+        # Último valor de cada fecha, en orden cronológico
+        orden = np.argsort(fechas, kind='stable')[::-1]
+        fechas, posiciones = np.unique(fechas[orden], return_index=True)
+        valores = valores[orden][posiciones]
+
+        self.nombre = nombre
+        self.fechas = fechas
+        self.valores = valores
+        self._dias = fechas.astype(np.int64)
+        self._logaritmos = np.log(valores)
+
+    def __len__(self):
+        return len(self.fechas)
+
+    def valores_en(self, fechas):
+        """
+        Valor de la unidad en cada fecha (acepta arreglos de cualquier forma)
+        """
+        dias = np.asarray(fechas, dtype='datetime64[D]').astype(np.int64)
+        if len(self._dias) == 1:
+            return np.full(dias.shape, self.valores[0])
+
+        d, log = self._dias, self._logaritmos
+        resultado = np.interp(dias, d, log)
+        pendiente_inicial = (log[1] - log[0]) / (d[1] - d[0])
+        pendiente_final = (log[-1] - log[-2]) / (d[-1] - d[-2])
+        resultado = np.where(dias < d[0], log[0] + (dias - d[0]) * pendiente_inicial, resultado)
+        resultado = np.where(dias > d[-1], log[-1] + (dias - d[-1]) * pendiente_final, resultado)
+        return np.exp(resultado)
+
+    def valor_publicado(self, fechas):
+        """
+        Valor redondeado a DECIMALES_VALOR, el que se usa para convertir
+        """
+        return np.round(self.valores_en(fechas), DECIMALES_VALOR)
+
+    def __repr__(self):
+        return (f"CurvaIndice({self.nombre!r}, {len(self)} puntos, "
+                f"{self.fechas[0]} a {self.fechas[-1]})")
+
+
+def cargar_curvas(ruta):
+    """
+    Carga un archivo local de curvas con líneas 'unidad,fecha,valor'
+
+    Se ignoran líneas vacías, comentarios que empiezan con '#' y un
+    encabezado opcional. Retorna {unidad: CurvaIndice}; sin archivo, un dict
+    vacío.
+    """
+    if not ruta or not os.path.exists(ruta):
+        return {}
+
+    puntos = pd.read_csv(ruta, comment='#', header=None, names=['unidad', 'fecha', 'valor'],
+                         skipinitialspace=True, dtype=str)
+    puntos = puntos[puntos['unidad'].str.strip().str.lower() != 'unidad'].dropna()
+    puntos['unidad'] = puntos['unidad'].str.strip()
+    puntos['valor'] = pd.to_numeric(puntos['valor'])
+    return {
+        unidad: CurvaIndice(unidad, grupo['fecha'].str.strip().to_numpy(dtype='datetime64[D]'),
+                            grupo['valor'].to_numpy())
+        for unidad, grupo in puntos.groupby('unidad', sort=True)
+    }
+
+
+def convertir_columnas(columnas, fechas, curva, nombres=COLUMNAS_MONTO):
+    """
+    Columnas (créditos × períodos) en unidades → moneda local
+
+    `fechas` tiene la misma forma que las columnas (fecha de pago de cada
+    período). Retorna (columnas en moneda local redondeadas a 2 decimales,
+    valor de la unidad por período).
+    """
+    valor = curva.valor_publicado(fechas)
+    return {nombre: np.round(columnas[nombre] * valor, 2) for nombre in nombres}, valor
+
+
+def tabla_en_moneda_local(tabla, curva):
+    """
+    Agrega a una tabla en unidades su equivalente en moneda local
+
+    Agrega 'Valor_Unidad' (valor de la unidad en la fecha de pago) y una
+    columna '<columna>_Local' por cada columna monetaria y de cargos; las
+    columnas originales se conservan en la unidad del crédito.
+    """
+    if tabla is None or curva is None:
+        return tabla
+
+    nombres = [nombre for nombre in COLUMNAS_MONTO if nombre in tabla.columns] + columnas_cargos(tabla)
+    fechas = pd.to_datetime(tabla['Fecha']).to_numpy(dtype='datetime64[D]')
+    valores = {nombre: tabla[nombre].to_numpy(dtype=float) for nombre in nombres}
+    locales, valor = convertir_columnas(valores, fechas, curva, nombres)
+
+    resultado = tabla.copy()
+    resultado[COLUMNA_VALOR] = valor
+    for nombre in nombres:
+        resultado[nombre + SUFIJO_LOCAL] = locales[nombre]
+    return resultado
+
+
+def aplicar_cargos_en_unidad(tabla, capas, curva):
+    """
+    Cargos de una tabla de un crédito en unidades, con su equivalente local
+
+    Las comisiones fijas (CargoFijo) se pactan en moneda local: en la unidad
+    del crédito valen comisión / valor de la unidad en cada fecha de pago, y
+    su columna '_Local' conserva el monto cobrado sin pasar por el redondeo
+    de la conversión. Sin curva equivale a aplicar_cargos.
+    """
+    if tabla is None or curva is None:
+        return aplicar_cargos(tabla, capas)
+
+    fechas = pd.to_datetime(tabla['Fecha']).to_numpy(dtype='datetime64[D]')
+    valor = curva.valor_publicado(fechas)
+    fijas = [capa for capa in capas if isinstance(capa, CargoFijo)]
+    en_unidad = [CargoFijo(capa.valor / valor, nombre=capa.nombre) if capa in fijas else capa
+                 for capa in capas]
+
+    resultado = tabla_en_moneda_local(aplicar_cargos(tabla, en_unidad), curva)
+    if fijas:
+        for capa in fijas:
+            resultado[capa.nombre + SUFIJO_LOCAL] = np.round(np.broadcast_to(capa.valor, len(tabla)), 2)
+        locales = [nombre + SUFIJO_LOCAL for nombre in columnas_cargos(resultado) if nombre != COLUMNA_TOTAL]
+        resultado[COLUMNA_TOTAL + SUFIJO_LOCAL] = np.round(resultado[locales].sum(axis=1), 2)
+    return resultado
+
+
+def columnas_locales(tabla):
+    """
+    Nombres de las columnas en moneda local agregadas por tabla_en_moneda_local
+    """
+    if tabla is None:
+        return []
+    return [columna for columna in tabla.columns if str(columna).endswith(SUFIJO_LOCAL)]
@@ -0,0 +1,140 @@
+"""
+Simulación de mora sobre las tablas del motor
+Aplica un patrón de pagos (booleano por período o montos pagados) a la tabla
+contractual y calcula, para lotes completos de créditos, el interés de mora,
+el saldo vencido con la mora capitalizada y el saldo total resultante.
+
+El saldo vencido sigue Vₖ = max(Vₖ₋₁·(1+m) + Cₖ - Pₖ, 0): cada pago cubre
+primero lo vencido con su mora y luego la cuota del período, y lo que exceda
+lo exigible no se aplica (los prepagos son abonos extras). Dividiendo por
+(1+m)ᵏ la recurrencia queda Uₖ = max(Uₖ₋₁ + xₖ, 0), cuya solución es la suma
+acumulada menos su mínimo acumulado, así que no hay bucle por período
+"""
+
+import numpy as np
+import pandas as pd
+
+from .kernel import SALDO_MINIMO
+from .motor import MotorAmortizacion
+
+COLUMNAS_MORA = ['Pago', 'Interés_Mora', 'Saldo_Vencido', 'Saldo_Total', 'Altura_Mora']
+
+
+def columnas_mora(cuotas, saldos, pagos, tasa_mora):
+    """
+    Mora de un lote a partir de su tabla contractual
+
+    Args:
+        cuotas, saldos: matrices (L, N) de cuota y saldo final contractuales
+            (cero después del plazo; N puede superar el plazo para proyectar
+            la mora posterior al vencimiento)
+        pagos: matriz (L, N) booleana (True: se pagó la cuota del período) o
+            con el monto pagado en cada período
+        tasa_mora: tasa de mora por período, escalar o vector de longitud L
+
+    Returns:
+        dict de matrices (L, N) con las columnas de COLUMNAS_MORA: pago
+        aplicado, interés de mora del período, saldo vencido al cierre (con la
+        mora capitalizada) y saldo total, redondeados a 2 decimales, y la
+        altura de mora (períodos consecutivos con saldo vencido)
+    """
+    cuotas = np.atleast_2d(np.asarray(cuotas, dtype=float))
+    saldos = np.atleast_2d(np.asarray(saldos, dtype=float))
+    pagos = np.atleast_2d(np.asarray(pagos))
+    if pagos.shape != cuotas.shape:
+        raise ValueError(f"El patrón de pagos {pagos.shape} no coincide con la tabla {cuotas.shape}")
+    if pagos.dtype == bool:
+        pagos = np.where(pagos, cuotas, 0.0)
+    pagos = pagos.astype(float)
+    mora = np.broadcast_to(np.asarray(tasa_mora, dtype=float), cuotas.shape[:1])[:, None]
+
+    k = np.arange(1, cuotas.shape[1] + 1)[None, :]
+    crecimiento = np.exp(k * np.log1p(mora))
+    acumulado = np.cumsum((cuotas - pagos) / crecimiento, axis=1)
+    minimo = np.minimum(np.minimum.accumulate(acumulado, axis=1), 0.0)
+    vencido = crecimiento * (acumulado - minimo)
+
+    anterior = np.concatenate([np.zeros((len(cuotas), 1)), vencido[:, :-1]], axis=1)
+    interes_mora = anterior * mora
+    aplicado = anterior + interes_mora + cuotas - vencido
+
+    # Altura: períodos desde el último cierre sin saldo vencido
+    en_mora = vencido > SALDO_MINIMO
+    al_dia = np.maximum.accumulate(np.where(en_mora, 0, k), axis=1)
+    altura = np.where(en_mora, k - al_dia, 0)
+
+    valores = (aplicado, interes_mora, vencido, saldos + vencido)
+    columnas = {nombre: np.round(valor, 2) for nombre, valor in zip(COLUMNAS_MORA, valores)}
+    columnas['Altura_Mora'] = altura
+    return columnas
+
+
+def simular_mora(monto, tasa_periodo, num_pagos, pagos, tasa_mora):
+    """
+    Mora de un lote de créditos del sistema francés con el patrón de pagos dado
+
+    La tabla contractual sale del motor vectorizado (la misma de
+    CalculadoraAmortizacion). `pagos` es (L, N) con N mayor o igual al plazo
+    más largo; los períodos adicionales proyectan la mora después del
+    vencimiento.
+
+    Returns:
+        dict de matrices (L, N) con 'Cuota' y 'Saldo_Final' contractuales y
+        las columnas de COLUMNAS_MORA
+    """
+    motor = MotorAmortizacion(monto, tasa_periodo, num_pagos)
+    pagos = np.atleast_2d(np.asarray(pagos))
+    relleno = pagos.shape[1] - motor.max_pagos
+    if relleno < 0:
+        raise ValueError(f"El patrón de pagos cubre {pagos.shape[1]} períodos y el plazo más "
+                         f"largo es {motor.max_pagos}")
+
+    contractual = {nombre: np.pad(motor.columnas()[nombre], ((0, 0), (0, relleno)))
+                   for nombre in ('Cuota', 'Saldo_Final')}
+    return {**contractual, **columnas_mora(contractual['Cuota'], contractual['Saldo_Final'],
+                                           pagos, tasa_mora)}
+
+
+def tabla_mora(tabla, pagos, tasa_mora):
+    """
+    Tabla de un crédito con las columnas de mora según su patrón de pagos
+
+    Sirve para cualquier tabla con 'Cuota' y 'Saldo_Final' (básica, del motor
+    o con abonos). Los períodos que el patrón no cubre se consideran pagados.
+    """
+    pagos = np.asarray(pagos)
+    n = len(tabla)
+    if len(pagos) > n:
+        raise ValueError(f"El patrón de pagos cubre {len(pagos)} períodos y la tabla tiene {n}")
+    cuotas = tabla['Cuota'].to_numpy(dtype=float)
+    if pagos.dtype == bool:
+        pagos = np.concatenate([pagos, np.ones(n - len(pagos), dtype=bool)])
+    else:
+        pagos = np.concatenate([pagos.astype(float), cuotas[len(pagos):]])
+
+    columnas = columnas_mora(cuotas[None, :], tabla['Saldo_Final'].to_numpy(dtype=float)[None, :],
+                             pagos[None, :], tasa_mora)
+    tabla = tabla.copy()
+    for nombre in COLUMNAS_MORA:
+        tabla[nombre] = columnas[nombre][0]
+    return tabla
+
+
+def resumen_mora(columnas, periodo=None):
+    """
+    Estado de mora de cada crédito al cierre de `periodo` (por defecto el último)
+
+    Returns:
+        DataFrame con una fila por crédito: saldo vencido, altura de mora,
+        interés de mora causado hasta el período y saldo total
+    """
+    vencido = columnas['Saldo_Vencido']
+    posicion = vencido.shape[1] - 1 if periodo is None else int(periodo) - 1
+    if not 0 <= posicion < vencido.shape[1]:
+        raise ValueError(f"Período {periodo} fuera del horizonte de 1 a {vencido.shape[1]}")
+    return pd.DataFrame({
+        'Saldo_Vencido': vencido[:, posicion],
+        'Altura_Mora': columnas['Altura_Mora'][:, posicion],
+        'Interés_Mora': np.round(columnas['Interés_Mora'][:, :posicion + 1].sum(axis=1), 2),
+        'Saldo_Total': columnas['Saldo_Total'][:, posicion],
+    })
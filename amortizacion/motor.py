@@ -0,0 +1,497 @@
+"""
+Motor vectorizado de tablas de amortización
+Calcula lotes completos de créditos con operaciones de NumPy, sin bucles por fila
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Esquema de columnas compartido con CalculadoraAmortizacion y ManejoAbonos
+COLUMNAS = [
+    'Período', 'Fecha', 'Saldo_Inicial', 'Cuota', 'Interés',
+    'Capital', 'Abono_Extra', 'Saldo_Final'
+]
+
+COLUMNAS_MONTO = ['Saldo_Inicial', 'Cuota', 'Interés', 'Capital', 'Abono_Extra', 'Saldo_Final']
+
+
+def a_centavos(valores):
+    """
+    Convierte montos en pesos a centavos enteros (redondeo half-up)
+
+    Falla con ValueError si algún monto no es finito o no cabe en int64, en
+    lugar de convertirlo en silencio a un entero sin sentido.
+    """
+    return _redondear(np.asarray(valores, dtype=float) * 100)
+
+
+def _redondear(centavos):
+    """
+    Redondea centavos fraccionarios a int64 (half-up), verificando el rango
+    """
+    centavos = np.floor(centavos + 0.5)
+    if not (np.abs(centavos) < 2.0 ** 63).all():
+        raise ValueError("Montos no representables en centavos enteros (no finitos o fuera de int64)")
+    return centavos.astype(np.int64)
+
+
+def cuota_fija(monto, tasa_periodo, num_pagos):
+    """
+    Cuota fija del sistema francés: PMT = PV × r / (1 - (1+r)⁻ⁿ)
+
+    Acepta escalares o arreglos; con tasa cero la cuota es monto / n.
+    """
+    monto = np.asarray(monto, dtype=float)
+    tasa = np.asarray(tasa_periodo, dtype=float)
+    n = np.asarray(num_pagos, dtype=float)
+
+    con_tasa = tasa > 0
+    tasa_segura = np.where(con_tasa, tasa, 1.0)
+    cuota = np.where(
+        con_tasa,
+        monto * tasa_segura / (1 - (1 + tasa_segura) ** -n),
+        monto / n
+    )
+    return cuota if cuota.ndim else float(cuota)
+
+
+def saldos_cerrados(monto, tasa_periodo, cuota, periodos):
+    """
+    Saldo tras k pagos de una cuota constante, en forma cerrada:
+    Bₖ = PV·(1+r)ᵏ - C·((1+r)ᵏ - 1) / r
+
+    `monto`, `tasa_periodo` y `cuota` son vectores columna (L, 1);
+    `periodos` es una fila (1, N). El resultado tiene forma (L, N).
+    """
+    con_tasa = tasa_periodo > 0
+    tasa_segura = np.where(con_tasa, tasa_periodo, 1.0)
+    crecimiento = (1 + tasa_segura) ** periodos
+    return np.where(
+        con_tasa,
+        monto * crecimiento - cuota * (crecimiento - 1) / tasa_segura,
+        monto - cuota * periodos
+    )
+
+
+def saldo_tras_pagos(monto, tasa_periodo, num_pagos, pagos, cuota=None):
+    """
+    Saldo después de `pagos` cuotas fijas, sin abonos
+
+    Usa la forma sin cancelación del motor, Bₖ = PV·(1 - (1+r)^(k-n)) / (1 - (1+r)^-n),
+    que conserva la precisión con tasas altas a plazos largos. Con una cuota
+    distinta de la anualidad se suma (C* - C)·((1+r)ᵏ - 1)/r.
+    """
+    monto = np.asarray(monto, dtype=float)
+    tasa = np.asarray(tasa_periodo, dtype=float)
+    n = np.asarray(num_pagos, dtype=float)
+    k = np.asarray(pagos, dtype=float)
+
+    con_tasa = tasa > 0
+    tasa_segura = np.where(con_tasa, tasa, 1.0)
+    log_crecimiento = np.log1p(tasa_segura)
+    saldo = np.where(
+        con_tasa,
+        monto * np.expm1((k - n) * log_crecimiento) / np.expm1(-n * log_crecimiento),
+        monto * (1 - k / n)
+    )
+    if cuota is not None:
+        diferencia = cuota_fija(monto, tasa, num_pagos) - np.asarray(cuota, dtype=float)
+        saldo = saldo + diferencia * np.where(con_tasa, np.expm1(k * log_crecimiento) / tasa_segura, k)
+    return saldo
+
+
+# Sistemas de amortización admitidos por el motor
+SISTEMAS = ('frances', 'aleman', 'americano')
+
+# Tipos de período de gracia: solo capital (se pagan intereses) o total
+# (no hay pago y los intereses se capitalizan)
+TIPOS_GRACIA = ('capital', 'total')
+
+
+class MotorAmortizacion:
+    """
+    Motor vectorizado para lotes de créditos
+
+    Todos los parámetros aceptan escalares o arreglos de igual longitud; cada
+    posición representa un crédito. Las columnas se calculan como matrices
+    (créditos × períodos) rellenas con cero después del último pago.
+
+    Sistemas de amortización (`sistema`, uno por crédito si se desea):
+    - 'frances': cuota fija (PMT)
+    - 'aleman': abono a capital constante, cuota decreciente
+    - 'americano': solo intereses y el capital completo en el último pago
+
+    Los primeros `periodos_gracia` pagos pueden ser de gracia de capital
+    (cuota = interés) o total (sin pago; el interés se capitaliza y aparece
+    como Capital negativo). El sistema elegido amortiza el saldo en los
+    períodos restantes, siempre con el mismo esquema de columnas.
+
+    Con `exacto=True` los montos se manejan en centavos enteros (int64): el
+    interés de cada período se redondea sobre el saldo entero, el saldo final
+    es exactamente cero y el balance se conserva en cada fila. En el francés
+    la cuota es nivelada y la última absorbe el residuo del redondeo; con
+    `cuota_nivelada=False` la cuota se recalcula al centavo en cada período
+    sobre el saldo y los períodos restantes (ver _columnas_centavos).
+
+    Sin `calendario` las fechas se estiman sumando `dias_periodo` días por
+    período. Con un CalendarioPagos las fechas siguen meses reales y, si el
+    calendario define una base de días, el interés de cada período se calcula
+    con la tasa equivalente a su fracción de año real.
+    """
+
+    def __init__(self, monto, tasa_periodo, num_pagos, fecha_inicio=None,
+                 exacto=False, dias_periodo=30, calendario=None,
+                 sistema='frances', periodos_gracia=0, tipo_gracia='capital',
+                 cuota_nivelada=True):
+        """
+        Inicializa el lote de créditos
+        """
+        (self.monto, self.tasa_periodo, self.num_pagos, self.sistema,
+         self.periodos_gracia, self.tipo_gracia) = (
+            np.atleast_1d(arreglo) for arreglo in np.broadcast_arrays(
+                np.asarray(monto, dtype=float),
+                np.asarray(tasa_periodo, dtype=float),
+                np.asarray(num_pagos, dtype=np.int64),
+                np.asarray(sistema),
+                np.asarray(periodos_gracia, dtype=np.int64),
+                np.asarray(tipo_gracia)
+            )
+        )
+
+        if not np.isin(self.sistema, SISTEMAS).all():
+            raise ValueError(f"Sistema de amortización no soportado; use uno de {SISTEMAS}")
+        if not np.isin(self.tipo_gracia, TIPOS_GRACIA).all():
+            raise ValueError(f"Tipo de gracia no soportado; use uno de {TIPOS_GRACIA}")
+        if ((self.periodos_gracia < 0) | (self.periodos_gracia >= self.num_pagos)).any():
+            raise ValueError("Los períodos de gracia deben ser menores que el número de pagos")
+
+        self.fecha_inicio = datetime.now() if fecha_inicio is None else fecha_inicio
+        self.exacto = exacto
+        self.cuota_nivelada = cuota_nivelada
+        self.dias_periodo = dias_periodo
+        self.calendario = calendario
+        self._columnas = None
+        self._tasas_cache = None
+
+    @property
+    def num_creditos(self):
+        return len(self.monto)
+
+    @property
+    def max_pagos(self):
+        return int(self.num_pagos.max()) if self.num_creditos else 0
+
+    @property
+    def cuota_fija(self):
+        """
+        Cuota del primer período de amortización de cada crédito
+
+        En el sistema francés es la cuota fija; en el alemán y el americano,
+        la primera cuota después de la gracia.
+        """
+        cuotas = self.columnas()['Cuota'][np.arange(self.num_creditos), self.periodos_gracia]
+        return cuotas / 100 if self.exacto else cuotas
+
+    def _inicio(self):
+        """
+        Fecha(s) de inicio como datetime64[D]
+        """
+        inicio = pd.to_datetime(np.atleast_1d(self.fecha_inicio))
+        return np.asarray(inicio.values, dtype='datetime64[D]')
+
+    def _mascara(self):
+        """
+        Matriz booleana con los períodos válidos de cada crédito
+        """
+        periodos = np.arange(1, self.max_pagos + 1)
+        return periodos[None, :] <= self.num_pagos[:, None]
+
+    def _tasas(self):
+        """
+        Tasa de interés aplicada en cada período, forma (L, N)
+
+        Sin base de días todos los períodos usan la tasa por período. Con base
+        de días la tasa se convierte a efectiva anual y se lleva a la fracción
+        de año real de cada período: rₖ = (1 + r)^(fₖ·m) - 1.
+        """
+        if self._tasas_cache is None:
+            if self.calendario is None or self.calendario.base_dias is None:
+                tasas = np.broadcast_to(self.tasa_periodo[:, None],
+                                        (self.num_creditos, self.max_pagos))
+            else:
+                fracciones = self.calendario.fracciones_anio(self._inicio(), self.max_pagos)
+                exponente = fracciones * self.calendario.frecuencia
+                tasas = (1 + self.tasa_periodo[:, None]) ** exponente - 1
+            self._tasas_cache = np.where(self._mascara(), tasas, 0.0)
+        return self._tasas_cache
+
+    def _trayectoria(self, cuota_francesa=None):
+        """
+        Saldo al inicio de cada período y abono a capital previsto por el sistema
+
+        Usa los factores acumulados Fₖ = Π(1 + rⱼ). Durante la gracia total
+        el saldo crece con Fₖ; después, con el saldo Pg al final de la gracia:
+        - francés: Bₖ = (Fₖ/Fg)·Pg·(Dₙ - Dₖ)/Dₙ, con Dₖ = Σ_g<j≤ₖ 1/Fⱼ; es la
+          forma sin cancelación de (Fₖ/Fg)·Pg - C·Fₖ·Dₖ, que pierde toda la
+          precisión cuando Fₙ es muy grande (tasas altas a plazos largos).
+          Con una cuota C distinta de la anualidad C* se suma (C* - C)·Fₖ·Dₖ
+        - alemán: Bₖ = Pg·(1 - (k - g)/m), con m = n - g
+        - americano: Bₖ = Pg
+
+        Retorna (saldo_inicial, capital, cuota_francesa), donde `capital` es
+        NaN en los períodos del sistema francés (lo fija la cuota) y en la
+        gracia total (lo fija el interés capitalizado).
+        """
+        tasas = self._tasas()
+        factores = np.cumprod(1 + tasas, axis=1)
+        factores_previos = np.concatenate([np.ones((self.num_creditos, 1)), factores[:, :-1]], axis=1)
+        filas = np.arange(self.num_creditos)
+        gracia = self.periodos_gracia
+        periodo = np.arange(self.max_pagos)[None, :]
+        en_gracia = periodo < gracia[:, None]
+
+        gracia_total = (self.tipo_gracia == 'total')[:, None]
+        factor_gracia = np.where(gracia_total[:, 0], factores_previos[filas, gracia], 1.0)
+        saldo_gracia = self.monto * factor_gracia
+        saldo_en_gracia = np.where(gracia_total, self.monto[:, None] * factores_previos, self.monto[:, None])
+
+        # Francés con gracia: se reinicia la anualidad en el período g
+        relativos = factores_previos / factores_previos[filas, gracia][:, None]
+        descuentos = np.where(self._mascara() & ~en_gracia, 1 / factores, 0.0)
+        acumulado = np.cumsum(descuentos, axis=1)
+        acumulado_previo = acumulado - descuentos
+        restantes = np.cumsum(descuentos[:, ::-1], axis=1)[:, ::-1]
+        total = acumulado[:, -1][:, None]
+        anualidad = saldo_gracia / (factores_previos[filas, gracia] * total[:, 0])
+        if cuota_francesa is None:
+            cuota_francesa = anualidad
+        saldo_frances = (relativos * saldo_gracia[:, None] * (restantes / total)
+                         + (anualidad - cuota_francesa)[:, None] * factores_previos * acumulado_previo)
+
+        plazo = (self.num_pagos - gracia)[:, None]
+        saldo_aleman = saldo_gracia[:, None] * (1 - (periodo - gracia[:, None]) / plazo)
+        capital_aleman = np.broadcast_to(saldo_gracia[:, None] / plazo, saldo_aleman.shape)
+        saldo_americano = np.broadcast_to(saldo_gracia[:, None], saldo_aleman.shape)
+
+        sistema = self.sistema[:, None]
+        saldo_inicial = np.select(
+            [en_gracia, sistema == 'frances', sistema == 'aleman'],
+            [saldo_en_gracia, saldo_frances, saldo_aleman],
+            default=saldo_americano
+        )
+        capital = np.select(
+            [en_gracia & gracia_total, en_gracia, sistema == 'frances', sistema == 'aleman'],
+            [np.nan, 0.0, np.nan, capital_aleman],
+            default=0.0
+        )
+        return saldo_inicial, capital, cuota_francesa
+
+    def plan_pagos(self):
+        """
+        Regla de pago de cada período, para recorrer la tabla con abonos extras
+
+        La cuota del período k es pago_interesₖ·interés + cuotaₖ (ver
+        kernel.py): francés, 0 y la anualidad; alemán, 1 y el capital
+        constante; americano y gracia de capital, 1 y 0; gracia total, 0 y 0.
+        Con esas reglas los abonos reducen el plazo en cualquier sistema.
+
+        Returns:
+            (tasas, cuota, pago_interes): matrices (créditos × períodos)
+        """
+        _, capital, cuota_francesa = self._trayectoria()
+        en_gracia = np.arange(self.max_pagos)[None, :] < self.periodos_gracia[:, None]
+        gracia_total = (self.tipo_gracia == 'total')[:, None]
+        sistema = self.sistema[:, None]
+
+        cuota = np.select([en_gracia, sistema == 'frances', sistema == 'aleman'],
+                          [0.0, cuota_francesa[:, None], capital], default=0.0)
+        sin_interes = np.where(en_gracia, gracia_total, sistema == 'frances')
+        return self._tasas(), cuota, np.where(sin_interes, 0.0, 1.0)
+
+    def columnas(self):
+        """
+        Calcula las columnas monetarias como matrices (créditos × períodos)
+
+        En modo exacto los valores son centavos enteros; en modo normal son
+        pesos redondeados a 2 decimales.
+        """
+        if self._columnas is None:
+            if self.exacto:
+                self._columnas = self._columnas_centavos()
+            else:
+                self._columnas = self._columnas_flotantes()
+        return self._columnas
+
+    def _periodos_franceses(self):
+        """
+        Períodos posteriores a la gracia de los créditos con sistema francés
+        """
+        amortizando = np.arange(self.max_pagos)[None, :] >= self.periodos_gracia[:, None]
+        return (self.sistema == 'frances')[:, None] & amortizando
+
+    def _cerrar_ultimo_pago(self, saldo_inicial, interes, capital, cuotas):
+        """
+        Último pago: se cancela el saldo remanente por completo
+        """
+        ultimo = self.num_pagos - 1
+        filas = np.arange(self.num_creditos)
+        capital[filas, ultimo] = saldo_inicial[filas, ultimo]
+        cuotas[filas, ultimo] = interes[filas, ultimo] + capital[filas, ultimo]
+
+    def _columnas_flotantes(self):
+        """
+        Columnas en punto flotante a partir de la trayectoria cerrada del saldo
+        """
+        mascara = self._mascara()
+        tasas = self._tasas()
+        saldo_inicial, capital, cuota_francesa = self._trayectoria()
+
+        interes = saldo_inicial * tasas
+        capital = np.select(
+            [self._periodos_franceses(), np.isnan(capital)],
+            [cuota_francesa[:, None] - interes, -interes],
+            default=capital
+        )
+        cuotas = interes + capital
+        self._cerrar_ultimo_pago(saldo_inicial, interes, capital, cuotas)
+        saldo_final = saldo_inicial - capital
+
+        columnas = {
+            'Saldo_Inicial': saldo_inicial,
+            'Cuota': cuotas,
+            'Interés': interes,
+            'Capital': capital,
+            'Abono_Extra': np.zeros_like(saldo_inicial),
+            'Saldo_Final': saldo_final,
+        }
+        return {nombre: np.where(mascara, np.round(valor, 2), 0.0)
+                for nombre, valor in columnas.items()}
+
+    def _columnas_centavos(self):
+        """
+        Columnas en centavos enteros por recurrencia período a período
+
+        Cada interés se redondea sobre el saldo entero del período y el capital
+        sale de la cuota: en el francés la cuota al centavo de los períodos
+        restantes es Cₖ = Bₖ / Aₖ, con Aₖ = (1 + Aₖ₊₁) / (1 + rₖ) el factor de
+        anualidad; en el alemán el capital es Bₖ entre los períodos restantes.
+
+        Con `cuota_nivelada` el francés conserva la cuota C del primer período y
+        el último pago cancela el saldo, que difiere de C en el residuo
+        (Bₖ - C·Aₖ)·Gₖ, con Gₖ = Π(1 + rⱼ) hasta el final. Ese residuo crece con
+        (1+r)ⁿ: si llega a superar el 1% de la cuota (tasas altas a plazos
+        largos) la cuota se renivela en Cₖ, lo que también evita saldos
+        negativos. Sin `cuota_nivelada` la cuota es Cₖ en todos los períodos y
+        varía a lo sumo en unos centavos al final. La recurrencia avanza por
+        período y es vectorizada entre créditos; el balance se conserva por
+        construcción.
+        """
+        mascara = self._mascara()
+        tasas = self._tasas()
+        num_creditos, max_pagos = mascara.shape
+        en_gracia = np.arange(max_pagos)[None, :] < self.periodos_gracia[:, None]
+        amortizando = mascara & ~en_gracia
+
+        # Factores de anualidad, de crecimiento hasta el final y períodos
+        # restantes, del último período hacia atrás
+        anualidad = np.zeros((num_creditos, max_pagos + 1))
+        crecimiento = np.ones((num_creditos, max_pagos + 1))
+        for k in range(max_pagos - 1, -1, -1):
+            anualidad[:, k] = np.where(amortizando[:, k], (1 + anualidad[:, k + 1]) / (1 + tasas[:, k]), 0.0)
+            crecimiento[:, k] = np.where(amortizando[:, k], (1 + tasas[:, k]) * crecimiento[:, k + 1], 1.0)
+        restantes = np.cumsum(amortizando[:, ::-1], axis=1)[:, ::-1]
+
+        gracia_total = self.tipo_gracia == 'total'
+        frances = self.sistema == 'frances'
+        aleman = self.sistema == 'aleman'
+        ultimo = self.num_pagos - 1
+
+        columnas = {nombre: np.zeros((num_creditos, max_pagos), dtype=np.int64) for nombre in COLUMNAS_MONTO}
+        saldo = a_centavos(self.monto)
+        cuota_francesa = np.zeros(num_creditos, dtype=np.int64)
+        for k in range(max_pagos):
+            vigente = mascara[:, k]
+            interes = np.where(vigente, _redondear(saldo * tasas[:, k]), 0)
+            recalculada = _redondear(np.divide(saldo, anualidad[:, k], out=np.zeros(num_creditos),
+                                               where=anualidad[:, k] > 0))
+            if self.cuota_nivelada:
+                residuo = (saldo - cuota_francesa * anualidad[:, k]) * crecimiento[:, k]
+                cuota_francesa = np.where(np.abs(residuo) <= cuota_francesa / 100, cuota_francesa, recalculada)
+            else:
+                cuota_francesa = recalculada
+            capital_aleman = _redondear(saldo / np.maximum(restantes[:, k], 1))
+            capital = np.select(
+                [~vigente, k == ultimo, en_gracia[:, k] & gracia_total, en_gracia[:, k], frances, aleman],
+                [0, saldo, -interes, 0, cuota_francesa - interes, capital_aleman],
+                default=0
+            )
+            columnas['Saldo_Inicial'][:, k] = np.where(vigente, saldo, 0)
+            columnas['Interés'][:, k] = interes
+            columnas['Capital'][:, k] = capital
+            columnas['Cuota'][:, k] = interes + capital
+            if (capital < 0).any():
+                # La gracia total capitaliza intereses: el saldo debe seguir cabiendo en int64
+                _redondear(saldo.astype(float) - capital)
+            saldo = saldo - capital
+            columnas['Saldo_Final'][:, k] = np.where(vigente, saldo, 0)
+
+        if (columnas['Saldo_Final'] < 0).any():
+            raise ValueError("El modo exacto produjo saldos negativos")
+        return columnas
+
+    def fechas(self):
+        """
+        Fechas de pago, forma (1, N) con una sola fecha de inicio o (L, N)
+
+        Sin calendario se suma `dias_periodo` días por período (estimación
+        heredada); con calendario se usan meses reales y días hábiles.
+        """
+        inicio = self._inicio()
+        if self.calendario is not None:
+            return self.calendario.fechas(inicio, self.max_pagos)
+        desplazamientos = np.arange(1, self.max_pagos + 1) * self.dias_periodo
+        return inicio[:, None] + desplazamientos.astype('timedelta64[D]')
+
+    @staticmethod
+    def _fila_fechas(fechas, indice):
+        return fechas[indice if len(fechas) > 1 else 0]
+
+    def tabla(self, indice=0):
+        """
+        Tabla de amortización de un crédito con el esquema estándar de columnas
+        """
+        n = int(self.num_pagos[indice])
+        columnas = self.columnas()
+        fechas = self.fechas()
+        datos = {
+            'Período': np.arange(1, n + 1),
+            'Fecha': np.datetime_as_string(self._fila_fechas(fechas, indice)[:n], unit='D'),
+        }
+        for nombre in COLUMNAS_MONTO:
+            valores = columnas[nombre][indice, :n]
+            datos[nombre] = valores / 100 if self.exacto else valores
+        tabla = pd.DataFrame(datos, columns=COLUMNAS)
+        tabla.attrs['exacto'] = self.exacto
+        return tabla
+
+    def tabla_larga(self):
+        """
+        Todas las tablas del lote en formato largo, con una columna 'Crédito'
+        """
+        mascara = self._mascara()
+        filas, cols = np.nonzero(mascara)
+        columnas = self.columnas()
+        fechas = self.fechas()
+        datos = {
+            'Crédito': filas,
+            'Período': cols + 1,
+            'Fecha': np.datetime_as_string(fechas[filas if len(fechas) > 1 else 0, cols], unit='D'),
+        }
+        for nombre in COLUMNAS_MONTO:
+            valores = columnas[nombre][filas, cols]
+            datos[nombre] = valores / 100 if self.exacto else valores
+        tabla = pd.DataFrame(datos, columns=['Crédito'] + COLUMNAS)
+        tabla.attrs['exacto'] = self.exacto
+        return tabla
@@ -0,0 +1,306 @@
+"""
+Generación paralela de tablas de portafolio en memoria compartida
+Los parámetros de los créditos y las columnas resultantes viven en bloques de
+multiprocessing.shared_memory: los procesos de trabajo reciben solo nombres y
+rangos de filas, escriben sus filas directamente en las matrices compartidas y
+el proceso principal lee el resultado como vistas NumPy o Arrow, sin copiar ni
+serializar arreglos ni DataFrames entre procesos
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .motor import COLUMNAS_MONTO
+from .portafolio import columnas_creditos, creditos_por_bloque, leer_portafolio, normalizar_bloque
+from .tasas import tasa_periodo
+
+# Parámetros por crédito que se comparten con los procesos (8 bytes cada uno)
+PARAMETROS = {
+    'monto': np.float64,
+    'tasa_periodo': np.float64,
+    'num_pagos': np.int64,
+    'abono_periodico': np.float64,
+    'abono_cada': np.int64,
+    'abono_desde': np.int64,
+}
+
+COLUMNA_PERIODOS = 'Períodos'
+
+# Tareas por proceso: más de una para repartir la carga cuando los plazos varían
+TAREAS_POR_PROCESO = 4
+
+
+def _vistas_parametros(buffer, num_creditos):
+    """
+    Vectores de parámetros sobre el buffer de entrada
+    """
+    return {
+        nombre: np.ndarray((num_creditos,), dtype=tipo, buffer=buffer, offset=i * num_creditos * 8)
+        for i, (nombre, tipo) in enumerate(PARAMETROS.items())
+    }
+
+
+def _vistas_columnas(buffer, num_creditos, max_pagos):
+    """
+    Matrices (créditos × períodos) de COLUMNAS_MONTO y el vector de períodos
+    """
+    tamano = num_creditos * max_pagos * 8
+    vistas = {
+        nombre: np.ndarray((num_creditos, max_pagos), dtype=np.float64, buffer=buffer, offset=i * tamano)
+        for i, nombre in enumerate(COLUMNAS_MONTO)
+    }
+    vistas[COLUMNA_PERIODOS] = np.ndarray((num_creditos,), dtype=np.int64, buffer=buffer,
+                                          offset=len(COLUMNAS_MONTO) * tamano)
+    return vistas
+
+
+def _tamano_columnas(num_creditos, max_pagos):
+    return max((len(COLUMNAS_MONTO) * max_pagos + 1) * num_creditos * 8, 1)
+
+
+def _iniciar_proceso():
+    """
+    Un hilo de Numba por proceso: el paralelismo lo dan los procesos
+    """
+    try:
+        import numba
+        numba.set_num_threads(1)
+    except ImportError:
+        pass
+
+
+def _calcular_filas(nombre_entrada, nombre_salida, num_creditos, max_pagos, inicio, fin):
+    """
+    Calcula las filas [inicio, fin) y las escribe en las matrices compartidas
+
+    Las filas se calculan con columnas_creditos, igual que en la proyección
+    en serie, así que el resultado no depende de cómo se reparten las filas
+    entre procesos.
+    """
+    entrada = shared_memory.SharedMemory(name=nombre_entrada)
+    salida = shared_memory.SharedMemory(name=nombre_salida)
+    try:
+        parametros = {nombre: vista[inicio:fin]
+                      for nombre, vista in _vistas_parametros(entrada.buf, num_creditos).items()}
+        destino = {nombre: vista[inicio:fin]
+                   for nombre, vista in _vistas_columnas(salida.buf, num_creditos, max_pagos).items()}
+
+        abonos = pd.DataFrame({nombre: parametros[nombre]
+                               for nombre in ('num_pagos', 'abono_periodico', 'abono_cada', 'abono_desde')})
+        columnas, periodos = columnas_creditos(parametros['monto'], parametros['tasa_periodo'],
+                                               parametros['num_pagos'], abonos)
+        ancho = columnas['Cuota'].shape[1]
+        for nombre in COLUMNAS_MONTO:
+            destino[nombre][:, :ancho] = columnas[nombre]
+            destino[nombre][:, ancho:] = 0.0
+        destino[COLUMNA_PERIODOS][:] = periodos
+
+        # Las vistas deben soltarse antes de cerrar los bloques
+        del parametros, destino
+        return fin - inicio
+    finally:
+        entrada.close()
+        salida.close()
+
+
+class TablasCompartidas:
+    """
+    Columnas de un portafolio en memoria compartida
+
+    `columnas` contiene una matriz (créditos × períodos) por cada columna de
+    COLUMNAS_MONTO y el vector 'Períodos'; todas son vistas sobre el bloque
+    compartido y dejan de ser válidas después de `liberar`. `creditos` es el
+    portafolio normalizado (sin los rechazados) en el mismo orden de filas.
+    """
+
+    def __init__(self, creditos, max_pagos, rechazados=0):
+        """
+        Reserva el bloque de salida para los créditos dados
+        """
+        self.creditos = creditos
+        self.num_creditos = len(creditos)
+        self.max_pagos = int(max_pagos)
+        self.rechazados = rechazados
+        self._memoria = shared_memory.SharedMemory(
+            create=True, size=_tamano_columnas(self.num_creditos, self.max_pagos)
+        )
+        self.columnas = _vistas_columnas(self._memoria.buf, self.num_creditos, self.max_pagos)
+
+    @property
+    def nombre(self):
+        return self._memoria.name
+
+    def __len__(self):
+        return self.num_creditos
+
+    def arrow(self):
+        """
+        Tabla Arrow con una fila por crédito y una lista de longitud fija por
+        columna (un valor por período); los datos no se copian
+        """
+        import pyarrow as pa
+
+        arreglos = [
+            pa.FixedSizeListArray.from_arrays(pa.array(self.columnas[nombre].reshape(-1)), self.max_pagos)
+            for nombre in COLUMNAS_MONTO
+        ]
+        arreglos.append(pa.array(self.columnas[COLUMNA_PERIODOS]))
+        return pa.Table.from_arrays(arreglos, names=COLUMNAS_MONTO + [COLUMNA_PERIODOS])
+
+    def liberar(self):
+        """
+        Libera el bloque compartido; las vistas obtenidas antes quedan inválidas
+        """
+        if self._memoria is None:
+            return
+        self.columnas = None
+        try:
+            self._memoria.close()
+        except BufferError:
+            # Aún hay vistas externas vivas: el mapa se libera cuando se descarten
+            pass
+        self._memoria.unlink()
+        self._memoria = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.liberar()
+
+    def __repr__(self):
+        return f"TablasCompartidas({self.num_creditos:,} créditos × {self.max_pagos} períodos)"
+
+
+class MotorParalelo:
+    """
+    Pool de procesos que genera las tablas de un portafolio en memoria compartida
+
+    El pool se crea una vez y se reutiliza entre llamadas a `generar`; usa el
+    contexto 'spawn' por defecto porque el aplicativo tiene hilos vivos
+    (la cola de trabajos) y 'fork' no es seguro en ese caso.
+    """
+
+    def __init__(self, procesos=None, contexto='spawn', presupuesto_mb=64):
+        """
+        Inicializa el motor; `presupuesto_mb` acota la memoria temporal de cada tarea
+        """
+        self.procesos = procesos or os.cpu_count() or 1
+        self.contexto = contexto
+        self.presupuesto_mb = presupuesto_mb
+        self._pool = None
+
+    def _ejecutor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.procesos,
+                mp_context=multiprocessing.get_context(self.contexto),
+                initializer=_iniciar_proceso
+            )
+        return self._pool
+
+    def generar(self, portafolio, trabajo=None):
+        """
+        Tablas de todos los créditos válidos del portafolio
+
+        Args:
+            portafolio: DataFrame, ruta o archivo con el formato de
+                proyectar_portafolio (se carga completo)
+            trabajo: Trabajo de la cola para reportar avance y permitir cancelación
+
+        Returns:
+            TablasCompartidas; el llamador debe liberarlas (o usarlas con `with`)
+        """
+        if not isinstance(portafolio, pd.DataFrame):
+            portafolio = pd.concat(list(leer_portafolio(portafolio, creditos_por_bloque(256))),
+                                   ignore_index=True)
+        creditos, rechazados = normalizar_bloque(portafolio)
+        return self.generar_normalizado(creditos, rechazados, trabajo)
+
+    def generar_normalizado(self, creditos, rechazados=0, trabajo=None):
+        """
+        Como `generar`, para un bloque ya pasado por normalizar_bloque
+        """
+        n = len(creditos)
+        max_pagos = int(creditos['num_pagos'].max()) if n else 0
+
+        entrada = shared_memory.SharedMemory(create=True, size=max(len(PARAMETROS) * n * 8, 1))
+        tablas = TablasCompartidas(creditos, max_pagos, rechazados)
+        try:
+            parametros = _vistas_parametros(entrada.buf, n)
+            parametros['tasa_periodo'][:] = tasa_periodo(
+                creditos['tasa_anual'].to_numpy(dtype=float),
+                creditos['tipo_tasa'].to_numpy(),
+                creditos['modalidad'].to_numpy(),
+                creditos['frecuencia'].to_numpy(dtype=float)
+            )
+            for nombre, tipo in PARAMETROS.items():
+                if nombre != 'tasa_periodo':
+                    parametros[nombre][:] = creditos[nombre].to_numpy(dtype=tipo)
+            del parametros
+
+            self._repartir(entrada.name, tablas, trabajo)
+        except BaseException:
+            tablas.liberar()
+            raise
+        finally:
+            entrada.close()
+            entrada.unlink()
+        return tablas
+
+    def _repartir(self, nombre_entrada, tablas, trabajo):
+        """
+        Divide las filas en tareas y espera a que todas escriban su rango
+        """
+        n, max_pagos = tablas.num_creditos, tablas.max_pagos
+        if n == 0:
+            return
+        tamano = min(creditos_por_bloque(self.presupuesto_mb, max_pagos),
+                     -(-n // (self.procesos * TAREAS_POR_PROCESO)))
+        ejecutor = self._ejecutor()
+        pendientes = {
+            ejecutor.submit(_calcular_filas, nombre_entrada, tablas.nombre, n, max_pagos,
+                            inicio, min(inicio + tamano, n))
+            for inicio in range(0, n, tamano)
+        }
+        hechas = 0
+        try:
+            while pendientes:
+                listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    hechas += futuro.result()
+                if trabajo is not None:
+                    trabajo.reportar(hechas / n, f"{hechas:,} de {n:,} créditos")
+        except BaseException:
+            # Ningún proceso puede seguir escribiendo en un bloque que se va a liberar
+            for futuro in pendientes:
+                futuro.cancel()
+            wait(pendientes)
+            raise
+
+    def cerrar(self):
+        """
+        Termina los procesos del pool
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+def generar_paralelo(portafolio, procesos=None, trabajo=None):
+    """
+    Atajo: genera las tablas con un pool temporal de `procesos` procesos
+    """
+    with MotorParalelo(procesos) as motor:
+        return motor.generar(portafolio, trabajo)
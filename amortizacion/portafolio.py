@@ -0,0 +1,406 @@
+"""
+Proyección agregada de flujos de caja de un portafolio de créditos
+Lee el portafolio por bloques (CSV, Parquet o DataFrame), calcula cada bloque
+con el motor vectorizado y acumula intereses, capital, abonos y saldo
+pendiente por período o por mes, con memoria acotada por un presupuesto fijo;
+los créditos en unidades indexadas se llevan a moneda local con su curva
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .abonos import columnas_con_abonos
+from .fechas import CalendarioPagos
+from .monedas import MONEDA_LOCAL, cargar_curvas
+from .motor import COLUMNAS_MONTO, MotorAmortizacion
+from .tasas import FRECUENCIAS, tasa_periodo
+from .validacion import MAX_PAGOS, ValidadorLotes
+
+COLUMNAS_REQUERIDAS = ('monto', 'tasa_anual', 'num_pagos')
+
+# Columnas opcionales del archivo y su valor cuando no vienen
+VALORES_POR_DEFECTO = {
+    'frecuencia': 12,
+    'tipo_tasa': "Efectiva",
+    'modalidad': "Vencida",
+    'abono_periodico': 0.0,
+    'abono_cada': 1,
+    'abono_desde': 1,
+    'unidad': MONEDA_LOCAL,
+}
+
+COLUMNAS_FLUJO = ['Cuota', 'Interés', 'Capital', 'Abono_Extra']
+
+AGRUPACIONES = ('periodo', 'mes')
+
+# Matrices (créditos × períodos) de 8 bytes que el motor mantiene a la vez;
+# se usa para convertir el presupuesto de memoria en créditos por bloque
+MATRICES_POR_BLOQUE = 16
+
+
+def creditos_por_bloque(presupuesto_mb, max_pagos=MAX_PAGOS):
+    """
+    Créditos que caben en un bloque sin superar el presupuesto de memoria
+    """
+    return max(int(presupuesto_mb * 2**20 // (max_pagos * 8 * MATRICES_POR_BLOQUE)), 1)
+
+
+def leer_portafolio(origen, tamano_bloque, nombre=None):
+    """
+    Genera bloques (DataFrame) de un portafolio sin cargarlo completo
+
+    `origen` puede ser un DataFrame, una ruta o un archivo abierto; los
+    archivos .parquet se leen por lotes con pyarrow y el resto como CSV.
+    """
+    if isinstance(origen, pd.DataFrame):
+        for inicio in range(0, len(origen), tamano_bloque):
+            yield origen.iloc[inicio:inicio + tamano_bloque]
+        return
+
+    nombre = nombre or (origen if isinstance(origen, (str, os.PathLike)) else getattr(origen, 'name', ''))
+    if str(nombre).lower().endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Leer archivos Parquet requiere pyarrow (pip install pyarrow)") from e
+        for lote in pq.ParquetFile(origen).iter_batches(batch_size=tamano_bloque):
+            yield lote.to_pandas()
+    else:
+        # round_trip: mismas tasas que el DataFrame original (el parser rápido
+        # puede mover el último dígito y con él el período de cancelación)
+        yield from pd.read_csv(origen, chunksize=tamano_bloque, float_precision='round_trip')
+
+
+def normalizar_bloque(bloque):
+    """
+    Completa columnas opcionales, convierte frecuencias en texto y descarta
+    los créditos inválidos
+
+    Returns:
+        (bloque válido, número de créditos rechazados)
+    """
+    faltantes = [columna for columna in COLUMNAS_REQUERIDAS if columna not in bloque.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas obligatorias en el portafolio: {', '.join(faltantes)}")
+
+    bloque = bloque.copy()
+    for columna, valor in VALORES_POR_DEFECTO.items():
+        if columna not in bloque.columns:
+            bloque[columna] = valor
+        else:
+            bloque[columna] = bloque[columna].fillna(valor)
+    if bloque['frecuencia'].dtype == object:
+        bloque['frecuencia'] = bloque['frecuencia'].map(
+            lambda valor: FRECUENCIAS.get(valor, valor)
+        )
+    bloque['frecuencia'] = pd.to_numeric(bloque['frecuencia'], errors='coerce')
+
+    errores = ValidadorLotes.validar_creditos(bloque)
+    errores['abono_invalido'] = ~(
+        (bloque['abono_periodico'] >= 0) & (bloque['abono_cada'] >= 1) & (bloque['abono_desde'] >= 1)
+    ).to_numpy()
+    validas = ValidadorLotes.filas_validas(errores)
+    return bloque[validas], int((~validas).sum())
+
+
+def abonos_periodicos(bloque, max_pagos):
+    """
+    Matriz (créditos × períodos) con el abono periódico de cada crédito
+    """
+    periodos = np.arange(1, max_pagos + 1)[None, :]
+    desde = bloque['abono_desde'].to_numpy(dtype=np.int64)[:, None]
+    cada = bloque['abono_cada'].to_numpy(dtype=np.int64)[:, None]
+    num_pagos = bloque['num_pagos'].to_numpy(dtype=np.int64)[:, None]
+    aplica = (periodos >= desde) & ((periodos - desde) % cada == 0) & (periodos <= num_pagos)
+    return np.where(aplica, bloque['abono_periodico'].to_numpy(dtype=float)[:, None], 0.0)
+
+
+def columnas_creditos(monto, tasa, num_pagos, abonos):
+    """
+    Columnas (créditos × períodos) y períodos efectivos de un grupo de créditos
+
+    `abonos` trae por crédito 'abono_periodico', 'abono_cada' y 'abono_desde'
+    (y 'num_pagos'). Los créditos sin abono usan la forma cerrada del motor y
+    los demás la recurrencia de columnas_con_abonos, así que cada crédito da
+    el mismo resultado sin importar con qué otros se calcule: el reparto en
+    bloques o entre procesos no cambia la proyección.
+    """
+    num_pagos = np.asarray(num_pagos, dtype=np.int64)
+    ancho = int(num_pagos.max())
+    columnas = {nombre: np.zeros((len(num_pagos), ancho)) for nombre in COLUMNAS_MONTO}
+    periodos = num_pagos.copy()
+
+    con_abonos = abonos['abono_periodico'].to_numpy(dtype=float) > 0
+    for filas in (np.flatnonzero(~con_abonos), np.flatnonzero(con_abonos)):
+        if len(filas) == 0:
+            continue
+        pagos = num_pagos[filas]
+        if con_abonos[filas[0]]:
+            matriz = abonos_periodicos(abonos.iloc[filas], int(pagos.max()))
+            parciales, periodos[filas] = columnas_con_abonos(monto[filas], tasa[filas], pagos, matriz)
+        else:
+            parciales = MotorAmortizacion(monto[filas], tasa[filas], pagos).columnas()
+        for nombre in COLUMNAS_MONTO:
+            columnas[nombre][filas, :parciales[nombre].shape[1]] = parciales[nombre]
+    return columnas, periodos
+
+
+def columnas_bloque(bloque):
+    """
+    Columnas de la tabla de todos los créditos de un bloque (ver columnas_creditos)
+    """
+    tasa = tasa_periodo(
+        bloque['tasa_anual'].to_numpy(dtype=float),
+        bloque['tipo_tasa'].to_numpy(),
+        bloque['modalidad'].to_numpy(),
+        bloque['frecuencia'].to_numpy(dtype=float)
+    )
+    columnas, _ = columnas_creditos(bloque['monto'].to_numpy(dtype=float), np.asarray(tasa, dtype=float),
+                                    bloque['num_pagos'].to_numpy(dtype=np.int64), bloque)
+    return columnas
+
+
+def _fechas_inicio(bloque, fecha_base):
+    """
+    Fecha de inicio de cada crédito (fecha_base si no la trae)
+    """
+    if 'fecha_inicio' in bloque.columns:
+        fechas = pd.to_datetime(bloque['fecha_inicio'], errors='coerce').fillna(fecha_base)
+    else:
+        fechas = pd.Series(fecha_base, index=bloque.index)
+    return pd.DatetimeIndex(fechas).to_numpy(dtype='datetime64[D]')
+
+
+def unidades_sin_curva(bloque, curvas):
+    """
+    Máscara de créditos denominados en una unidad que no tiene curva
+    """
+    unidad = bloque['unidad'].astype(str).str.strip().to_numpy()
+    return (unidad != MONEDA_LOCAL) & ~np.isin(unidad, list(curvas))
+
+
+def a_moneda_local(bloque, columnas, curvas, fecha_base):
+    """
+    Convierte a moneda local las columnas de los créditos en unidades
+
+    Cada período se valora con la unidad en su fecha de pago contractual y
+    el monto original con la unidad en la fecha de inicio. Retorna
+    (columnas, monto) en moneda local.
+    """
+    unidad = bloque['unidad'].astype(str).str.strip().to_numpy()
+    monto = bloque['monto'].to_numpy(dtype=float)
+    if (unidad == MONEDA_LOCAL).all():
+        return columnas, monto
+
+    max_pagos = columnas['Cuota'].shape[1]
+    inicio = _fechas_inicio(bloque, fecha_base)
+    frecuencia = bloque['frecuencia'].to_numpy(dtype=np.int64)
+    factor = np.ones((len(bloque), max_pagos))
+    factor_inicio = np.ones(len(bloque))
+
+    for nombre in np.unique(unidad[unidad != MONEDA_LOCAL]):
+        curva = curvas[nombre]
+        for paso in np.unique(frecuencia[unidad == nombre]):
+            filas = np.flatnonzero((unidad == nombre) & (frecuencia == paso))
+            fechas = CalendarioPagos(int(paso)).fechas_programadas(inicio[filas], max_pagos)
+            factor[filas] = curva.valor_publicado(fechas[:, 1:])
+            factor_inicio[filas] = curva.valor_publicado(fechas[:, 0])
+
+    columnas = {nombre: np.round(columnas[nombre] * factor, 2) for nombre in COLUMNAS_MONTO}
+    return columnas, np.round(monto * factor_inicio, 2)
+
+
+def _meses_inicio(bloque, fecha_base):
+    """
+    Mes de inicio de cada crédito como número de meses desde el año 0
+    """
+    meses = _fechas_inicio(bloque, fecha_base).astype('datetime64[M]').astype(np.int64)
+    return meses + 1970 * 12
+
+
+def _acumular(acumulado, claves, valores):
+    """
+    Suma valores por clave entera sobre una Serie acumulada
+    """
+    if len(claves) == 0:
+        return acumulado
+    base = claves.min()
+    suma = np.bincount(claves - base, weights=valores)
+    parcial = pd.Series(suma, index=np.arange(base, base + len(suma)))
+    return parcial if acumulado is None else acumulado.add(parcial, fill_value=0.0)
+
+
+def proyectar_portafolio(origen, agrupacion='periodo', presupuesto_mb=256,
+                         fecha_base=None, trabajo=None, nombre=None, curvas=None, procesos=1):
+    """
+    Proyección agregada de los flujos de todo el portafolio
+
+    Args:
+        origen: DataFrame, ruta o archivo CSV/Parquet con una fila por crédito
+            ('monto', 'tasa_anual' en decimal, 'num_pagos' y las columnas
+            opcionales de VALORES_POR_DEFECTO y 'fecha_inicio')
+        agrupacion: 'periodo' (número de pago) o 'mes' (mes calendario)
+        presupuesto_mb: memoria aproximada por bloque
+        fecha_base: inicio de los créditos sin 'fecha_inicio' (por defecto hoy)
+        trabajo: Trabajo de la cola para reportar avance y permitir cancelación
+        nombre: nombre del archivo, si `origen` es un archivo sin nombre
+        curvas: {unidad: CurvaIndice} o ruta a un archivo de curvas, para los
+            créditos con columna 'unidad' (los de una unidad sin curva se
+            rechazan); la proyección queda en moneda local
+        procesos: con más de uno, las columnas de cada bloque se calculan en
+            un pool de procesos sobre memoria compartida (MotorParalelo)
+
+    Returns:
+        (proyección, resumen): DataFrame con una fila por período o mes y un
+        dict con créditos procesados, rechazados y bloques
+    """
+    if agrupacion not in AGRUPACIONES:
+        raise ValueError(f"Agrupación no soportada; use una de {AGRUPACIONES}")
+    fecha_base = pd.Timestamp(fecha_base if fecha_base is not None else pd.Timestamp.today().normalize())
+
+    if curvas is None or isinstance(curvas, (str, os.PathLike)):
+        curvas = cargar_curvas(curvas)
+
+    tamano = creditos_por_bloque(presupuesto_mb)
+    total_bytes = _tamano_origen(origen)
+    acumulados = dict.fromkeys(COLUMNAS_FLUJO + ['Saldo_Pendiente', 'Créditos Activos'])
+    resumen = {'creditos': 0, 'rechazados': 0, 'bloques': 0}
+
+    motor = None
+    if procesos > 1:
+        from .paralelo import MotorParalelo
+        motor = MotorParalelo(procesos)
+
+    try:
+        for bloque in leer_portafolio(origen, tamano, nombre):
+            _proyectar_bloque(bloque, acumulados, resumen, agrupacion, curvas, fecha_base, motor)
+            if trabajo is not None:
+                avance = _avance(origen, resumen, total_bytes)
+                trabajo.reportar(avance, f"{resumen['creditos']:,} créditos procesados")
+    finally:
+        if motor is not None:
+            motor.cerrar()
+
+    return _proyeccion(acumulados, agrupacion), resumen
+
+
+def _proyectar_bloque(bloque, acumulados, resumen, agrupacion, curvas, fecha_base, motor=None):
+    """
+    Normaliza un bloque, calcula sus columnas y las acumula en la proyección
+    """
+    bloque, rechazados = normalizar_bloque(bloque)
+    sin_curva = unidades_sin_curva(bloque, curvas)
+    bloque = bloque[~sin_curva]
+    resumen['rechazados'] += rechazados + int(sin_curva.sum())
+    resumen['bloques'] += 1
+    if not len(bloque):
+        return
+
+    tablas = None if motor is None else motor.generar_normalizado(bloque)
+    try:
+        columnas = columnas_bloque(bloque) if tablas is None else tablas.columnas
+        columnas, monto_local = a_moneda_local(bloque, columnas, curvas, fecha_base)
+        bloque = bloque.assign(monto=monto_local)
+        max_pagos = columnas['Cuota'].shape[1]
+        num_pagos = bloque['num_pagos'].to_numpy(dtype=np.int64)
+        activo = ((np.arange(max_pagos)[None, :] < num_pagos[:, None])
+                  & (columnas['Saldo_Inicial'] > 0))
+        filas, periodos = np.nonzero(activo)
+
+        if agrupacion == 'periodo':
+            claves = periodos + 1
+            for nombre_columna in COLUMNAS_FLUJO:
+                acumulados[nombre_columna] = _acumular(
+                    acumulados[nombre_columna], claves, columnas[nombre_columna][filas, periodos])
+            acumulados['Saldo_Pendiente'] = _acumular(
+                acumulados['Saldo_Pendiente'], claves, columnas['Saldo_Final'][filas, periodos])
+            acumulados['Créditos Activos'] = _acumular(
+                acumulados['Créditos Activos'], claves, np.ones(len(claves)))
+        else:
+            _acumular_por_mes(acumulados, bloque, columnas, filas, periodos, fecha_base)
+
+        resumen['creditos'] += len(bloque)
+    finally:
+        if tablas is not None:
+            columnas = None
+            tablas.liberar()
+
+
+def _acumular_por_mes(acumulados, bloque, columnas, filas, periodos, fecha_base):
+    """
+    Acumula un bloque por mes calendario
+
+    Los flujos caen en el mes de su pago. El saldo pendiente de cada crédito
+    se cuenta en todos los meses entre un pago y el siguiente, incluidos los
+    meses previos al primer pago (con el monto original).
+    """
+    mes_inicio = _meses_inicio(bloque, fecha_base)
+    meses_periodo = 12 // bloque['frecuencia'].to_numpy(dtype=np.int64)
+    meses_pago = mes_inicio[filas] + (periodos + 1) * meses_periodo[filas]
+
+    for nombre_columna in COLUMNAS_FLUJO:
+        acumulados[nombre_columna] = _acumular(
+            acumulados[nombre_columna], meses_pago, columnas[nombre_columna][filas, periodos])
+
+    # Saldo vigente desde cada pago (y desde el inicio) hasta el pago siguiente
+    desde = np.concatenate([mes_inicio, meses_pago])
+    saldos = np.concatenate([bloque['monto'].to_numpy(dtype=float),
+                             columnas['Saldo_Final'][filas, periodos]])
+    duracion = np.concatenate([meses_periodo, meses_periodo[filas]])
+    con_saldo = saldos > 0.005
+    desde, saldos, duracion = desde[con_saldo], saldos[con_saldo], duracion[con_saldo]
+    for desplazamiento in range(int(duracion.max(initial=0))):
+        vigente = desplazamiento < duracion
+        acumulados['Saldo_Pendiente'] = _acumular(
+            acumulados['Saldo_Pendiente'], desde[vigente] + desplazamiento, saldos[vigente])
+        acumulados['Créditos Activos'] = _acumular(
+            acumulados['Créditos Activos'], desde[vigente] + desplazamiento,
+            np.ones(int(vigente.sum())))
+
+
+def _proyeccion(acumulados, agrupacion):
+    """
+    Arma el DataFrame final a partir de las Series acumuladas
+    """
+    columnas = COLUMNAS_FLUJO + ['Saldo_Pendiente', 'Créditos Activos']
+    if acumulados['Cuota'] is None:
+        return pd.DataFrame(columns=['Período' if agrupacion == 'periodo' else 'Mes'] + columnas)
+
+    proyeccion = pd.DataFrame({nombre: acumulados[nombre] for nombre in columnas}).fillna(0.0)
+    proyeccion = proyeccion.sort_index()
+    proyeccion['Créditos Activos'] = proyeccion['Créditos Activos'].round().astype(np.int64)
+    for nombre in COLUMNAS_FLUJO + ['Saldo_Pendiente']:
+        proyeccion[nombre] = proyeccion[nombre].round(2)
+
+    if agrupacion == 'periodo':
+        proyeccion.insert(0, 'Período', proyeccion.index.astype(np.int64))
+    else:
+        meses = proyeccion.index.to_numpy(dtype=np.int64)
+        proyeccion.insert(0, 'Mes', [f"{mes // 12:04d}-{mes % 12 + 1:02d}" for mes in meses])
+    return proyeccion.reset_index(drop=True)
+
+
+def _tamano_origen(origen):
+    """
+    Tamaño en bytes de un archivo o ruta (None si no se conoce)
+    """
+    if isinstance(origen, pd.DataFrame):
+        return None
+    if isinstance(origen, (str, os.PathLike)):
+        return os.path.getsize(origen)
+    if hasattr(origen, 'getbuffer'):
+        return origen.getbuffer().nbytes
+    return None
+
+
+def _avance(origen, resumen, total_bytes):
+    """
+    Fracción procesada: por filas en un DataFrame, por bytes leídos en un archivo
+    """
+    if isinstance(origen, pd.DataFrame):
+        return (resumen['creditos'] + resumen['rechazados']) / max(len(origen), 1)
+    if total_bytes and hasattr(origen, 'tell'):
+        return min(origen.tell() / total_bytes, 0.99)
+    return 0.0
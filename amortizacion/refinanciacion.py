@@ -0,0 +1,129 @@
+"""
+Análisis de refinanciación de créditos
+Compara el resto de un crédito existente contra una grilla de ofertas nuevas
+evaluadas en un solo lote vectorizado
+"""
+
+import numpy as np
+import pandas as pd
+
+from .motor import cuota_fija
+from .tasas import tasa_periodo
+
+
+def grilla_ofertas(**parametros):
+    """
+    Producto cartesiano de parámetros de oferta como arreglos planos
+
+    Ejemplo: grilla_ofertas(tasa_anual=[0.10, 0.11], num_pagos=[36, 48])
+    retorna un dict con 4 combinaciones por parámetro.
+    """
+    nombres = list(parametros)
+    mallas = np.meshgrid(*(np.atleast_1d(parametros[nombre]) for nombre in nombres),
+                         indexing='ij')
+    return {nombre: malla.ravel() for nombre, malla in zip(nombres, mallas)}
+
+
+class AnalizadorRefinanciacion:
+    """
+    Evalúa reemplazar un crédito existente por ofertas nuevas
+
+    El crédito existente se describe con su tabla de amortización
+    (CalculadoraAmortizacion o ManejoAbonos) y el período k en el que se
+    refinancia: el saldo a refinanciar es el que queda después de k pagos y
+    los flujos que se evitan son las cuotas y abonos de los períodos siguientes.
+    Las ofertas se pagan con la misma frecuencia del crédito existente.
+    """
+
+    def __init__(self, tabla, periodo, frecuencia, tasa_descuento=None):
+        """
+        Inicializa el análisis
+
+        Args:
+            tabla: tabla de amortización del crédito existente
+            periodo: período k después del cual se refinancia (0 = hoy)
+            frecuencia: pagos por año del crédito existente
+            tasa_descuento: tasa por período para el VPN (por defecto la
+                tasa implícita del crédito existente en el período k + 1)
+        """
+        if not 0 <= periodo < len(tabla):
+            raise ValueError("El período de refinanciación debe estar dentro del plazo del crédito")
+
+        self.periodo = int(periodo)
+        self.frecuencia = int(frecuencia)
+        self.saldo = float(tabla['Saldo_Inicial'].iloc[self.periodo])
+
+        restantes = tabla.iloc[self.periodo:]
+        flujos = restantes['Cuota'].to_numpy(dtype=float)
+        if 'Abono_Extra' in restantes.columns:
+            flujos = flujos + restantes['Abono_Extra'].to_numpy(dtype=float)
+        self.flujos_actuales = flujos
+
+        if tasa_descuento is None:
+            tasa_descuento = float(restantes['Interés'].iloc[0]) / self.saldo
+        self.tasa_descuento = float(tasa_descuento)
+
+    def evaluar(self, tasa_anual, num_pagos, comision=0.0, comision_pct=0.0,
+                tipo_tasa="Efectiva", modalidad="Vencida", financiar_comision=False):
+        """
+        Evalúa todas las ofertas en un lote y las ordena por ahorro en VPN
+
+        Todos los parámetros aceptan escalares o arreglos que se combinan por
+        broadcasting (use grilla_ofertas para un producto cartesiano).
+        `comision` es un valor fijo y `comision_pct` una fracción del saldo;
+        si `financiar_comision` es True se suman al nuevo crédito en lugar de
+        pagarse al contado.
+
+        Returns:
+            DataFrame con una fila por oferta, de mayor a menor ahorro en VPN
+        """
+        tasa_anual, num_pagos, comision, comision_pct, tipo_tasa, modalidad = (
+            np.atleast_1d(arreglo) for arreglo in np.broadcast_arrays(
+                np.asarray(tasa_anual, dtype=float), np.asarray(num_pagos, dtype=np.int64),
+                np.asarray(comision, dtype=float), np.asarray(comision_pct, dtype=float),
+                np.asarray(tipo_tasa), np.asarray(modalidad)
+            )
+        )
+
+        tasa_nueva = tasa_periodo(tasa_anual, tipo_tasa, modalidad, self.frecuencia)
+        costo_comision = comision + comision_pct * self.saldo
+        monto_nuevo = self.saldo + np.where(financiar_comision, costo_comision, 0.0)
+        pago_inicial = np.where(financiar_comision, 0.0, costo_comision)
+        cuota_nueva = cuota_fija(monto_nuevo, tasa_nueva, num_pagos)
+
+        # Flujos de ambos créditos sobre un horizonte común de períodos
+        horizonte = max(len(self.flujos_actuales), int(num_pagos.max()))
+        periodos = np.arange(1, horizonte + 1)
+        descuento = (1 + self.tasa_descuento) ** -periodos.astype(float)
+
+        flujos_actuales = np.zeros(horizonte)
+        flujos_actuales[:len(self.flujos_actuales)] = self.flujos_actuales
+        flujos_nuevos = np.where(periodos[None, :] <= num_pagos[:, None], cuota_nueva[:, None], 0.0)
+
+        # Ahorro acumulado descontado período a período
+        ahorro_descontado = np.cumsum((flujos_actuales[None, :] - flujos_nuevos) * descuento, axis=1)
+        ahorro_descontado -= pago_inicial[:, None]
+        vpn_ahorro = ahorro_descontado[:, -1]
+
+        # Período de equilibrio: primer período desde el cual el ahorro acumulado
+        # ya no vuelve a ser negativo (NaN si nunca se recupera)
+        negativo = ahorro_descontado < 0
+        ultimo_negativo = horizonte - 1 - np.argmax(negativo[:, ::-1], axis=1)
+        equilibrio = np.where(ultimo_negativo < horizonte - 1, ultimo_negativo + 2.0, np.nan)
+        equilibrio = np.where(negativo.any(axis=1), equilibrio, 0.0)
+
+        total_nuevo = cuota_nueva * num_pagos + pago_inicial
+        resultado = pd.DataFrame({
+            'Tasa Anual (%)': tasa_anual * 100,
+            'Tipo': tipo_tasa,
+            'Modalidad': modalidad,
+            'Número de Pagos': num_pagos,
+            'Tasa Período (%)': tasa_nueva * 100,
+            'Comisión': costo_comision,
+            'Cuota Nueva': cuota_nueva,
+            'Total Pagado Nuevo': total_nuevo,
+            'Ahorro Nominal': self.flujos_actuales.sum() - total_nuevo,
+            'Ahorro VPN': vpn_ahorro,
+            'Período de Equilibrio': equilibrio,
+        })
+        return resultado.sort_values('Ahorro VPN', ascending=False, ignore_index=True)
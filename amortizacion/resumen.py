@@ -0,0 +1,125 @@
+"""
+Resumen inmutable de tablas de amortización
+Los totales de una tabla (cuotas, intereses, capital, abonos y cargos) se
+calculan en una sola reducción por columnas y se guardan en un objeto
+congelado; la comparación sin/con abonos deriva ahorros, porcentajes y ROI de
+esos totales, de modo que las vistas y los reportes no vuelven a sumar la
+tabla. Los créditos en unidades indexadas suman además sus columnas en
+moneda local
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .cargos import COLUMNA_TOTAL
+from .monedas import SUFIJO_LOCAL
+
+# Columna de la tabla → campo del resumen
+COLUMNAS_RESUMEN = {
+    'Cuota': 'total_cuotas',
+    'Interés': 'total_intereses',
+    'Capital': 'total_capital',
+    'Abono_Extra': 'total_abonos',
+    COLUMNA_TOTAL: 'total_cargos',
+}
+COLUMNAS_RESUMEN.update({columna + SUFIJO_LOCAL: campo + '_local'
+                         for columna, campo in list(COLUMNAS_RESUMEN.items())})
+
+
+def _porcentaje(parte, total):
+    return parte / total * 100 if total else 0.0
+
+
+@dataclass(frozen=True)
+class ResumenTabla:
+    """
+    Totales de una tabla; las columnas ausentes suman cero
+    """
+
+    periodos: int = 0
+    total_cuotas: float = 0.0
+    total_intereses: float = 0.0
+    total_capital: float = 0.0
+    total_abonos: float = 0.0
+    total_cargos: float = 0.0
+    total_cuotas_local: float = 0.0
+    total_intereses_local: float = 0.0
+    total_capital_local: float = 0.0
+    total_abonos_local: float = 0.0
+    total_cargos_local: float = 0.0
+
+    @classmethod
+    def desde_tabla(cls, tabla):
+        """
+        Resumen de una tabla con el esquema estándar (None da un resumen vacío)
+        """
+        if tabla is None:
+            return cls()
+        presentes = [columna for columna in COLUMNAS_RESUMEN if columna in tabla.columns]
+        totales = tabla[presentes].to_numpy(dtype=float).sum(axis=0) if presentes else np.array([])
+        return cls(
+            periodos=len(tabla),
+            **{COLUMNAS_RESUMEN[columna]: float(total) for columna, total in zip(presentes, totales)}
+        )
+
+    @property
+    def total_pagado(self):
+        return self.total_cuotas + self.total_abonos + self.total_cargos
+
+    @property
+    def total_pagado_local(self):
+        return self.total_cuotas_local + self.total_abonos_local + self.total_cargos_local
+
+
+@dataclass(frozen=True)
+class ResumenComparacion:
+    """
+    Comparación entre la tabla sin abonos y la tabla con abonos
+    """
+
+    sin_abonos: ResumenTabla
+    con_abonos: ResumenTabla
+
+    @classmethod
+    def desde_tablas(cls, tabla_basica, tabla_abonos):
+        return cls(ResumenTabla.desde_tabla(tabla_basica), ResumenTabla.desde_tabla(tabla_abonos))
+
+    @property
+    def ahorro_tiempo(self):
+        return self.sin_abonos.periodos - self.con_abonos.periodos
+
+    @property
+    def porcentaje_tiempo(self):
+        return _porcentaje(self.ahorro_tiempo, self.sin_abonos.periodos)
+
+    @property
+    def ahorro_intereses(self):
+        return self.sin_abonos.total_intereses - self.con_abonos.total_intereses
+
+    @property
+    def porcentaje_intereses(self):
+        return _porcentaje(self.ahorro_intereses, self.sin_abonos.total_intereses)
+
+    @property
+    def roi_abonos(self):
+        """
+        Ahorro en intereses por cada peso abonado, en porcentaje
+        """
+        return _porcentaje(self.ahorro_intereses, self.con_abonos.total_abonos)
+
+    @property
+    def diferencia_cuotas(self):
+        return self.sin_abonos.total_cuotas - self.con_abonos.total_cuotas
+
+    @property
+    def diferencia_cargos(self):
+        return self.sin_abonos.total_cargos - self.con_abonos.total_cargos
+
+    @property
+    def diferencia_pagado(self):
+        return self.sin_abonos.total_pagado - self.con_abonos.total_pagado
+
+    @property
+    def diferencia_pagado_local(self):
+        return self.sin_abonos.total_pagado_local - self.con_abonos.total_pagado_local
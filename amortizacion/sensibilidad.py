@@ -0,0 +1,104 @@
+"""
+Superficies de sensibilidad tasa × plazo
+Calcula cuota, intereses totales y ahorro por abonos sobre una grilla 2-D
+completa con una sola operación de broadcasting de NumPy
+"""
+
+import numpy as np
+
+from .tasas import tasa_periodo
+
+
+def superficie_sensibilidad(monto, tasas_anuales, plazos, frecuencia=12,
+                            tipo_tasa="Efectiva", modalidad="Vencida",
+                            abono_periodico=0.0, cada=1):
+    """
+    Evalúa una grilla de tasas (filas) × plazos (columnas)
+
+    Args:
+        monto: monto del crédito
+        tasas_anuales: arreglo de tasas anuales (decimal)
+        plazos: arreglo de números de pagos
+        frecuencia, tipo_tasa, modalidad: interpretación de las tasas
+        abono_periodico: abono extra fijo aplicado cada `cada` períodos;
+            si es cero no se calcula el ahorro
+
+    Returns:
+        dict con matrices (tasas × plazos): 'cuota', 'total_intereses' y,
+        con abonos, 'periodos_con_abonos', 'intereses_con_abonos' y
+        'ahorro_intereses'
+    """
+    tasas_anuales = np.asarray(tasas_anuales, dtype=float)
+    plazos = np.asarray(plazos, dtype=float)
+
+    r = tasa_periodo(tasas_anuales, tipo_tasa, modalidad, frecuencia)[:, None]
+    n = plazos[None, :]
+    con_tasa = r > 0
+    r_segura = np.where(con_tasa, r, 1.0)
+
+    # (1+r)⁻ⁿ para toda la grilla: PMT = PV·r / (1 - (1+r)⁻ⁿ)
+    descuento = np.exp(-n * np.log1p(r_segura))
+    cuota = np.where(con_tasa, monto * r_segura / (1 - descuento), monto / n)
+    resultado = {
+        'cuota': cuota,
+        'total_intereses': cuota * n - monto,
+    }
+
+    if abono_periodico > 0:
+        resultado.update(_ahorro_abonos(monto, r, r_segura, con_tasa, n, cuota,
+                                        abono_periodico, cada))
+    return resultado
+
+
+def _ahorro_abonos(monto, r, r_segura, con_tasa, n, cuota, abono, cada):
+    """
+    Plazo e intereses con un abono fijo cada `cada` períodos, en forma cerrada
+
+    Repartir el abono como una cuota equivalente por período,
+    A' = A·r / ((1+r)^c - 1), da una anualidad con pago C + A' cuyo plazo
+    n' = -ln(1 - PV·r/(C + A')) / ln(1+r) coincide con el real en los
+    múltiplos de c. El plazo exacto está entre ⌈n'⌉ y ⌈n'⌉ + c, así que se
+    busca evaluando el saldo exacto en esos c + 1 candidatos a la vez.
+    """
+    log_crecimiento = np.log1p(r_segura)
+    crecimiento_c = np.expm1(cada * log_crecimiento)
+    equivalente = np.where(con_tasa, abono * r_segura / crecimiento_c, abono / cada)
+    pago = cuota + equivalente
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plazo = np.where(
+            con_tasa,
+            -np.log1p(-monto * r_segura / pago) / log_crecimiento,
+            monto / pago
+        )
+
+    def saldo(k, eje_extra=False):
+        # Bₖ = PV·(1+r)ᵏ - C·((1+r)ᵏ - 1)/r - A·Σⱼ≤ₘ (1+r)^(k - jc), m = ⌊k/c⌋
+        ajustar = (lambda x: x[..., None]) if eje_extra else (lambda x: x)
+        tasa, log_c, con, c = ajustar(r_segura), ajustar(log_crecimiento), ajustar(con_tasa), ajustar(cuota)
+        m = np.floor(k / cada)
+        factor = np.exp(k * log_c)
+        factor_abonos = (np.exp((k - m * cada) * log_c)
+                         * np.expm1(m * cada * log_c) / ajustar(crecimiento_c))
+        return np.where(
+            con,
+            monto * factor - c * (factor - 1) / tasa - abono * factor_abonos,
+            monto - c * k - abono * m
+        )
+
+    # Primer candidato con saldo cancelado (eje extra de c + 1 candidatos)
+    candidatos = np.ceil(plazo - 1e-9)[..., None] + np.arange(cada + 1)
+    cancelado = saldo(candidatos, eje_extra=True) <= 0.005
+    periodos = np.take_along_axis(candidatos, np.argmax(cancelado, axis=-1)[..., None], axis=-1)[..., 0]
+    periodos = np.clip(periodos, 1, n)
+
+    # Intereses: pagos completos hasta p - 1 más el saldo exacto con su interés
+    previos = periodos - 1
+    total_pagado = cuota * previos + abono * np.floor(previos / cada) + saldo(previos) * (1 + r)
+    intereses = total_pagado - monto
+
+    return {
+        'periodos_con_abonos': periodos,
+        'intereses_con_abonos': intereses,
+        'ahorro_intereses': cuota * n - monto - intereses,
+    }
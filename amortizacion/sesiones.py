@@ -0,0 +1,431 @@
+"""
+Formato binario compacto para guardar y restaurar sesiones
+Un archivo de sesión guarda la configuración del crédito, los abonos, los
+escenarios y, opcionalmente, las tablas generadas. Los enteros se escriben
+como varints (LEB128) con codificación zigzag, las columnas de las tablas en
+centavos y como diferencias entre filas consecutivas, y el cuerpo completo
+se comprime con zlib
+"""
+
+import json
+import struct
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from .escenarios import ConjuntoEscenarios
+from .motor import a_centavos
+
+MAGIA = b'AMZS'
+VERSION = 1
+
+# Banderas del encabezado
+COMPRIMIDO = 0x01
+
+# Etiquetas de las secciones; un lector ignora las etiquetas que no conoce
+CREDITO = 1
+ABONOS = 2
+TABLA = 3
+ESCENARIOS = 4
+
+
+def _zigzag(valores):
+    """
+    Enteros con signo a sin signo: 0, -1, 1, -2... → 0, 1, 2, 3...
+    """
+    valores = np.asarray(valores, dtype=np.int64)
+    return ((valores << 1) ^ (valores >> 63)).astype(np.uint64)
+
+
+def _deszigzag(valores):
+    valores = np.asarray(valores, dtype=np.uint64)
+    return ((valores >> np.uint64(1)).astype(np.int64)
+            ^ -(valores & np.uint64(1)).astype(np.int64))
+
+
+def codificar_varints(valores):
+    """
+    Codifica un arreglo de enteros con signo como varints zigzag, vectorizado
+    """
+    sin_signo = _zigzag(valores)
+    if sin_signo.size == 0:
+        return b''
+    # Bytes necesarios por valor (7 bits útiles por byte)
+    bits = np.zeros(sin_signo.shape, dtype=np.int64)
+    restante = sin_signo.copy()
+    while restante.any():
+        bits += restante > 0
+        restante >>= np.uint64(7)
+    longitudes = np.maximum(bits, 1)
+
+    fin = np.cumsum(longitudes)
+    inicio = fin - longitudes
+    salida = np.zeros(int(fin[-1]), dtype=np.uint8)
+    for byte in range(int(longitudes.max())):
+        presente = longitudes > byte
+        grupo = (sin_signo[presente] >> np.uint64(7 * byte)) & np.uint64(0x7F)
+        continua = (longitudes[presente] > byte + 1).astype(np.uint64) << np.uint64(7)
+        salida[inicio[presente] + byte] = (grupo | continua).astype(np.uint8)
+    return salida.tobytes()
+
+
+def decodificar_varints(datos, cantidad, posicion=0):
+    """
+    Lee `cantidad` varints zigzag desde `posicion`
+
+    Returns:
+        (arreglo int64, posición siguiente)
+    """
+    if cantidad == 0:
+        return np.zeros(0, dtype=np.int64), posicion
+    bytes_ = np.frombuffer(datos, dtype=np.uint8, offset=posicion)
+    finales = np.flatnonzero(bytes_ < 0x80)[:cantidad]
+    if len(finales) < cantidad:
+        raise ValueError("Archivo de sesión truncado")
+    usados = int(finales[-1]) + 1
+    bytes_ = bytes_[:usados].astype(np.uint64)
+
+    inicios = np.concatenate([[0], finales[:-1] + 1])
+    grupo = np.repeat(np.arange(cantidad), finales - inicios + 1)
+    desplazamiento = (np.arange(usados) - inicios[grupo]).astype(np.uint64) * np.uint64(7)
+    partes = (bytes_ & np.uint64(0x7F)) << desplazamiento
+    valores = np.add.reduceat(partes, inicios)
+    return _deszigzag(valores), posicion + usados
+
+
+def _varint(valor):
+    """
+    Un solo varint zigzag en Python puro (más rápido que NumPy para escalares)
+    """
+    valor = int(valor)
+    sin_signo = valor << 1 if valor >= 0 else (-valor << 1) - 1
+    salida = bytearray()
+    while sin_signo >= 0x80:
+        salida.append((sin_signo & 0x7F) | 0x80)
+        sin_signo >>= 7
+    salida.append(sin_signo)
+    return bytes(salida)
+
+
+class _Escritor:
+    """
+    Acumula el cuerpo del archivo
+    """
+
+    def __init__(self):
+        self.partes = []
+
+    def varint(self, valor):
+        self.partes.append(_varint(valor))
+
+    def varints(self, valores):
+        self.partes.append(codificar_varints(valores))
+
+    def texto(self, valor):
+        datos = valor.encode('utf-8')
+        self.varint(len(datos))
+        self.partes.append(datos)
+
+    def flotantes(self, valores):
+        self.partes.append(np.asarray(valores, dtype='<f8').tobytes())
+
+    def seccion(self, etiqueta, contenido):
+        """
+        Sección con etiqueta y longitud, para que pueda saltarse al leer
+        """
+        datos = contenido.bytes()
+        self.varint(etiqueta)
+        self.varint(len(datos))
+        self.partes.append(datos)
+
+    def bytes(self):
+        return b''.join(self.partes)
+
+
+class _Lector:
+    """
+    Recorre el cuerpo del archivo
+    """
+
+    def __init__(self, datos):
+        self.datos = datos
+        self.posicion = 0
+
+    def varint(self):
+        sin_signo = desplazamiento = 0
+        while True:
+            byte = self.datos[self.posicion]
+            self.posicion += 1
+            sin_signo |= (byte & 0x7F) << desplazamiento
+            desplazamiento += 7
+            if byte < 0x80:
+                break
+        return sin_signo >> 1 if not sin_signo & 1 else -((sin_signo + 1) >> 1)
+
+    def varints(self, cantidad):
+        valores, self.posicion = decodificar_varints(self.datos, cantidad, self.posicion)
+        return valores
+
+    def texto(self):
+        longitud = self.varint()
+        valor = self.datos[self.posicion:self.posicion + longitud].decode('utf-8')
+        self.posicion += longitud
+        return valor
+
+    def flotantes(self, cantidad):
+        valores = np.frombuffer(self.datos, dtype='<f8', count=cantidad, offset=self.posicion)
+        self.posicion += 8 * cantidad
+        return valores.copy()
+
+    def seccion(self):
+        """
+        Lee la siguiente sección y retorna (etiqueta, lector de su contenido)
+        """
+        etiqueta = self.varint()
+        longitud = self.varint()
+        if longitud < 0 or self.posicion + longitud > len(self.datos):
+            raise ValueError("Archivo de sesión truncado")
+        contenido = _Lector(self.datos[self.posicion:self.posicion + longitud])
+        self.posicion += longitud
+        return etiqueta, contenido
+
+    @property
+    def terminado(self):
+        return self.posicion >= len(self.datos)
+
+
+def _diferencias(valores):
+    return np.diff(valores, prepend=0)
+
+
+def _escribir_abonos(escritor, programados, adhoc):
+    """
+    Abonos como columnas de enteros: períodos y montos en centavos, en diferencias
+    """
+    escritor.varint(len(programados))
+    if programados:
+        escritor.varints(_diferencias([abono['periodo_inicio'] for abono in programados]))
+        escritor.varints([abono['frecuencia'] for abono in programados])
+        escritor.varints(_diferencias(a_centavos([abono['monto'] for abono in programados])))
+    escritor.varint(len(adhoc))
+    if adhoc:
+        escritor.varints(_diferencias([abono['periodo'] for abono in adhoc]))
+        escritor.varints(_diferencias(a_centavos([abono['monto'] for abono in adhoc])))
+
+
+def _leer_abonos(lector):
+    cantidad = lector.varint()
+    programados = []
+    if cantidad:
+        inicios = np.cumsum(lector.varints(cantidad))
+        frecuencias = lector.varints(cantidad)
+        montos = np.cumsum(lector.varints(cantidad)) / 100
+        programados = [
+            {'periodo_inicio': int(inicio), 'monto': float(monto), 'frecuencia': int(frecuencia)}
+            for inicio, monto, frecuencia in zip(inicios, montos, frecuencias)
+        ]
+    cantidad = lector.varint()
+    adhoc = []
+    if cantidad:
+        periodos = np.cumsum(lector.varints(cantidad))
+        montos = np.cumsum(lector.varints(cantidad)) / 100
+        adhoc = [{'periodo': int(periodo), 'monto': float(monto)}
+                 for periodo, monto in zip(periodos, montos)]
+    return programados, adhoc
+
+
+def _escribir_tabla(escritor, nombre, tabla):
+    """
+    Tabla con sus columnas numéricas en centavos y en diferencias por fila
+
+    'Fecha' se guarda como días desde 1970 (en diferencias) y se restaura como
+    texto AAAA-MM-DD o como fecha, según su tipo original. Las columnas con
+    más de dos decimales (como el valor de una unidad indexada) se guardan
+    como float64 tal cual; las que no son numéricas ni 'Fecha', como texto JSON.
+    """
+    escritor.texto(nombre)
+    escritor.varint(len(tabla))
+    escritor.varint(1 if tabla.attrs.get('exacto') else 0)
+    escritor.varint(len(tabla.columns))
+    for columna in tabla.columns:
+        valores = tabla[columna]
+        escritor.texto(str(columna))
+        if columna == 'Fecha':
+            fechas = pd.to_datetime(valores)
+            dias = fechas.to_numpy(dtype='datetime64[D]').astype(np.int64)
+            escritor.varint(2 if pd.api.types.is_datetime64_any_dtype(valores) else 3)
+            escritor.varints(_diferencias(dias))
+        elif pd.api.types.is_integer_dtype(valores):
+            escritor.varint(0)
+            escritor.varints(_diferencias(valores.to_numpy(dtype=np.int64)))
+        elif pd.api.types.is_numeric_dtype(valores):
+            flotantes = valores.to_numpy(dtype=float)
+            try:
+                centavos = a_centavos(flotantes)
+            except ValueError:
+                centavos = None  # NaN, infinitos o montos fuera de int64: se guardan como float64
+            if centavos is not None and np.array_equal(centavos / 100, flotantes):
+                escritor.varint(1)
+                escritor.varints(_diferencias(centavos))
+            else:
+                escritor.varint(5)
+                escritor.flotantes(flotantes)
+        else:
+            escritor.varint(4)
+            escritor.texto(json.dumps(valores.astype(str).tolist(), ensure_ascii=False))
+
+
+def _leer_tabla(lector):
+    nombre = lector.texto()
+    filas = lector.varint()
+    exacto = bool(lector.varint())
+    datos = {}
+    for _ in range(lector.varint()):
+        columna = lector.texto()
+        tipo = lector.varint()
+        if tipo == 4:
+            datos[columna] = json.loads(lector.texto())
+            continue
+        if tipo == 5:
+            datos[columna] = lector.flotantes(filas)
+            continue
+        valores = np.cumsum(lector.varints(filas))
+        if tipo == 0:
+            datos[columna] = valores
+        elif tipo == 1:
+            datos[columna] = valores / 100
+        else:
+            fechas = valores.astype('datetime64[D]')
+            datos[columna] = (pd.to_datetime(fechas) if tipo == 2
+                              else np.datetime_as_string(fechas, unit='D'))
+    tabla = pd.DataFrame(datos)
+    tabla.attrs['exacto'] = exacto
+    return nombre, tabla
+
+
+def _escribir_escenarios(escritor, escenarios):
+    """
+    Conjunto de escenarios con su almacenamiento columnar tal cual
+    """
+    escritor.varint(len(escenarios))
+    for nombre in escenarios.nombres:
+        escritor.texto(nombre)
+    escritor.flotantes(escenarios.monto)
+    escritor.flotantes(escenarios.tasa_periodo)
+    escritor.varints(escenarios.num_pagos)
+    escritor.varints(escenarios.frecuencia)
+
+    orden = np.lexsort((escenarios.abono_periodo, escenarios.abono_escenario))
+    escritor.varint(len(orden))
+    escritor.varints(_diferencias(escenarios.abono_escenario[orden]))
+    escritor.varints(escenarios.abono_periodo[orden])
+    escritor.varints(a_centavos(escenarios.abono_monto[orden]))
+
+
+def _leer_escenarios(lector):
+    escenarios = ConjuntoEscenarios()
+    cantidad = lector.varint()
+    escenarios.nombres = [lector.texto() for _ in range(cantidad)]
+    escenarios.monto = lector.flotantes(cantidad)
+    escenarios.tasa_periodo = lector.flotantes(cantidad)
+    escenarios.num_pagos = lector.varints(cantidad)
+    escenarios.frecuencia = lector.varints(cantidad)
+
+    abonos = lector.varint()
+    escenarios.abono_escenario = np.cumsum(lector.varints(abonos))
+    escenarios.abono_periodo = lector.varints(abonos)
+    escenarios.abono_monto = lector.varints(abonos) / 100
+    return escenarios
+
+
+def guardar_sesion(datos_credito, abonos_programados=(), abonos_adhoc=(),
+                   tablas=None, escenarios=None, comprimir=True):
+    """
+    Serializa una sesión al formato binario
+
+    Args:
+        datos_credito: dict con la configuración del crédito (valores JSON)
+        abonos_programados, abonos_adhoc: listas de ManejoAbonos
+        tablas: dict {nombre: DataFrame} con las tablas a incluir (opcional)
+        escenarios: ConjuntoEscenarios a incluir (opcional)
+        comprimir: comprime el cuerpo con zlib
+
+    Los montos de abonos y tablas se guardan en centavos.
+    """
+    escritor = _Escritor()
+
+    contenido = _Escritor()
+    contenido.texto(json.dumps(datos_credito, ensure_ascii=False, default=str))
+    escritor.seccion(CREDITO, contenido)
+
+    contenido = _Escritor()
+    _escribir_abonos(contenido, list(abonos_programados), list(abonos_adhoc))
+    escritor.seccion(ABONOS, contenido)
+
+    for nombre, tabla in (tablas or {}).items():
+        if tabla is not None:
+            contenido = _Escritor()
+            _escribir_tabla(contenido, nombre, tabla)
+            escritor.seccion(TABLA, contenido)
+
+    if escenarios is not None and len(escenarios):
+        contenido = _Escritor()
+        _escribir_escenarios(contenido, escenarios)
+        escritor.seccion(ESCENARIOS, contenido)
+
+    cuerpo = escritor.bytes()
+    banderas = 0
+    if comprimir:
+        cuerpo = zlib.compress(cuerpo, 6)
+        banderas |= COMPRIMIDO
+    return MAGIA + struct.pack('<BB', VERSION, banderas) + cuerpo
+
+
+def cargar_sesion(datos):
+    """
+    Restaura una sesión guardada con guardar_sesion
+
+    Returns:
+        dict con 'datos_credito', 'abonos_programados', 'abonos_adhoc',
+        'tablas' (dict de DataFrames) y 'escenarios' (o None)
+
+    Un archivo truncado o dañado produce ValueError.
+    """
+    datos = bytes(datos)
+    if datos[:4] != MAGIA or len(datos) < 6:
+        raise ValueError("El archivo no es una sesión guardada por el aplicativo")
+    version, banderas = struct.unpack_from('<BB', datos, 4)
+    if version > VERSION:
+        raise ValueError(f"Versión de sesión no soportada: {version}")
+
+    try:
+        return _leer_cuerpo(zlib.decompress(datos[6:]) if banderas & COMPRIMIDO else datos[6:])
+    except (IndexError, zlib.error) as e:
+        raise ValueError("Archivo de sesión truncado o dañado") from e
+
+
+def _leer_cuerpo(cuerpo):
+    """
+    Secciones del cuerpo ya descomprimido; ignora las etiquetas desconocidas
+    """
+    sesion = {
+        'datos_credito': {},
+        'abonos_programados': [],
+        'abonos_adhoc': [],
+        'tablas': {},
+        'escenarios': None,
+    }
+    lector = _Lector(cuerpo)
+    while not lector.terminado:
+        etiqueta, contenido = lector.seccion()
+        if etiqueta == CREDITO:
+            sesion['datos_credito'] = json.loads(contenido.texto())
+        elif etiqueta == ABONOS:
+            sesion['abonos_programados'], sesion['abonos_adhoc'] = _leer_abonos(contenido)
+        elif etiqueta == TABLA:
+            nombre, tabla = _leer_tabla(contenido)
+            sesion['tablas'][nombre] = tabla
+        elif etiqueta == ESCENARIOS:
+            sesion['escenarios'] = _leer_escenarios(contenido)
+    return sesion
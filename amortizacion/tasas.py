@@ -0,0 +1,178 @@
+"""
+Conversión vectorizada de tasas de interés
+Mismas fórmulas que ConversionTasas, aplicadas sobre arreglos completos.
+Las conversiones escalares (un crédito, la calculadora del aplicativo) pasan
+por una caché acotada compartida por el proceso, y las hojas de tasas
+publicadas se convierten en bloque con tabla_equivalencias
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Frecuencias admitidas por el aplicativo (períodos por año)
+FRECUENCIAS = {
+    "Mensual": 12,
+    "Bimestral": 6,
+    "Trimestral": 4,
+    "Semestral": 2,
+    "Anual": 1
+}
+
+# Frecuencias de la tabla de tasas equivalentes (períodos por año)
+FRECUENCIAS_EQUIVALENTES = {
+    "Anual": 1,
+    "Semestral": 2,
+    "Trimestral": 4,
+    "Mensual": 12,
+    "Quincenal": 24,
+    "Semanal": 52,
+    "Diaria": 365
+}
+
+# Conversiones escalares distintas que se conservan en memoria
+TAMANO_CACHE_TASAS = 4096
+
+
+def nominal_a_efectiva(tasa_nominal, periodos_anio):
+    """
+    iₑ = (1 + iₙ/m)ᵐ - 1
+    """
+    m = np.asarray(periodos_anio, dtype=float)
+    return (1 + np.asarray(tasa_nominal, dtype=float) / m) ** m - 1
+
+
+def efectiva_a_nominal(tasa_efectiva, periodos_anio):
+    """
+    iₙ = m·((1 + iₑ)^(1/m) - 1)
+    """
+    m = np.asarray(periodos_anio, dtype=float)
+    return m * ((1 + np.asarray(tasa_efectiva, dtype=float)) ** (1 / m) - 1)
+
+
+def anticipada_a_vencida(tasa_anticipada):
+    """
+    iᵥ = iₐ / (1 - iₐ)
+    """
+    tasa = np.asarray(tasa_anticipada, dtype=float)
+    return tasa / (1 - tasa)
+
+
+def vencida_a_anticipada(tasa_vencida):
+    """
+    iₐ = iᵥ / (1 + iᵥ)
+    """
+    tasa = np.asarray(tasa_vencida, dtype=float)
+    return tasa / (1 + tasa)
+
+
+def tasa_equivalente(tasa_efectiva, freq_origen, freq_destino):
+    """
+    Tasa equivalente entre frecuencias: (1 + i)^(f₁/f₂) - 1
+    """
+    exponente = np.asarray(freq_origen, dtype=float) / np.asarray(freq_destino, dtype=float)
+    return (1 + np.asarray(tasa_efectiva, dtype=float)) ** exponente - 1
+
+
+def efectiva_anual(tasa_anual, tipo_tasa, modalidad, frecuencia):
+    """
+    Tasa efectiva anual vencida (nominal → efectiva y anticipada → vencida)
+    """
+    tasa = np.asarray(tasa_anual, dtype=float)
+    nominal = np.asarray(tipo_tasa) == "Nominal"
+    anticipada = np.asarray(modalidad) == "Anticipada"
+
+    tasa_efectiva = np.where(nominal, nominal_a_efectiva(tasa, frecuencia), tasa)
+    # np.where evalúa ambas ramas: una tasa vencida del 100% no debe advertir
+    # por la conversión anticipada que se descarta
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vencida = anticipada_a_vencida(tasa_efectiva)
+    return np.where(anticipada, vencida, tasa_efectiva)
+
+
+@lru_cache(maxsize=TAMANO_CACHE_TASAS)
+def conversion_tasa(tasa_anual, tipo_tasa, modalidad, freq_entrada, freq_salida):
+    """
+    Tasa efectiva vencida por período de `freq_salida` (memoizada)
+
+    `freq_entrada` es la capitalización de la tasa nominal; con freq_entrada
+    igual a freq_salida es la tasa por período de tasa_periodo. Las
+    reejecuciones de Streamlit y los créditos con la misma tasa reutilizan el
+    resultado en lugar de repetir las conversiones.
+    """
+    return float(tasa_equivalente(efectiva_anual(tasa_anual, tipo_tasa, modalidad, freq_entrada),
+                                  1, freq_salida))
+
+
+def tasa_periodo(tasa_anual, tipo_tasa, modalidad, frecuencia):
+    """
+    Tasa efectiva por período (nominal → efectiva y anticipada → vencida)
+
+    `tipo_tasa` ("Nominal"/"Efectiva") y `modalidad` ("Vencida"/"Anticipada")
+    pueden ser textos únicos o arreglos de textos del mismo tamaño que la tasa.
+    Con argumentos escalares el resultado sale de conversion_tasa.
+    """
+    if (isinstance(tipo_tasa, str) and isinstance(modalidad, str)
+            and np.ndim(tasa_anual) == np.ndim(frecuencia) == 0):
+        return np.float64(conversion_tasa(float(tasa_anual), tipo_tasa, modalidad,
+                                          float(frecuencia), float(frecuencia)))
+
+    return tasa_equivalente(efectiva_anual(tasa_anual, tipo_tasa, modalidad, frecuencia), 1, frecuencia)
+
+
+def tabla_equivalencias(tasas_anuales, tipo_tasa="Efectiva", modalidad="Vencida", frecuencia=1,
+                        frecuencias=FRECUENCIAS_EQUIVALENTES):
+    """
+    Tasas equivalentes por período de una hoja de tasas, en un solo cálculo
+
+    Cada tasa se lleva una vez a efectiva anual vencida y de ahí a todas las
+    frecuencias de `frecuencias` ({nombre: períodos por año}). `tipo_tasa`,
+    `modalidad` y `frecuencia` (capitalización de las nominales) pueden ser
+    escalares o arreglos del tamaño de la hoja.
+
+    Returns:
+        DataFrame con una fila por tasa (índice: tasa anual) y una columna por
+        frecuencia, en decimales
+    """
+    tasas = np.atleast_1d(np.asarray(tasas_anuales, dtype=float))
+    efectiva = efectiva_anual(tasas, tipo_tasa, modalidad, frecuencia)
+    periodos = np.array(list(frecuencias.values()), dtype=float)
+    valores = tasa_equivalente(efectiva[:, None], 1, periodos[None, :])
+    return pd.DataFrame(valores, index=pd.Index(tasas, name='Tasa_Anual'), columns=list(frecuencias))
+
+
+def conversion_completa(tasa, tipo_entrada, modalidad_entrada, freq_entrada,
+                        tipo_salida, modalidad_salida, freq_salida):
+    """
+    Conversión en cuatro pasos de la calculadora completa de tasas
+
+    1. Nominal → efectiva (si la entrada es nominal)
+    2. Anticipada ↔ vencida (si cambia la modalidad)
+    3. Equivalente a la frecuencia de salida (si cambia la frecuencia)
+    4. Efectiva → nominal (si la salida es nominal)
+
+    Returns:
+        (tasa resultante, pasos): los pasos aplicados como (descripción, tasa)
+    """
+    pasos = []
+    if tipo_entrada == "Nominal":
+        tasa = nominal_a_efectiva(tasa, freq_entrada)
+        pasos.append(("Paso 1: Nominal → Efectiva", tasa))
+
+    if modalidad_entrada == "Anticipada" and modalidad_salida == "Vencida":
+        tasa = anticipada_a_vencida(tasa)
+        pasos.append(("Paso 2: Anticipada → Vencida", tasa))
+    elif modalidad_entrada == "Vencida" and modalidad_salida == "Anticipada":
+        tasa = vencida_a_anticipada(tasa)
+        pasos.append(("Paso 2: Vencida → Anticipada", tasa))
+
+    if freq_entrada != freq_salida:
+        tasa = tasa_equivalente(tasa, 1, freq_salida)
+        pasos.append(("Paso 3: Cambio de frecuencia", tasa))
+
+    if tipo_salida == "Nominal":
+        tasa = efectiva_a_nominal(tasa, freq_salida)
+        pasos.append(("Paso 4: Efectiva → Nominal", tasa))
+
+    return float(tasa), [(descripcion, float(valor)) for descripcion, valor in pasos]
@@ -0,0 +1,209 @@
+"""
+Cola de trabajos en segundo plano
+Ejecuta cálculos largos (reportes, barridos, portafolios) en un pool de hilos
+para que el hilo del script de Streamlit no se bloquee; cada trabajo reporta
+su progreso, puede cancelarse y su resultado se recupera en reruns posteriores
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Estados posibles de un trabajo
+PENDIENTE = 'pendiente'
+EN_CURSO = 'en_curso'
+COMPLETADO = 'completado'
+CANCELADO = 'cancelado'
+FALLIDO = 'fallido'
+
+
+class TrabajoCancelado(Exception):
+    """
+    Se lanza dentro de un trabajo cuando se solicitó su cancelación
+    """
+
+
+class Trabajo:
+    """
+    Trabajo registrado en la cola
+
+    La función del trabajo recibe esta instancia como primer argumento y la usa
+    para reportar avance con `reportar`; cada reporte es también un punto de
+    cancelación.
+    """
+
+    def __init__(self, identificador, nombre):
+        """
+        Inicializa el trabajo en estado pendiente
+        """
+        self.identificador = identificador
+        self.nombre = nombre
+        self.progreso = 0.0
+        self.mensaje = "En cola"
+        self.creado = time.time()
+        self.terminado = None
+        self._cancelar = threading.Event()
+        self._futuro = None
+
+    def reportar(self, progreso, mensaje=None):
+        """
+        Actualiza el avance (0 a 1) y lanza TrabajoCancelado si se pidió cancelar
+        """
+        if self._cancelar.is_set():
+            raise TrabajoCancelado(self.nombre)
+        self.progreso = min(max(float(progreso), 0.0), 1.0)
+        if mensaje is not None:
+            self.mensaje = mensaje
+
+    @property
+    def cancelacion_solicitada(self):
+        return self._cancelar.is_set()
+
+    @property
+    def estado(self):
+        """
+        Estado actual según el futuro asociado
+        """
+        futuro = self._futuro
+        if futuro is None or (not futuro.running() and not futuro.done()):
+            return CANCELADO if self._cancelar.is_set() else PENDIENTE
+        if not futuro.done():
+            return EN_CURSO
+        if futuro.cancelled() or isinstance(futuro.exception(), TrabajoCancelado):
+            return CANCELADO
+        if futuro.exception() is not None:
+            return FALLIDO
+        return COMPLETADO
+
+    @property
+    def terminado_ok(self):
+        return self.estado == COMPLETADO
+
+    @property
+    def activo(self):
+        return self.estado in (PENDIENTE, EN_CURSO)
+
+    def resultado(self):
+        """
+        Resultado del trabajo completado (None si aún no termina o fue cancelado)
+        """
+        if self.estado != COMPLETADO:
+            return None
+        return self._futuro.result()
+
+    def error(self):
+        """
+        Excepción del trabajo fallido (None en cualquier otro estado)
+        """
+        if self.estado != FALLIDO:
+            return None
+        return self._futuro.exception()
+
+    def __repr__(self):
+        return f"Trabajo({self.identificador!r}, {self.nombre!r}, {self.estado}, {self.progreso:.0%})"
+
+
+class ColaTrabajos:
+    """
+    Registro de trabajos sobre un pool de hilos compartido
+
+    Pensada para crearse una sola vez por proceso (por ejemplo con
+    st.cache_resource); cada sesión guarda solo los identificadores de sus
+    trabajos y los consulta en cada rerun.
+    """
+
+    def __init__(self, max_hilos=2, max_terminados=50):
+        """
+        Inicializa la cola
+
+        Args:
+            max_hilos: trabajos ejecutándose a la vez
+            max_terminados: trabajos terminados que se conservan en el registro
+        """
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="trabajo")
+        self._trabajos = {}
+        self._contador = itertools.count(1)
+        self._candado = threading.Lock()
+        self.max_terminados = max_terminados
+
+    def enviar(self, nombre, funcion, *args, **kwargs):
+        """
+        Encola `funcion(trabajo, *args, **kwargs)` y retorna su identificador
+
+        La función no debe leer st.session_state: se ejecuta fuera del hilo del
+        script, así que los datos que necesita se pasan como argumentos.
+        """
+        with self._candado:
+            identificador = f"{nombre}-{next(self._contador)}"
+            trabajo = Trabajo(identificador, nombre)
+            self._trabajos[identificador] = trabajo
+
+        def ejecutar():
+            if trabajo.cancelacion_solicitada:
+                raise TrabajoCancelado(nombre)
+            trabajo.mensaje = "En curso"
+            try:
+                resultado = funcion(trabajo, *args, **kwargs)
+            finally:
+                trabajo.terminado = time.time()
+            trabajo.reportar(1.0, "Completado")
+            return resultado
+
+        trabajo._futuro = self._pool.submit(ejecutar)
+        self._depurar()
+        return identificador
+
+    def obtener(self, identificador):
+        """
+        Trabajo registrado con ese identificador (None si no existe o se depuró)
+        """
+        return self._trabajos.get(identificador)
+
+    def cancelar(self, identificador):
+        """
+        Solicita la cancelación; un trabajo en curso se detiene en su próximo reporte
+        """
+        trabajo = self.obtener(identificador)
+        if trabajo is None:
+            return False
+        trabajo._cancelar.set()
+        if trabajo._futuro is not None:
+            trabajo._futuro.cancel()
+        return True
+
+    def descartar(self, identificador):
+        """
+        Cancela el trabajo si sigue activo y lo quita del registro
+        """
+        self.cancelar(identificador)
+        with self._candado:
+            self._trabajos.pop(identificador, None)
+
+    def trabajos(self, identificadores=None):
+        """
+        Lista de trabajos (todos o solo los indicados), del más antiguo al más reciente
+        """
+        if identificadores is None:
+            seleccion = list(self._trabajos.values())
+        else:
+            seleccion = [self._trabajos[i] for i in identificadores if i in self._trabajos]
+        return sorted(seleccion, key=lambda trabajo: trabajo.creado)
+
+    def _depurar(self):
+        """
+        Conserva solo los `max_terminados` trabajos terminados más recientes
+        """
+        with self._candado:
+            terminados = sorted((t for t in self._trabajos.values() if not t.activo),
+                                key=lambda trabajo: trabajo.creado)
+            for trabajo in terminados[:max(len(terminados) - self.max_terminados, 0)]:
+                del self._trabajos[trabajo.identificador]
+
+    def cerrar(self):
+        """
+        Cancela los trabajos pendientes y libera el pool
+        """
+        for identificador in list(self._trabajos):
+            self.cancelar(identificador)
+        self._pool.shutdown(wait=False, cancel_futures=True)
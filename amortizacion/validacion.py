@@ -0,0 +1,188 @@
+"""
+Validaciones vectorizadas para lotes de créditos y tablas de amortización
+Complementa a ValidadorDatos: en lugar de lanzar una excepción al primer error,
+devuelve máscaras booleanas con el resultado de cada regla por fila
+"""
+
+import numpy as np
+import pandas as pd
+
+from .motor import a_centavos, cuota_fija, saldos_cerrados
+from .tasas import FRECUENCIAS, tasa_periodo
+
+# Mismos límites que los controles del formulario de configuración
+TASA_MINIMA = 0.001
+TASA_MAXIMA = 1.0
+MAX_PAGOS = 600
+
+
+class ValidadorLotes:
+    """
+    Validador de lotes completos con operaciones de NumPy
+    """
+
+    @staticmethod
+    def validar_creditos(creditos):
+        """
+        Valida un lote de definiciones de crédito sin detenerse en el primer error
+
+        `creditos` es un DataFrame (o dict de arreglos) con las columnas
+        'monto', 'tasa_anual' (decimal), 'frecuencia' y 'num_pagos'; las
+        columnas 'tipo_tasa' y 'modalidad' se validan si están presentes.
+
+        Returns:
+            DataFrame booleano con una columna por regla (True = error)
+        """
+        creditos = pd.DataFrame(creditos)
+        monto = creditos['monto'].to_numpy(dtype=float)
+        tasa = creditos['tasa_anual'].to_numpy(dtype=float)
+        frecuencia = creditos['frecuencia'].to_numpy(dtype=float)
+        num_pagos = creditos['num_pagos'].to_numpy(dtype=float)
+
+        errores = {
+            'monto_invalido': ~(monto > 0),
+            'tasa_fuera_de_rango': ~((tasa >= TASA_MINIMA) & (tasa <= TASA_MAXIMA)),
+            'frecuencia_invalida': ~np.isin(frecuencia, list(FRECUENCIAS.values())),
+            'num_pagos_invalido': ~((num_pagos >= 1) & (num_pagos <= MAX_PAGOS)
+                                    & (num_pagos == np.floor(num_pagos))),
+        }
+        if 'tipo_tasa' in creditos.columns:
+            errores['tipo_tasa_invalido'] = ~creditos['tipo_tasa'].isin(["Nominal", "Efectiva"]).to_numpy()
+        if 'modalidad' in creditos.columns:
+            errores['modalidad_invalida'] = ~creditos['modalidad'].isin(["Vencida", "Anticipada"]).to_numpy()
+            # Una tasa anticipada del 100% o más no tiene equivalente vencida
+            anticipada = creditos['modalidad'].to_numpy() == "Anticipada"
+            errores['tasa_fuera_de_rango'] |= anticipada & (tasa >= 1)
+
+        return pd.DataFrame(errores, index=creditos.index)
+
+    @staticmethod
+    def validar_abonos(abonos, creditos):
+        """
+        Valida un lote de abonos contra los créditos a los que pertenecen
+
+        `abonos` tiene las columnas 'credito' (posición del crédito en
+        `creditos`), 'monto' y 'periodo' (ad-hoc) o 'periodo_inicio'
+        (programados, con 'frecuencia' opcional). El saldo pendiente se
+        evalúa con la tabla básica del crédito en el período del abono, en
+        forma cerrada para todo el lote.
+
+        `creditos` debe traer 'monto', 'num_pagos' y 'tasa_periodo', o bien
+        las columnas de tasa anual que acepta `validar_creditos`.
+
+        Returns:
+            DataFrame booleano con una columna por regla (True = error)
+        """
+        abonos = pd.DataFrame(abonos)
+        creditos = pd.DataFrame(creditos)
+        columna_periodo = 'periodo' if 'periodo' in abonos.columns else 'periodo_inicio'
+
+        indice = abonos['credito'].to_numpy()
+        credito_inexistente = ~((indice >= 0) & (indice < len(creditos)))
+        indice = np.where(credito_inexistente, 0, indice).astype(np.int64)
+
+        monto_credito = creditos['monto'].to_numpy(dtype=float)[indice]
+        num_pagos = creditos['num_pagos'].to_numpy(dtype=float)[indice]
+        if 'tasa_periodo' in creditos.columns:
+            tasa = creditos['tasa_periodo'].to_numpy(dtype=float)[indice]
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                tasa = tasa_periodo(
+                    creditos['tasa_anual'].to_numpy(dtype=float),
+                    creditos.get('tipo_tasa', "Efectiva"),
+                    creditos.get('modalidad', "Vencida"),
+                    creditos['frecuencia'].to_numpy(dtype=float)
+                )[indice]
+
+        periodo = abonos[columna_periodo].to_numpy(dtype=float)
+        monto = abonos['monto'].to_numpy(dtype=float)
+        periodo_invalido = ~((periodo >= 1) & (periodo == np.floor(periodo)))
+        fuera_de_plazo = ~credito_inexistente & (periodo > num_pagos)
+
+        # Saldo pendiente tras la cuota regular del período del abono
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            cuota = cuota_fija(monto_credito, tasa, num_pagos)
+            saldo = saldos_cerrados(monto_credito, tasa, cuota,
+                                    np.clip(periodo, 0, num_pagos))
+
+        errores = {
+            'credito_inexistente': credito_inexistente,
+            'monto_invalido': ~(monto > 0),
+            'periodo_invalido': periodo_invalido,
+            'periodo_fuera_de_plazo': ~periodo_invalido & fuera_de_plazo,
+            'abono_mayor_al_saldo': (~(credito_inexistente | periodo_invalido | fuera_de_plazo)
+                                     & (monto > np.round(saldo, 2))),
+        }
+        if 'frecuencia' in abonos.columns:
+            frecuencia = abonos['frecuencia'].to_numpy(dtype=float)
+            errores['frecuencia_invalida'] = ~((frecuencia >= 1) & (frecuencia == np.floor(frecuencia)))
+
+        return pd.DataFrame(errores, index=abonos.index)
+
+    @staticmethod
+    def filas_validas(errores):
+        """
+        Máscara de filas sin ningún error a partir del resultado de una validación
+        """
+        return ~errores.to_numpy().any(axis=1)
+
+    @staticmethod
+    def validar_conservacion(tabla, tolerancia_centavos=None):
+        """
+        Verifica la conservación de balances en una tabla (o lote) de amortización
+
+        Acepta una tabla con el esquema estándar, opcionalmente con una columna
+        'Crédito' que identifica cada préstamo en formato largo. Las reglas se
+        evalúan en centavos enteros:
+
+        - cuota_descuadrada: Cuota ≠ Interés + Capital
+        - saldo_descuadrado: Saldo_Final ≠ Saldo_Inicial - Capital - Abono_Extra
+        - continuidad: Saldo_Inicial ≠ Saldo_Final del período anterior
+        - saldo_final_no_cero: la última fila de cada crédito no termina en cero
+
+        Por defecto la tolerancia es 0 centavos para tablas generadas en modo
+        exacto y 1 centavo para tablas en punto flotante redondeadas por columna.
+
+        Returns:
+            DataFrame booleano con una columna por regla (True = error)
+        """
+        saldo_inicial = a_centavos(tabla['Saldo_Inicial'])
+        cuota = a_centavos(tabla['Cuota'])
+        interes = a_centavos(tabla['Interés'])
+        capital = a_centavos(tabla['Capital'])
+        abono = (a_centavos(tabla['Abono_Extra']) if 'Abono_Extra' in tabla.columns
+                 else np.zeros_like(cuota))
+        saldo_final = a_centavos(tabla['Saldo_Final'])
+
+        if tolerancia_centavos is None:
+            tolerancia_centavos = 0 if tabla.attrs.get('exacto', False) else 1
+
+        if 'Crédito' in tabla.columns:
+            credito = np.asarray(tabla['Crédito'])
+        else:
+            credito = np.zeros(len(tabla), dtype=np.int64)
+
+        # Fronteras entre créditos consecutivos en formato largo
+        mismo_credito = np.zeros(len(tabla), dtype=bool)
+        mismo_credito[1:] = credito[1:] == credito[:-1]
+        ultima_fila = np.ones(len(tabla), dtype=bool)
+        ultima_fila[:-1] = ~mismo_credito[1:]
+
+        saldo_anterior = np.empty_like(saldo_final)
+        saldo_anterior[1:] = saldo_final[:-1]
+        saldo_anterior[:1] = saldo_inicial[:1]
+
+        return pd.DataFrame({
+            'cuota_descuadrada': np.abs(cuota - interes - capital) > tolerancia_centavos,
+            'saldo_descuadrado': np.abs(saldo_inicial - capital - abono - saldo_final) > tolerancia_centavos,
+            'continuidad': mismo_credito & (np.abs(saldo_inicial - saldo_anterior) > tolerancia_centavos),
+            'saldo_final_no_cero': ultima_fila & (np.abs(saldo_final) > tolerancia_centavos),
+        }, index=tabla.index)
+
+    @staticmethod
+    def conservacion_valida(tabla, tolerancia_centavos=None):
+        """
+        Indica si toda la tabla cumple las reglas de conservación de balances
+        """
+        errores = ValidadorLotes.validar_conservacion(tabla, tolerancia_centavos)
+        return not errores.to_numpy().any()
@@ -5,19 +5,48 @@ Interfaz moderna y visual para el proyecto de Ingeniería Financiera
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime, timedelta
 import io
-import base64
+import os
+
+# Plotly se importa dentro de los métodos que construyen gráficos: su carga es
+# la parte más costosa del arranque y la primera vista no dibuja gráficos
 
 # Importar nuestras clases del proyecto
-from proyecto import (
-    ConversionTasas, CalculadoraAmortizacion, ManejoAbonos, 
-    ExportadorDatos, ValidadorDatos
+from proyecto import ConversionTasas, CalculadoraAmortizacion, ManejoAbonos
+from amortizacion import (
+    FRECUENCIAS, FRECUENCIAS_EQUIVALENTES, ValidadorLotes, conversion_completa, conversion_tasa,
+    tasa_periodo
+)
+from amortizacion.cargos import columnas_cargos
+from amortizacion.credito import Credito
+from amortizacion.escenarios import ConjuntoEscenarios
+from amortizacion.exportacion import reporte_csv, reporte_excel, tabla_csv, tabla_excel
+from amortizacion.extractos import escribir_extractos, extractos
+from amortizacion.abonos import tabla_con_abonos
+from amortizacion.fechas import BASES_DIAS, CalendarioPagos
+from amortizacion.indice_abonos import IndiceAbonos
+from amortizacion.monedas import (
+    COLUMNA_VALOR, MONEDA_LOCAL, aplicar_cargos_en_unidad, cargar_curvas, columnas_locales
 )
+from amortizacion.portafolio import proyectar_portafolio
+from amortizacion.refinanciacion import AnalizadorRefinanciacion, grilla_ofertas
+from amortizacion.resumen import ResumenComparacion, ResumenTabla
+from amortizacion.sensibilidad import superficie_sensibilidad
+from amortizacion.sesiones import cargar_sesion, guardar_sesion
+from amortizacion.trabajos import CANCELADO, FALLIDO, ColaTrabajos
+
+# Archivo local opcional de festivos (una fecha AAAA-MM-DD por línea)
+RUTA_FESTIVOS = "festivos.txt"
+
+# Archivo local opcional de curvas proyectadas de unidades (UVR, USD...),
+# con líneas 'unidad,fecha,valor'
+RUTA_CURVAS = "curvas_indice.csv"
+
+# Con más períodos que este, la línea de saldo se dibuja sin marcadores:
+# cientos de marcadores no se distinguen y encarecen el dibujo
+MAX_MARCADORES = 120
 
 # Configuración de la página
 st.set_page_config(
@@ -56,6 +85,20 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def cola_trabajos():
+    """
+    Cola de trabajos en segundo plano compartida por todas las sesiones
+    """
+    return ColaTrabajos(max_hilos=2)
+
+@st.cache_resource
+def curvas_indice():
+    """
+    Curvas de las unidades indexadas, cargadas una vez por proceso
+    """
+    return cargar_curvas(RUTA_CURVAS)
+
 class AplicativoWeb:
     """
     Clase principal para la aplicación web de Streamlit
@@ -67,6 +110,10 @@ class AplicativoWeb:
         """
         if 'calculadora' not in st.session_state:
             st.session_state.calculadora = None
+        if 'motor' not in st.session_state:
+            st.session_state.motor = None
+        if 'cargos' not in st.session_state:
+            st.session_state.cargos = []
         if 'manejo_abonos' not in st.session_state:
             st.session_state.manejo_abonos = None
         if 'datos_credito' not in st.session_state:
@@ -75,6 +122,10 @@ class AplicativoWeb:
             st.session_state.tabla_basica = None
         if 'tabla_con_abonos' not in st.session_state:
             st.session_state.tabla_con_abonos = None
+        if 'escenarios' not in st.session_state:
+            st.session_state.escenarios = ConjuntoEscenarios()
+        if 'trabajos' not in st.session_state:
+            st.session_state.trabajos = {}
     
     def mostrar_header(self):
         """
@@ -104,6 +155,15 @@ class AplicativoWeb:
                 help="Ingrese cualquier monto de crédito (sin límite máximo)"
             )
             
+            # Denominación: moneda local o una unidad con curva proyectada
+            unidad = st.selectbox(
+                "💱 Denominación",
+                [MONEDA_LOCAL] + list(curvas_indice()),
+                format_func=lambda valor: valor or "Moneda local ($)",
+                help=f"Con una unidad indexada el monto se ingresa en esa unidad y las tablas "
+                     f"se convierten con la curva de {RUTA_CURVAS}"
+            )
+            
             # Configuración de tasa
             st.subheader("📊 Configuración de Tasa")
             
@@ -158,6 +218,72 @@ class AplicativoWeb:
                 help="Número total de pagos del crédito"
             )
             
+            # Sistema de amortización
+            st.subheader("🏗️ Sistema de Amortización")
+            sistema_dict = {
+                "Francés (cuota fija)": "frances",
+                "Alemán (capital constante)": "aleman",
+                "Americano (pago final)": "americano"
+            }
+            
+            sistema_texto = st.selectbox(
+                "Sistema",
+                list(sistema_dict.keys()),
+                help="Forma en que se amortiza el capital"
+            )
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                periodos_gracia = st.number_input(
+                    "Períodos de Gracia",
+                    min_value=0,
+                    max_value=599,
+                    value=0,
+                    step=1,
+                    help="Pagos iniciales sin abono a capital"
+                )
+            
+            with col2:
+                tipo_gracia = st.selectbox(
+                    "Tipo de Gracia",
+                    ["Capital", "Total"],
+                    help="Capital: se pagan intereses. Total: los intereses se capitalizan"
+                )
+            
+            # Cargos adicionales por período
+            st.subheader("💼 Cargos Adicionales")
+            comision = st.number_input(
+                "Comisión por Período ($)",
+                min_value=0.0,
+                value=0.0,
+                step=1000.0,
+                format="%.2f",
+                help="Cargo fijo cobrado junto con cada cuota"
+            )
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                seguro = st.number_input(
+                    "Seguro (% saldo)",
+                    min_value=0.0,
+                    max_value=100.0,
+                    value=0.0,
+                    step=0.01,
+                    format="%.4f",
+                    help="Porcentaje por período sobre el saldo inicial"
+                ) / 100
+            
+            with col2:
+                impuesto = st.number_input(
+                    "Impuesto (% interés)",
+                    min_value=0.0,
+                    max_value=100.0,
+                    value=0.0,
+                    step=1.0,
+                    format="%.2f",
+                    help="Porcentaje sobre los intereses de cada período"
+                ) / 100
+            
             # Fecha de inicio
             fecha_inicio = st.date_input(
                 "📅 Fecha de Inicio",
@@ -165,64 +291,152 @@ class AplicativoWeb:
                 help="Fecha de inicio del crédito"
             )
             
+            # Conteo de días para el interés de cada período
+            base_dias = st.selectbox(
+                "📐 Base de Días",
+                [None] + list(BASES_DIAS),
+                format_func=lambda valor: valor or "Períodos iguales",
+                help="Con una base de días el interés de cada período se calcula con los días "
+                     "reales entre fechas de pago"
+            )
+            
             submitted = st.form_submit_button("✅ Configurar Crédito", type="primary")
             
             if submitted:
                 try:
-                    # Procesar tasa
-                    tasa_procesada = self.procesar_tasa(tasa_anual, tipo_tasa, modalidad, frecuencia)
-                    
-                    # Crear calculadora
-                    fecha_inicio_dt = datetime.combine(fecha_inicio, datetime.min.time())
-                    st.session_state.calculadora = CalculadoraAmortizacion(
-                        monto=monto,
-                        tasa_periodo=tasa_procesada,
-                        num_pagos=num_pagos,
-                        fecha_inicio=fecha_inicio_dt
-                    )
-                    
-                    st.session_state.manejo_abonos = ManejoAbonos(st.session_state.calculadora)
-                    
-                    # Guardar datos para mostrar
-                    st.session_state.datos_credito = {
+                    self.construir_credito({
                         'monto': monto,
+                        'unidad': unidad,
                         'tasa_anual_original': tasa_anual * 100,
                         'tipo_tasa': tipo_tasa,
                         'modalidad': modalidad,
                         'frecuencia': frecuencia,
                         'frecuencia_texto': frecuencia_texto,
                         'num_pagos': num_pagos,
-                        'fecha_inicio': fecha_inicio_dt.strftime('%Y-%m-%d'),
-                        'tasa_periodo': tasa_procesada * 100,
-                        'cuota_fija': st.session_state.calculadora.cuota_fija
-                    }
-                    
-                    st.session_state.tabla_basica = None
-                    st.session_state.tabla_con_abonos = None
-                    
+                        'fecha_inicio': fecha_inicio.strftime('%Y-%m-%d'),
+                        'base_dias': base_dias,
+                        'sistema': sistema_dict[sistema_texto],
+                        'sistema_texto': sistema_texto,
+                        'periodos_gracia': periodos_gracia,
+                        'tipo_gracia': tipo_gracia,
+                        'comision': comision,
+                        'seguro': seguro * 100,
+                        'impuesto': impuesto * 100
+                    })
                     st.sidebar.success("✅ Crédito configurado exitosamente!")
                     
                 except Exception as e:
                     st.sidebar.error(f"❌ Error: {str(e)}")
+        
+        self.sidebar_sesion()
     
-    def procesar_tasa(self, tasa_anual, tipo_tasa, modalidad, frecuencia):
+    def construir_credito(self, datos):
         """
-        Procesa la tasa según el tipo y modalidad
+        Crea la calculadora, el motor y los cargos a partir de los datos del
+        crédito (formulario o sesión restaurada) y los guarda en la sesión
         """
-        # Convertir a efectiva si es nominal
-        if tipo_tasa == "Nominal":
-            tasa_efectiva = ConversionTasas.nominal_a_efectiva(tasa_anual, frecuencia)
+        unidad = datos.get('unidad', MONEDA_LOCAL)
+        if unidad != MONEDA_LOCAL and unidad not in curvas_indice():
+            raise ValueError(f"No hay curva para la unidad {unidad} en {RUTA_CURVAS}")
+        
+        # Tasa por período, motor y cargos
+        credito = Credito(datos, curvas=curvas_indice(), festivos=RUTA_FESTIVOS)
+        datos = credito.datos
+        
+        # Crear calculadora
+        fecha_inicio_dt = datetime.strptime(datos['fecha_inicio'], '%Y-%m-%d')
+        st.session_state.calculadora = CalculadoraAmortizacion(
+            monto=datos['monto'],
+            tasa_periodo=credito.tasa_periodo,
+            num_pagos=datos['num_pagos'],
+            fecha_inicio=fecha_inicio_dt
+        )
+        
+        st.session_state.manejo_abonos = ManejoAbonos(st.session_state.calculadora)
+        
+        # Sistemas distintos al francés (o con gracia o base de días) usan el motor vectorizado
+        if not credito.frances_simple:
+            st.session_state.motor = credito.motor
         else:
-            tasa_efectiva = tasa_anual
+            st.session_state.motor = None
+            datos['cuota_fija'] = st.session_state.calculadora.cuota_fija
         
-        # Convertir de anticipada a vencida si es necesario
-        if modalidad == "Anticipada":
-            tasa_efectiva = ConversionTasas.anticipada_a_vencida(tasa_efectiva)
+        # Capas de cargos que se agregan a cada tabla generada
+        st.session_state.cargos = credito.cargos
         
-        # Calcular tasa por período
-        tasa_periodo = ConversionTasas.tasa_equivalente(tasa_efectiva, 1, frecuencia)
+        # Guardar datos para mostrar
+        st.session_state.datos_credito = datos
         
-        return tasa_periodo
+        st.session_state.tabla_basica = None
+        st.session_state.tabla_con_abonos = None
+    
+    def sidebar_sesion(self):
+        """
+        Guardar la sesión actual en un archivo y restaurar una sesión guardada
+        """
+        with st.sidebar.expander("💾 Guardar / Restaurar Sesión"):
+            if st.session_state.datos_credito:
+                incluir_tablas = st.checkbox(
+                    "Incluir tablas generadas", value=True,
+                    help="Evita recalcular las tablas al restaurar (archivo más grande)"
+                )
+                # El archivo se genera al hacer clic, no en cada reejecución
+                st.download_button(
+                    label="💾 Guardar Sesión",
+                    data=self.exportar_sesion(incluir_tablas),
+                    file_name=f"sesion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.amz",
+                    mime="application/octet-stream"
+                )
+            
+            archivo = st.file_uploader("Restaurar sesión", type=['amz'], key="archivo_sesion")
+            if archivo is not None and st.button("📂 Restaurar"):
+                try:
+                    self.restaurar_sesion(archivo.getvalue())
+                    st.success("✅ Sesión restaurada")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ No se pudo restaurar la sesión: {str(e)}")
+    
+    def exportar_sesion(self, incluir_tablas=True):
+        """
+        Función que serializa el crédito, los abonos, los escenarios y
+        (opcionalmente) las tablas cuando se la llama
+
+        st.download_button la ejecuta solo al descargar, en otro hilo sin
+        acceso a st.session_state, así que los objetos se toman de la sesión
+        aquí y la serialización y la compresión quedan diferidas.
+        """
+        manejo = st.session_state.manejo_abonos
+        datos_credito = dict(st.session_state.datos_credito)
+        programados = list(manejo.abonos_programados) if manejo else []
+        adhoc = list(manejo.abonos_adhoc) if manejo else []
+        escenarios = st.session_state.escenarios
+        tablas = None
+        if incluir_tablas:
+            tablas = {
+                'tabla_basica': st.session_state.tabla_basica,
+                'tabla_con_abonos': st.session_state.tabla_con_abonos
+            }
+        return lambda: guardar_sesion(datos_credito, programados, adhoc,
+                                      tablas=tablas, escenarios=escenarios)
+    
+    def restaurar_sesion(self, datos):
+        """
+        Reconstruye la sesión desde un archivo guardado con exportar_sesion
+        """
+        sesion = cargar_sesion(datos)
+        if sesion['datos_credito']:
+            self.construir_credito(sesion['datos_credito'])
+            for abono in sesion['abonos_programados']:
+                st.session_state.manejo_abonos.agregar_abono_programado(
+                    abono['periodo_inicio'], abono['monto'], abono['frecuencia']
+                )
+            for abono in sesion['abonos_adhoc']:
+                st.session_state.manejo_abonos.agregar_abono_adhoc(abono['periodo'], abono['monto'])
+            st.session_state.tabla_basica = sesion['tablas'].get('tabla_basica')
+            st.session_state.tabla_con_abonos = sesion['tablas'].get('tabla_con_abonos')
+        if sesion['escenarios'] is not None:
+            st.session_state.escenarios = sesion['escenarios']
     
     def mostrar_resumen_credito(self):
         """
@@ -236,7 +450,7 @@ class AplicativoWeb:
             with col1:
                 st.metric(
                     label="💰 Monto del Crédito",
-                    value=f"${st.session_state.datos_credito['monto']:,.2f}"
+                    value=self.formato_monto(st.session_state.datos_credito['monto'])
                 )
             
             with col2:
@@ -256,9 +470,32 @@ class AplicativoWeb:
             with col4:
                 st.metric(
                     label="💳 Cuota Fija",
-                    value=f"${st.session_state.datos_credito['cuota_fija']:,.2f}",
-                    help=f"Tasa por período: {st.session_state.datos_credito['tasa_periodo']:.4f}%"
+                    value=self.formato_monto(st.session_state.datos_credito['cuota_fija']),
+                    help=f"Tasa por período: {st.session_state.datos_credito['tasa_periodo']:.4f}% · "
+                         f"{st.session_state.datos_credito['sistema_texto']}"
                 )
+            
+            unidad = st.session_state.datos_credito.get('unidad', MONEDA_LOCAL)
+            if unidad != MONEDA_LOCAL:
+                curva = curvas_indice()[unidad]
+                valor = curva.valor_publicado(np.datetime64(st.session_state.datos_credito['fecha_inicio']))
+                st.caption(f"💱 Crédito denominado en {unidad}: monto y cuota en {unidad} "
+                           f"(1 {unidad} = ${float(valor):,.4f} al inicio; curva hasta {curva.fechas[-1]}).")
+    
+    def formato_monto(self, valor):
+        """
+        Monto en la unidad del crédito, con el mismo formato de las tablas
+        """
+        unidad = st.session_state.datos_credito.get('unidad', MONEDA_LOCAL)
+        if unidad == MONEDA_LOCAL:
+            return f"${valor:,.2f}"
+        return f"{valor:,.2f} {unidad}"
+    
+    def simbolo_monto(self):
+        """
+        Símbolo de los montos del crédito para etiquetas y ejes
+        """
+        return st.session_state.datos_credito.get('unidad', MONEDA_LOCAL) or "$"
     
     def configurar_abonos(self):
         """
@@ -289,7 +526,7 @@ class AplicativoWeb:
                 
                 with col2:
                     monto_abono = st.number_input(
-                        "Monto del Abono ($)",
+                        f"Monto del Abono ({self.simbolo_monto()})",
                         min_value=1.0,
                         value=1000.0,
                         step=100.0,
@@ -307,10 +544,15 @@ class AplicativoWeb:
                     )
                 
                 if st.form_submit_button("➕ Agregar Abono Programado"):
-                    st.session_state.manejo_abonos.agregar_abono_programado(
-                        periodo_inicio, monto_abono, frecuencia_abono
-                    )
-                    st.success(f"✅ Abono programado agregado: ${monto_abono:,.2f} cada {frecuencia_abono} período(s)")
+                    errores = self.validar_abono(periodo_inicio, monto_abono, frecuencia_abono)
+                    if errores:
+                        for error in errores:
+                            st.error(f"❌ {error}")
+                    else:
+                        st.session_state.manejo_abonos.agregar_abono_programado(
+                            periodo_inicio, monto_abono, frecuencia_abono
+                        )
+                        st.success(f"✅ Abono programado agregado: {self.formato_monto(monto_abono)} cada {frecuencia_abono} período(s)")
         
         with tab2:
             st.write("Configurar abonos únicos en períodos específicos")
@@ -329,7 +571,7 @@ class AplicativoWeb:
                 
                 with col2:
                     monto_adhoc = st.number_input(
-                        "Monto del Abono ($)",
+                        f"Monto del Abono ({self.simbolo_monto()})",
                         min_value=1.0,
                         value=5000.0,
                         step=100.0,
@@ -338,12 +580,42 @@ class AplicativoWeb:
                     )
                 
                 if st.form_submit_button("➕ Agregar Abono Ad-hoc"):
-                    st.session_state.manejo_abonos.agregar_abono_adhoc(periodo_adhoc, monto_adhoc)
-                    st.success(f"✅ Abono ad-hoc agregado: ${monto_adhoc:,.2f} en período {periodo_adhoc}")
+                    errores = self.validar_abono(periodo_adhoc, monto_adhoc)
+                    if errores:
+                        for error in errores:
+                            st.error(f"❌ {error}")
+                    else:
+                        st.session_state.manejo_abonos.agregar_abono_adhoc(periodo_adhoc, monto_adhoc)
+                        st.success(f"✅ Abono ad-hoc agregado: {self.formato_monto(monto_adhoc)} en período {periodo_adhoc}")
         
         with tab3:
             self.mostrar_abonos_configurados()
     
+    def validar_abono(self, periodo, monto, frecuencia=None):
+        """
+        Valida un abono contra el crédito configurado y retorna los mensajes de error
+        """
+        mensajes = {
+            'monto_invalido': "El monto del abono debe ser mayor que cero",
+            'periodo_invalido': "El período del abono debe ser un entero positivo",
+            'periodo_fuera_de_plazo': "El período del abono supera el número de pagos",
+            'abono_mayor_al_saldo': "El abono supera el saldo pendiente en ese período",
+            'frecuencia_invalida': "La frecuencia del abono debe ser un entero positivo"
+        }
+        
+        datos = st.session_state.datos_credito
+        creditos = {
+            'monto': [datos['monto']],
+            'num_pagos': [datos['num_pagos']],
+            'tasa_periodo': [datos['tasa_periodo'] / 100]
+        }
+        abono = {'credito': [0], 'periodo': [periodo], 'monto': [monto]}
+        if frecuencia is not None:
+            abono['frecuencia'] = [frecuencia]
+        
+        errores = ValidadorLotes.validar_abonos(abono, creditos).iloc[0]
+        return [mensajes[regla] for regla, hay_error in errores.items() if hay_error]
+    
     def mostrar_abonos_configurados(self):
         """
         Muestra los abonos configurados
@@ -361,12 +633,12 @@ class AplicativoWeb:
         if st.session_state.manejo_abonos.abonos_programados:
             st.write("**🔄 Abonos Programados:**")
             for i, abono in enumerate(st.session_state.manejo_abonos.abonos_programados, 1):
-                st.write(f"   {i}. ${abono['monto']:,.2f} cada {abono['frecuencia']} período(s) desde período {abono['periodo_inicio']}")
+                st.write(f"   {i}. {self.formato_monto(abono['monto'])} cada {abono['frecuencia']} período(s) desde período {abono['periodo_inicio']}")
         
         if st.session_state.manejo_abonos.abonos_adhoc:
             st.write("**📅 Abonos Ad-hoc:**")
             for i, abono in enumerate(st.session_state.manejo_abonos.abonos_adhoc, 1):
-                st.write(f"   {i}. ${abono['monto']:,.2f} en período {abono['periodo']}")
+                st.write(f"   {i}. {self.formato_monto(abono['monto'])} en período {abono['periodo']}")
     
     def generar_y_mostrar_tablas(self):
         """
@@ -383,35 +655,154 @@ class AplicativoWeb:
         
         with col1:
             if st.button("📋 Generar Tabla Básica", type="primary"):
-                st.session_state.tabla_basica = st.session_state.calculadora.generar_tabla_basica()
+                st.session_state.tabla_basica = self.generar_tabla_basica()
         
         with col2:
             if st.button("💰 Generar Tabla con Abonos", type="primary"):
-                if (st.session_state.manejo_abonos.abonos_programados or 
-                    st.session_state.manejo_abonos.abonos_adhoc):
-                    st.session_state.tabla_con_abonos = st.session_state.manejo_abonos.generar_tabla_con_abonos()
+                if not self.indice_abonos().vacio:
+                    st.session_state.tabla_con_abonos = self.generar_tabla_con_abonos()
                 else:
                     st.warning("⚠️ No hay abonos configurados. La tabla será igual a la básica.")
-                    st.session_state.tabla_con_abonos = st.session_state.calculadora.generar_tabla_basica()
+                    st.session_state.tabla_con_abonos = self.generar_tabla_basica()
         
         # Mostrar tablas en tabs
         if st.session_state.tabla_basica is not None or st.session_state.tabla_con_abonos is not None:
-            tab1, tab2, tab3 = st.tabs(["📋 Tabla Básica", "💰 Tabla con Abonos", "📊 Comparación"])
+            # Solo se ejecuta la pestaña visible: las ocultas no construyen gráficos
+            tab1, tab2, tab3 = st.tabs(["📋 Tabla Básica", "💰 Tabla con Abonos", "📊 Comparación"],
+                                       key="pestana_tablas", on_change="rerun")
             
-            with tab1:
-                if st.session_state.tabla_basica is not None:
-                    self.mostrar_tabla_interactiva(st.session_state.tabla_basica, "Básica")
-                else:
-                    st.info("👆 Haga clic en 'Generar Tabla Básica' para ver los resultados")
+            if tab1.open:
+                with tab1:
+                    if st.session_state.tabla_basica is not None:
+                        self.mostrar_tabla_interactiva(st.session_state.tabla_basica, "Básica")
+                    else:
+                        st.info("👆 Haga clic en 'Generar Tabla Básica' para ver los resultados")
             
-            with tab2:
-                if st.session_state.tabla_con_abonos is not None:
-                    self.mostrar_tabla_interactiva(st.session_state.tabla_con_abonos, "Con Abonos")
-                else:
-                    st.info("👆 Haga clic en 'Generar Tabla con Abonos' para ver los resultados")
+            if tab2.open:
+                with tab2:
+                    if st.session_state.tabla_con_abonos is not None:
+                        self.mostrar_tabla_interactiva(st.session_state.tabla_con_abonos, "Con Abonos")
+                    else:
+                        st.info("👆 Haga clic en 'Generar Tabla con Abonos' para ver los resultados")
             
-            with tab3:
-                self.mostrar_comparacion()
+            if tab3.open:
+                with tab3:
+                    self.mostrar_comparacion()
+    
+    def generar_tabla_basica(self):
+        """
+        Genera la tabla básica con el motor vectorizado o con la calculadora
+        """
+        if st.session_state.motor is not None:
+            tabla = st.session_state.motor.tabla()
+        else:
+            tabla = self.aplicar_calendario(st.session_state.calculadora.generar_tabla_basica())
+        return self.con_cargos(tabla)
+    
+    def con_cargos(self, tabla):
+        """
+        Agrega los cargos y, si el crédito está en una unidad indexada, las columnas en moneda local
+        """
+        unidad = st.session_state.datos_credito.get('unidad', MONEDA_LOCAL)
+        curva = None if unidad == MONEDA_LOCAL else curvas_indice()[unidad]
+        return aplicar_cargos_en_unidad(tabla, st.session_state.cargos, curva)
+    
+    def indice_abonos(self):
+        """
+        Índice de los abonos configurados, construido una vez por cambio en los abonos
+        """
+        manejo = st.session_state.manejo_abonos
+        num_pagos = st.session_state.datos_credito['num_pagos']
+        # La firma usa el contenido de los abonos (editar un monto la cambia) y
+        # la caché guarda el propio manejo, cuyo id no se reutiliza mientras viva
+        firma = (num_pagos,) + self.firma_abonos(manejo)
+        
+        cache = st.session_state.get('indice_abonos')
+        if cache is None or cache[0] is not manejo or cache[1] != firma:
+            cache = (manejo, firma, IndiceAbonos.desde_manejo(manejo, num_pagos))
+            st.session_state.indice_abonos = cache
+        return cache[2]
+    
+    @staticmethod
+    def firma_abonos(manejo):
+        """
+        Contenido de los abonos configurados como tuplas comparables
+        """
+        if not manejo:
+            return (), ()
+        return (tuple((a['periodo_inicio'], a['monto'], a['frecuencia']) for a in manejo.abonos_programados),
+                tuple((a['periodo'], a['monto']) for a in manejo.abonos_adhoc))
+    
+    def resumen_tabla(self, tabla):
+        """
+        Resumen de una tabla, calculado una vez mientras la tabla no cambie
+        """
+        resumenes = st.session_state.setdefault('resumenes', {})
+        cache = resumenes.get(id(tabla))
+        if cache is None or cache[0] is not tabla:
+            # Solo se conservan los resúmenes de las tablas vigentes
+            vigentes = {id(st.session_state.tabla_basica), id(st.session_state.tabla_con_abonos)}
+            for clave in [clave for clave in resumenes if clave not in vigentes]:
+                del resumenes[clave]
+            cache = (tabla, ResumenTabla.desde_tabla(tabla))
+            resumenes[id(tabla)] = cache
+        return cache[1]
+    
+    def grafico_tablas(self, clave, tablas, construir):
+        """
+        Figura construida una vez por versión de las tablas que grafica
+        
+        Las tablas se reemplazan (nunca se modifican) al regenerarse, así que su
+        identidad es su versión. Se guarda la figura y no su dict: st.plotly_chart
+        vuelve a validar los dict, lo que cuesta más que construirla.
+        """
+        graficos = st.session_state.setdefault('graficos', {})
+        cache = graficos.get(clave)
+        if cache is None or any(anterior is not tabla for anterior, tabla in zip(cache[0], tablas)):
+            cache = (tablas, construir(*tablas))
+            graficos[clave] = cache
+        return cache[1]
+    
+    def resumen_comparacion(self):
+        """
+        Comparación sin/con abonos a partir de los resúmenes de ambas tablas
+        """
+        return ResumenComparacion(self.resumen_tabla(st.session_state.tabla_basica),
+                                  self.resumen_tabla(st.session_state.tabla_con_abonos))
+    
+    def generar_tabla_con_abonos(self):
+        """
+        Genera la tabla con abonos a partir del índice de abonos por período
+
+        Con el motor vectorizado (otros sistemas, gracia o base de días) cada
+        período sigue la regla de pago del motor; los abonos reducen el plazo.
+        """
+        datos = st.session_state.datos_credito
+        if st.session_state.motor is not None:
+            tasas, cuota, pago_interes = st.session_state.motor.plan_pagos()
+            tabla = tabla_con_abonos(datos['monto'], tasas[0], datos['num_pagos'], self.indice_abonos(),
+                                     cuota=cuota[0], pago_interes=pago_interes[0])
+        else:
+            tabla = tabla_con_abonos(
+                datos['monto'],
+                datos['tasa_periodo'] / 100,
+                datos['num_pagos'],
+                self.indice_abonos(),
+                cuota=datos['cuota_fija']
+            )
+        return self.con_cargos(self.aplicar_calendario(tabla))
+    
+    def aplicar_calendario(self, tabla):
+        """
+        Reemplaza las fechas estimadas (meses de 30 días) por el calendario real de pagos
+        """
+        datos = st.session_state.datos_credito
+        calendario = CalendarioPagos(datos['frecuencia'], festivos=RUTA_FESTIVOS)
+        fechas = calendario.fechas(datos['fecha_inicio'], len(tabla))[0]
+        
+        tabla = tabla.copy()
+        tabla['Fecha'] = np.datetime_as_string(fechas, unit='D')
+        return tabla
     
     def mostrar_tabla_interactiva(self, tabla, tipo):
         """
@@ -420,17 +811,18 @@ class AplicativoWeb:
         st.write(f"**Tabla de Amortización {tipo}**")
         
         # Métricas resumen
+        resumen = self.resumen_tabla(tabla)
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("🗓️ Períodos", len(tabla))
+            st.metric("🗓️ Períodos", resumen.periodos)
         with col2:
-            st.metric("💰 Total Cuotas", f"${tabla['Cuota'].sum():,.2f}")
+            st.metric("💰 Total Cuotas", self.formato_monto(resumen.total_cuotas))
         with col3:
-            st.metric("💸 Total Intereses", f"${tabla['Interés'].sum():,.2f}")
+            st.metric("💸 Total Intereses", self.formato_monto(resumen.total_intereses))
         with col4:
             if 'Abono_Extra' in tabla.columns:
-                st.metric("💵 Total Abonos", f"${tabla['Abono_Extra'].sum():,.2f}")
+                st.metric("💵 Total Abonos", self.formato_monto(resumen.total_abonos))
         
         # Gráfico de evolución del saldo
         self.crear_grafico_saldo(tabla, tipo)
@@ -438,61 +830,66 @@ class AplicativoWeb:
         # Tabla interactiva
         st.write("**Detalle de Pagos:**")
         
+        # Formato de moneda para las columnas de montos y de cargos
+        formato = {columna: '${:,.2f}' for columna in [
+            'Saldo_Inicial', 'Cuota', 'Interés', 'Capital', 'Abono_Extra', 'Saldo_Final'
+        ] + columnas_cargos(tabla) + columnas_locales(tabla)}
+        
+        # Créditos en unidades: montos en la unidad y equivalentes en moneda local
+        unidad = st.session_state.datos_credito.get('unidad', MONEDA_LOCAL)
+        if COLUMNA_VALOR in tabla.columns:
+            for columna in formato:
+                if columna not in columnas_locales(tabla):
+                    formato[columna] = '{:,.2f} ' + unidad
+            formato[COLUMNA_VALOR] = '${:,.4f}'
+            st.caption(f"💱 Montos en {unidad}; las columnas *_Local están en moneda local "
+                       f"con el valor proyectado de la unidad en cada fecha de pago "
+                       f"(total pagado: ${resumen.total_pagado_local:,.2f}).")
+        
         # Opción para mostrar tabla completa o resumida
         mostrar_completa = st.checkbox(f"Mostrar tabla completa ({tipo})", value=False)
         
         if mostrar_completa:
             st.dataframe(
-                tabla.style.format({
-                    'Saldo_Inicial': '${:,.2f}',
-                    'Cuota': '${:,.2f}',
-                    'Interés': '${:,.2f}',
-                    'Capital': '${:,.2f}',
-                    'Abono_Extra': '${:,.2f}',
-                    'Saldo_Final': '${:,.2f}'
-                }),
+                tabla.style.format(formato),
                 use_container_width=True
             )
         else:
             # Mostrar solo primeros y últimos períodos
             st.write("**Primeros 10 períodos:**")
             st.dataframe(
-                tabla.head(10).style.format({
-                    'Saldo_Inicial': '${:,.2f}',
-                    'Cuota': '${:,.2f}',
-                    'Interés': '${:,.2f}',
-                    'Capital': '${:,.2f}',
-                    'Abono_Extra': '${:,.2f}',
-                    'Saldo_Final': '${:,.2f}'
-                }),
+                tabla.head(10).style.format(formato),
                 use_container_width=True
             )
             
             if len(tabla) > 10:
                 st.write("**Últimos 5 períodos:**")
                 st.dataframe(
-                    tabla.tail(5).style.format({
-                        'Saldo_Inicial': '${:,.2f}',
-                        'Cuota': '${:,.2f}',
-                        'Interés': '${:,.2f}',
-                        'Capital': '${:,.2f}',
-                        'Abono_Extra': '${:,.2f}',
-                        'Saldo_Final': '${:,.2f}'
-                    }),
+                    tabla.tail(5).style.format(formato),
                     use_container_width=True
                 )
     
     def crear_grafico_saldo(self, tabla, tipo):
         """
-        Crea gráfico de evolución del saldo
+        Muestra el gráfico de evolución del saldo
+        """
+        fig = self.grafico_tablas(f"saldo {tipo}", (tabla,),
+                                  lambda tabla: self.figura_saldo(tabla, tipo))
+        st.plotly_chart(fig, use_container_width=True)
+    
+    def figura_saldo(self, tabla, tipo):
+        """
+        Construye el gráfico de evolución del saldo
         """
+        import plotly.graph_objects as go
+        
         fig = go.Figure()
         
-        # Línea de saldo
+        # Línea de saldo (con marcadores solo en plazos cortos)
         fig.add_trace(go.Scatter(
             x=tabla['Período'],
             y=tabla['Saldo_Final'],
-            mode='lines+markers',
+            mode='lines+markers' if len(tabla) <= MAX_MARCADORES else 'lines',
             name='Saldo Pendiente',
             line=dict(color='#1f77b4', width=3),
             marker=dict(size=6)
@@ -511,9 +908,9 @@ class AplicativoWeb:
         fig.update_layout(
             title=f'Evolución del Saldo - {tipo}',
             xaxis_title='Período',
-            yaxis_title='Saldo Pendiente ($)',
+            yaxis_title=f'Saldo Pendiente ({self.simbolo_monto()})',
             yaxis2=dict(
-                title='Cuota ($)',
+                title=f'Cuota ({self.simbolo_monto()})',
                 overlaying='y',
                 side='right'
             ),
@@ -521,7 +918,7 @@ class AplicativoWeb:
             height=400
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        return fig
     
     def mostrar_comparacion(self):
         """
@@ -536,43 +933,40 @@ class AplicativoWeb:
         # Métricas de comparación
         tabla_basica = st.session_state.tabla_basica
         tabla_abonos = st.session_state.tabla_con_abonos
+        resumen = self.resumen_comparacion()
+        sin, con = resumen.sin_abonos, resumen.con_abonos
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            periodos_sin = len(tabla_basica)
-            periodos_con = len(tabla_abonos)
-            ahorro_tiempo = periodos_sin - periodos_con
-            
             st.metric(
                 "⏰ Ahorro en Tiempo",
-                f"{ahorro_tiempo} períodos",
-                delta=f"-{(ahorro_tiempo/periodos_sin)*100:.1f}%"
+                f"{resumen.ahorro_tiempo} períodos",
+                delta=f"-{resumen.porcentaje_tiempo:.1f}%"
             )
         
         with col2:
-            intereses_sin = tabla_basica['Interés'].sum()
-            intereses_con = tabla_abonos['Interés'].sum()
-            ahorro_intereses = intereses_sin - intereses_con
-            
             st.metric(
                 "💰 Ahorro en Intereses",
-                f"${ahorro_intereses:,.2f}",
-                delta=f"-{(ahorro_intereses/intereses_sin)*100:.1f}%"
+                self.formato_monto(resumen.ahorro_intereses),
+                delta=f"-{resumen.porcentaje_intereses:.1f}%"
             )
         
         with col3:
-            total_abonos = tabla_abonos['Abono_Extra'].sum()
-            roi = (ahorro_intereses / total_abonos) * 100 if total_abonos > 0 else 0
-            
             st.metric(
                 "📈 ROI de Abonos",
-                f"{roi:.1f}%",
+                f"{resumen.roi_abonos:.1f}%",
                 help="Retorno sobre inversión de los abonos extras"
             )
         
+        # Abonos programados después de la cancelación anticipada
+        no_aplicados = self.indice_abonos().total_entre(len(tabla_abonos) + 1, len(tabla_basica))
+        if no_aplicados > 0:
+            st.caption(f"ℹ️ {self.formato_monto(no_aplicados)} en abonos programados quedan después de la "
+                       f"cancelación del crédito (período {len(tabla_abonos)}) y no se aplican.")
+        
         # Gráfico comparativo
-        self.crear_grafico_comparativo(tabla_basica, tabla_abonos)
+        self.crear_grafico_comparativo(tabla_basica, tabla_abonos, resumen)
         
         # Tabla resumen
         st.write("**📋 Resumen Comparativo**")
@@ -583,38 +977,53 @@ class AplicativoWeb:
                 'Total Cuotas',
                 'Total Intereses',
                 'Total Abonos',
+                'Total Cargos',
                 'Total Pagado'
             ],
             'Sin Abonos': [
-                len(tabla_basica),
-                f"${tabla_basica['Cuota'].sum():,.2f}",
-                f"${tabla_basica['Interés'].sum():,.2f}",
-                "$0.00",
-                f"${tabla_basica['Cuota'].sum():,.2f}"
+                sin.periodos,
+                self.formato_monto(sin.total_cuotas),
+                self.formato_monto(sin.total_intereses),
+                self.formato_monto(0.0),
+                self.formato_monto(sin.total_cargos),
+                self.formato_monto(sin.total_pagado)
             ],
             'Con Abonos': [
-                len(tabla_abonos),
-                f"${tabla_abonos['Cuota'].sum():,.2f}",
-                f"${tabla_abonos['Interés'].sum():,.2f}",
-                f"${tabla_abonos['Abono_Extra'].sum():,.2f}",
-                f"${tabla_abonos['Cuota'].sum() + tabla_abonos['Abono_Extra'].sum():,.2f}"
+                con.periodos,
+                self.formato_monto(con.total_cuotas),
+                self.formato_monto(con.total_intereses),
+                self.formato_monto(con.total_abonos),
+                self.formato_monto(con.total_cargos),
+                self.formato_monto(con.total_pagado)
             ],
             'Diferencia': [
-                f"{ahorro_tiempo} menos",
-                f"${tabla_basica['Cuota'].sum() - tabla_abonos['Cuota'].sum():,.2f}",
-                f"${ahorro_intereses:,.2f}",
-                f"${tabla_abonos['Abono_Extra'].sum():,.2f}",
-                f"${(tabla_basica['Cuota'].sum()) - (tabla_abonos['Cuota'].sum() + tabla_abonos['Abono_Extra'].sum()):,.2f}"
+                f"{resumen.ahorro_tiempo} menos",
+                self.formato_monto(resumen.diferencia_cuotas),
+                self.formato_monto(resumen.ahorro_intereses),
+                self.formato_monto(con.total_abonos),
+                self.formato_monto(resumen.diferencia_cargos),
+                self.formato_monto(resumen.diferencia_pagado)
             ]
         }
         
         resumen_df = pd.DataFrame(resumen_data)
         st.dataframe(resumen_df, use_container_width=True)
     
-    def crear_grafico_comparativo(self, tabla_basica, tabla_abonos):
+    def crear_grafico_comparativo(self, tabla_basica, tabla_abonos, resumen):
+        """
+        Muestra el gráfico comparativo entre ambas tablas
+        """
+        fig = self.grafico_tablas("comparativo", (tabla_basica, tabla_abonos),
+                                  lambda basica, abonos: self.figura_comparativa(basica, abonos, resumen))
+        st.plotly_chart(fig, use_container_width=True)
+    
+    def figura_comparativa(self, tabla_basica, tabla_abonos, resumen):
         """
-        Crea gráfico comparativo entre ambas tablas
+        Construye el gráfico comparativo (2×2) entre ambas tablas
         """
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        
         fig = make_subplots(
             rows=2, cols=2,
             subplot_titles=('Evolución del Saldo', 'Intereses por Período', 
@@ -670,20 +1079,486 @@ class AplicativoWeb:
         )
         
         # Gráfico 4: Distribución de pagos (pie chart)
-        intereses_sin = tabla_basica['Interés'].sum()
-        capital_total = tabla_basica['Capital'].sum()
-        abonos_total = tabla_abonos['Abono_Extra'].sum()
-        
         fig.add_trace(
             go.Pie(labels=['Capital', 'Intereses', 'Abonos Extra'],
-                   values=[capital_total, tabla_abonos['Interés'].sum(), abonos_total],
+                   values=[resumen.sin_abonos.total_capital, resumen.con_abonos.total_intereses,
+                           resumen.con_abonos.total_abonos],
                    name="Distribución"),
             row=2, col=2
         )
         
         fig.update_layout(height=800, showlegend=True, title_text="Análisis Comparativo Completo")
+        return fig
+    
+    def espacio_escenarios(self):
+        """
+        Espacio de trabajo para comparar N escenarios de crédito y abonos
+        """
+        st.subheader("🗂️ Comparación de Escenarios")
+        escenarios = st.session_state.escenarios
+        datos = st.session_state.datos_credito
+        
+        col1, col2 = st.columns(2)
+        
+        # Los escenarios se evalúan con el sistema francés en moneda local y sin cargos
+        sin_extras = all(datos.get(clave, 0) == 0 for clave in ('comision', 'seguro', 'impuesto'))
+        credito_simple = (st.session_state.motor is None and sin_extras
+                          and datos.get('unidad', MONEDA_LOCAL) == MONEDA_LOCAL)
+        
+        with col1:
+            st.write("**➕ Agregar Crédito Configurado**")
+            if not credito_simple:
+                st.warning("⚠️ Los escenarios comparan créditos de sistema francés sin gracia ni base de días, en moneda "
+                           "local y sin cargos; el crédito configurado no se puede agregar. Use una "
+                           "alternativa con sus condiciones.")
+            else:
+                with st.form("escenario_actual"):
+                    nombre = st.text_input("Nombre del Escenario", value=f"Escenario {len(escenarios) + 1}")
+                    incluir_abonos = st.checkbox("Incluir abonos configurados", value=True)
+                    
+                    if st.form_submit_button("➕ Agregar Escenario"):
+                        abonos = st.session_state.manejo_abonos
+                        try:
+                            escenarios.agregar(
+                                nombre,
+                                datos['monto'],
+                                datos['tasa_periodo'] / 100,
+                                datos['num_pagos'],
+                                datos['frecuencia'],
+                                abonos.abonos_programados if incluir_abonos else (),
+                                abonos.abonos_adhoc if incluir_abonos else ()
+                            )
+                            st.success(f"✅ Escenario '{nombre}' agregado")
+                        except ValueError as e:
+                            st.error(f"❌ {str(e)}")
+        
+        with col2:
+            st.write("**🔀 Agregar Alternativa de Refinanciación**")
+            with st.form("escenario_alternativo"):
+                nombre_alt = st.text_input("Nombre", value=f"Alternativa {len(escenarios) + 1}")
+                monto_alt = st.number_input("Monto ($)", min_value=1.0, value=float(datos['monto']), step=1000.0)
+                tasa_alt = st.number_input("Tasa Anual (%)", min_value=0.1, max_value=100.0,
+                                           value=float(datos['tasa_anual_original']), step=0.1) / 100
+                
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    tipo_alt = st.selectbox("Tipo", ["Nominal", "Efectiva"], key="tipo_alt")
+                    frecuencia_alt = st.selectbox("Frecuencia", list(FRECUENCIAS.keys()), key="freq_alt")
+                with col_b:
+                    modalidad_alt = st.selectbox("Modalidad", ["Vencida", "Anticipada"], key="modalidad_alt")
+                    pagos_alt = st.number_input("Número de Pagos", min_value=1, max_value=600,
+                                                value=int(datos['num_pagos']), step=1)
+                
+                if st.form_submit_button("➕ Agregar Alternativa"):
+                    frecuencia = FRECUENCIAS[frecuencia_alt]
+                    try:
+                        escenarios.agregar(
+                            nombre_alt, monto_alt,
+                            float(tasa_periodo(tasa_alt, tipo_alt, modalidad_alt, frecuencia)),
+                            pagos_alt, frecuencia
+                        )
+                        st.success(f"✅ Escenario '{nombre_alt}' agregado")
+                    except ValueError as e:
+                        st.error(f"❌ {str(e)}")
+        
+        if not len(escenarios):
+            st.info("📊 Agregue escenarios para compararlos")
+            return
+        
+        st.markdown("---")
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            referencia = st.selectbox(
+                "Escenario de Referencia",
+                range(len(escenarios)),
+                format_func=lambda i: escenarios.nombres[i],
+                help="Los ahorros se calculan frente a este escenario"
+            )
+        with col2:
+            eliminar = st.selectbox("Eliminar", range(len(escenarios)),
+                                    format_func=lambda i: escenarios.nombres[i], key="eliminar_escenario")
+            if st.button("🗑️ Eliminar Escenario"):
+                escenarios.eliminar(eliminar)
+                st.rerun()
+        
+        metricas = escenarios.metricas(referencia)
+        st.dataframe(
+            metricas.style.format({
+                'Monto': '${:,.2f}',
+                'Tasa Período (%)': '{:.4f}%',
+                'Años': '{:.2f}',
+                'Total Cuotas': '${:,.2f}',
+                'Total Intereses': '${:,.2f}',
+                'Total Abonos': '${:,.2f}',
+                'Total Pagado': '${:,.2f}',
+                'Ahorro en Intereses': '${:,.2f}',
+                'Ahorro vs Referencia': '${:,.2f}',
+                'ROI Abonos (%)': '{:.1f}%'
+            }),
+            use_container_width=True
+        )
+        
+        # Por defecto se destacan los escenarios con menor total pagado
+        mejores = metricas.nsmallest(5, 'Total Pagado').index.tolist()
+        destacados = st.multiselect(
+            "Escenarios destacados en el gráfico",
+            range(len(escenarios)),
+            default=sorted(set(mejores) | {referencia}),
+            format_func=lambda i: escenarios.nombres[i]
+        )
+        self.crear_grafico_escenarios(escenarios, destacados)
+    
+    def crear_grafico_escenarios(self, escenarios, destacados):
+        """
+        Superpone las curvas de saldo de todos los escenarios
+
+        Con decenas de escenarios solo los destacados llevan color y leyenda;
+        el resto se dibuja en gris tenue como contexto.
+        """
+        import plotly.graph_objects as go
+        
+        saldos = escenarios.curvas_saldo()
+        anios = np.arange(1, saldos.shape[1] + 1)[None, :] / escenarios.frecuencia[:, None]
+        
+        fig = go.Figure()
+        for i, nombre in enumerate(escenarios.nombres):
+            destacado = i in destacados
+            fig.add_trace(go.Scattergl(
+                x=anios[i],
+                y=saldos[i],
+                mode='lines',
+                name=nombre,
+                line=dict(width=3 if destacado else 1, color=None if destacado else '#c0c0c0'),
+                opacity=1.0 if destacado else 0.5,
+                showlegend=destacado,
+                hovertemplate=f"{nombre}<br>Año %{{x:.2f}}<br>Saldo $%{{y:,.2f}}<extra></extra>"
+            ))
+        
+        fig.update_layout(
+            title='Evolución del Saldo por Escenario',
+            xaxis_title='Años',
+            yaxis_title='Saldo Pendiente ($)',
+            hovermode='closest',
+            height=500
+        )
         st.plotly_chart(fig, use_container_width=True)
     
+    def analisis_refinanciacion(self):
+        """
+        Evalúa refinanciar el crédito actual contra una grilla de ofertas
+        """
+        st.subheader("🔁 Análisis de Refinanciación")
+        
+        tabla = (st.session_state.tabla_con_abonos if st.session_state.tabla_con_abonos is not None
+                 else st.session_state.tabla_basica)
+        if tabla is None:
+            st.info("📊 Genere una tabla de amortización para analizar la refinanciación")
+            return
+        
+        datos = st.session_state.datos_credito
+        
+        with st.form("refinanciacion"):
+            periodo = st.slider(
+                "Refinanciar después del período",
+                min_value=0,
+                max_value=len(tabla) - 1,
+                value=min(12, len(tabla) - 1),
+                help="Pagos ya realizados del crédito actual"
+            )
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                tasa_min = st.number_input("Tasa Mínima (%)", min_value=0.1, max_value=100.0, value=8.0)
+                tasa_max = st.number_input("Tasa Máxima (%)", min_value=0.1, max_value=100.0, value=20.0)
+                pasos = st.number_input("Tasas a Evaluar", min_value=1, max_value=500, value=25)
+            with col2:
+                tipo_oferta = st.selectbox("Tipo de Tasa", ["Nominal", "Efectiva"], key="tipo_refi")
+                modalidad_oferta = st.selectbox("Modalidad", ["Vencida", "Anticipada"], key="modalidad_refi")
+                plazos = st.multiselect(
+                    "Plazos (número de pagos)",
+                    [12, 24, 36, 48, 60, 72, 84, 96, 120, 180, 240, 360],
+                    default=[24, 36, 48, 60]
+                )
+            with col3:
+                comision = st.number_input("Comisión Fija ($)", min_value=0.0, value=0.0, step=100.0)
+                comision_pct = st.number_input("Comisión (% del saldo)", min_value=0.0,
+                                               max_value=100.0, value=0.0, step=0.5) / 100
+                financiar = st.checkbox("Financiar comisión", value=False)
+            
+            evaluar = st.form_submit_button("🔍 Evaluar Ofertas", type="primary")
+        
+        if not evaluar:
+            return
+        if not plazos:
+            st.warning("⚠️ Seleccione al menos un plazo")
+            return
+        
+        try:
+            analizador = AnalizadorRefinanciacion(tabla, periodo, datos['frecuencia'])
+            ofertas = grilla_ofertas(
+                tasa_anual=np.linspace(tasa_min, tasa_max, int(pasos)) / 100,
+                num_pagos=plazos
+            )
+            ranking = analizador.evaluar(
+                **ofertas,
+                comision=comision,
+                comision_pct=comision_pct,
+                tipo_tasa=tipo_oferta,
+                modalidad=modalidad_oferta,
+                financiar_comision=financiar
+            )
+        except ValueError as e:
+            st.error(f"❌ {str(e)}")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        mejor = ranking.iloc[0]
+        with col1:
+            st.metric("💰 Saldo a Refinanciar", f"${analizador.saldo:,.2f}")
+        with col2:
+            st.metric("🏆 Mejor Ahorro (VPN)", f"${mejor['Ahorro VPN']:,.2f}",
+                      help=f"{mejor['Tasa Anual (%)']:.2f}% a {int(mejor['Número de Pagos'])} pagos")
+        with col3:
+            rentables = int((ranking['Ahorro VPN'] > 0).sum())
+            st.metric("✅ Ofertas con Ahorro", f"{rentables} de {len(ranking)}")
+        
+        st.dataframe(
+            ranking.head(20).style.format({
+                'Tasa Anual (%)': '{:.2f}%',
+                'Tasa Período (%)': '{:.4f}%',
+                'Comisión': '${:,.2f}',
+                'Cuota Nueva': '${:,.2f}',
+                'Total Pagado Nuevo': '${:,.2f}',
+                'Ahorro Nominal': '${:,.2f}',
+                'Ahorro VPN': '${:,.2f}',
+                'Período de Equilibrio': '{:.0f}'
+            }),
+            use_container_width=True
+        )
+    
+    def analisis_sensibilidad(self):
+        """
+        Superficie de sensibilidad de la cuota e intereses frente a tasa y plazo
+        """
+        st.subheader("📈 Sensibilidad Tasa × Plazo")
+        datos = st.session_state.datos_credito
+        
+        with st.form("sensibilidad"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                tasa_min = st.number_input("Tasa Mínima (%)", min_value=0.1, max_value=100.0, value=5.0)
+                tasa_max = st.number_input("Tasa Máxima (%)", min_value=0.1, max_value=100.0, value=30.0)
+                pasos_tasa = st.number_input("Tasas en la Grilla", min_value=2, max_value=500, value=100)
+            with col2:
+                plazo_min = st.number_input("Plazo Mínimo (pagos)", min_value=1, max_value=600, value=1)
+                plazo_max = st.number_input("Plazo Máximo (pagos)", min_value=1, max_value=600, value=600)
+                metrica = st.selectbox("Métrica", ["Cuota", "Total Intereses", "Ahorro por Abonos"])
+            with col3:
+                abono = st.number_input("Abono Periódico ($)", min_value=0.0, value=0.0, step=100.0,
+                                        help="Solo para la métrica de ahorro por abonos")
+                cada = st.number_input("Cada cuántos períodos", min_value=1, max_value=12, value=6)
+            
+            calcular = st.form_submit_button("📈 Calcular Superficie", type="primary")
+        
+        if not calcular:
+            return
+        if metrica == "Ahorro por Abonos" and abono <= 0:
+            st.warning("⚠️ Ingrese un abono periódico para calcular el ahorro")
+            return
+        
+        tasas = np.linspace(tasa_min, tasa_max, int(pasos_tasa)) / 100
+        plazos = np.arange(int(plazo_min), int(plazo_max) + 1)
+        superficie = superficie_sensibilidad(
+            datos['monto'], tasas, plazos,
+            frecuencia=datos['frecuencia'],
+            tipo_tasa=datos['tipo_tasa'],
+            modalidad=datos['modalidad'],
+            abono_periodico=abono if metrica == "Ahorro por Abonos" else 0.0,
+            cada=int(cada)
+        )
+        clave = {
+            "Cuota": 'cuota',
+            "Total Intereses": 'total_intereses',
+            "Ahorro por Abonos": 'ahorro_intereses'
+        }[metrica]
+        
+        import plotly.graph_objects as go
+        
+        fig = go.Figure(go.Heatmap(
+            x=plazos,
+            y=tasas * 100,
+            z=superficie[clave],
+            colorscale='Viridis',
+            colorbar=dict(title=f'{metrica} ($)'),
+            hovertemplate="Plazo %{x} pagos<br>Tasa %{y:.2f}%<br>$%{z:,.2f}<extra></extra>"
+        ))
+        fig.update_layout(
+            title=f'{metrica} por Tasa y Plazo',
+            xaxis_title='Número de Pagos',
+            yaxis_title=f"Tasa Anual {datos['tipo_tasa']} {datos['modalidad']} (%)",
+            height=550
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    def proyeccion_portafolio(self):
+        """
+        Carga un portafolio de créditos y proyecta sus flujos agregados
+        """
+        st.subheader("📂 Proyección de Portafolio")
+        
+        with st.expander("ℹ️ Formato del archivo"):
+            st.markdown("""
+            Una fila por crédito (CSV o Parquet):
+            - **Obligatorias:** `monto`, `tasa_anual` (decimal, 0.12 = 12%), `num_pagos`
+            - **Opcionales:** `frecuencia` (12, 6, 4, 2, 1 o su nombre), `tipo_tasa`,
+              `modalidad`, `fecha_inicio`, `abono_periodico`, `abono_cada`, `abono_desde`,
+              `unidad` (UVR, USD... con curva en el archivo de curvas)
+            
+            Los créditos inválidos (o en una unidad sin curva) se descartan y se informan
+            en el resumen. Los créditos en unidades se proyectan en moneda local.
+            """)
+        
+        archivo = st.file_uploader("Archivo de créditos", type=['csv', 'parquet'])
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            agrupacion = st.radio("Agrupar por", ["Período", "Mes"], horizontal=True)
+        with col2:
+            presupuesto = st.select_slider(
+                "Memoria por bloque (MB)", options=[64, 128, 256, 512, 1024], value=256,
+                help="Los créditos se procesan por bloques que no superan este presupuesto"
+            )
+        with col3:
+            procesos = st.number_input(
+                "Procesos", min_value=1, max_value=os.cpu_count() or 1, value=1,
+                help="Más de uno calcula cada bloque en paralelo sobre memoria compartida"
+            )
+        
+        if archivo is None:
+            st.info("📂 Cargue un archivo para proyectar el portafolio")
+            return
+        
+        self.extractos_portafolio(archivo)
+        
+        firma = (archivo.name, archivo.size, agrupacion, presupuesto, procesos)
+        trabajo = self.trabajo_sesion('portafolio', firma)
+        
+        if trabajo is not None and trabajo.activo:
+            self.mostrar_progreso(trabajo)
+            return
+        
+        if trabajo is not None and trabajo.estado == FALLIDO:
+            st.error(f"❌ Error al procesar el portafolio: {trabajo.error()}")
+        elif trabajo is not None and trabajo.estado == CANCELADO:
+            st.info("Proyección cancelada")
+        
+        if trabajo is None or not trabajo.terminado_ok:
+            if st.button("📈 Proyectar Portafolio", type="primary",
+                         help="Se calcula en segundo plano; puede seguir usando la aplicación"):
+                self.enviar_trabajo(
+                    'portafolio', firma,
+                    lambda trabajo, datos, nombre, agrupar, memoria, procesos: proyectar_portafolio(
+                        io.BytesIO(datos), agrupar, memoria, trabajo=trabajo, nombre=nombre,
+                        curvas=curvas_indice(), procesos=procesos),
+                    archivo.getvalue(), archivo.name,
+                    'periodo' if agrupacion == "Período" else 'mes', presupuesto, int(procesos)
+                )
+                st.rerun()
+            return
+        
+        proyeccion, resumen = trabajo.resultado()
+        if proyeccion.empty:
+            st.warning("⚠️ El archivo no contiene créditos válidos")
+            return
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("📄 Créditos Procesados", f"{resumen['creditos']:,}")
+        with col2:
+            st.metric("⚠️ Créditos Rechazados", f"{resumen['rechazados']:,}")
+        with col3:
+            st.metric("💸 Total Intereses", f"${proyeccion['Interés'].sum():,.2f}")
+        with col4:
+            monto_total = proyeccion['Capital'].sum() + proyeccion['Abono_Extra'].sum()
+            st.metric("💰 Monto del Portafolio", f"${monto_total:,.2f}")
+        
+        st.plotly_chart(self.crear_grafico_portafolio(proyeccion), use_container_width=True)
+        
+        formato = {nombre: '${:,.2f}' for nombre in
+                   ['Cuota', 'Interés', 'Capital', 'Abono_Extra', 'Saldo_Pendiente']}
+        st.dataframe(proyeccion.style.format(formato), use_container_width=True, height=400)
+        st.download_button(
+            label="📄 Descargar Proyección CSV",
+            data=self.convertir_a_csv(proyeccion),
+            file_name=f"proyeccion_portafolio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv"
+        )
+    
+    def extractos_portafolio(self, archivo):
+        """
+        Extractos del mes de corte de todos los créditos del archivo, sin
+        generar sus tablas completas (en segundo plano)
+        """
+        with st.expander("🧾 Extractos del Mes"):
+            fecha_corte = st.date_input("Fecha de corte", value=datetime.now().date(),
+                                        key="fecha_corte_extractos",
+                                        help="Se extrae la fila del pago que vence en ese mes")
+            firma = (archivo.name, archivo.size, fecha_corte)
+            trabajo = self.trabajo_sesion('extractos', firma)
+            
+            if trabajo is not None and trabajo.activo:
+                self.mostrar_progreso(trabajo)
+                return
+            
+            if trabajo is not None and trabajo.estado == FALLIDO:
+                st.error(f"❌ Error al generar los extractos: {trabajo.error()}")
+            
+            if trabajo is None or not trabajo.terminado_ok:
+                if st.button("🧾 Generar Extractos"):
+                    def generar(trabajo, datos, nombre, corte):
+                        salida = io.StringIO()
+                        filas = escribir_extractos(
+                            extractos(io.BytesIO(datos), fecha_corte=corte, festivos=RUTA_FESTIVOS,
+                                      nombre=nombre, trabajo=trabajo),
+                            salida, formato='csv'
+                        )
+                        return salida.getvalue(), filas
+                    
+                    self.enviar_trabajo('extractos', firma, generar,
+                                        archivo.getvalue(), archivo.name, fecha_corte)
+                    st.rerun()
+                return
+            
+            contenido, filas = trabajo.resultado()
+            st.success(f"✅ {filas:,} extractos con pago en {fecha_corte.strftime('%Y-%m')}")
+            st.download_button(
+                label="📄 Descargar Extractos CSV",
+                data=contenido,
+                file_name=f"extractos_{fecha_corte.strftime('%Y%m')}.csv",
+                mime="text/csv"
+            )
+    
+    def crear_grafico_portafolio(self, proyeccion):
+        """
+        Flujos agregados (barras apiladas) y saldo pendiente del portafolio
+        """
+        from plotly.subplots import make_subplots
+        import plotly.graph_objects as go
+        
+        eje = proyeccion.columns[0]
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        for nombre, color in (('Interés', '#ff7f0e'), ('Capital', '#2ca02c'), ('Abono_Extra', '#9467bd')):
+            fig.add_trace(go.Bar(x=proyeccion[eje], y=proyeccion[nombre],
+                                 name=nombre.replace('_', ' '), marker_color=color))
+        fig.add_trace(go.Scatter(x=proyeccion[eje], y=proyeccion['Saldo_Pendiente'],
+                                 name='Saldo Pendiente', line=dict(color='#1f77b4', width=3)),
+                      secondary_y=True)
+        fig.update_layout(barmode='stack', title='Flujos Proyectados del Portafolio',
+                          xaxis_title=eje, height=500, hovermode='x unified')
+        fig.update_yaxes(title_text="Flujo ($)", secondary_y=False)
+        fig.update_yaxes(title_text="Saldo Pendiente ($)", secondary_y=True)
+        return fig
+    
     def seccion_descargas(self):
         """
         Sección para descargar archivos
@@ -714,15 +1589,8 @@ class AplicativoWeb:
                 )
             
             with col_reporte2:
-                # Reporte Excel completo
-                excel_completo = self.generar_reporte_completo_excel()
-                st.download_button(
-                    label="📊 Descargar Reporte Excel Completo",
-                    data=excel_completo,
-                    file_name=f"reporte_completo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    help="Excel con múltiples hojas: tabla básica, con abonos, comparación y resumen"
-                )
+                # Reporte Excel completo: se genera en segundo plano
+                self.reporte_excel_en_segundo_plano()
             
             st.markdown("---")
         
@@ -781,220 +1649,160 @@ class AplicativoWeb:
             else:
                 st.info("Genere la tabla con abonos primero")
     
+    def trabajo_sesion(self, clave, firma):
+        """
+        Trabajo de la sesión registrado con esa clave, si sigue vigente
+        
+        La firma identifica los datos de entrada; si cambiaron (por ejemplo,
+        se regeneró una tabla) el trabajo anterior se descarta. Las tablas de
+        la firma se guardan en el registro y se comparan por identidad: una
+        tabla regenerada es otro objeto, y el registro la mantiene viva para
+        que su id no se reutilice.
+        """
+        registro = st.session_state.trabajos.get(clave)
+        if registro is None:
+            return None
+        identificador, firma_trabajo = registro
+        trabajo = cola_trabajos().obtener(identificador)
+        if trabajo is None or not self.misma_firma(firma_trabajo, firma):
+            cola_trabajos().descartar(identificador)
+            del st.session_state.trabajos[clave]
+            return None
+        return trabajo
+    
+    @staticmethod
+    def misma_firma(anterior, actual):
+        """
+        Compara dos firmas elemento a elemento; las tablas, por identidad
+        """
+        def igual(a, b):
+            if isinstance(a, pd.DataFrame) or isinstance(b, pd.DataFrame):
+                return a is b
+            return a == b
+        
+        return len(anterior) == len(actual) and all(igual(a, b) for a, b in zip(anterior, actual))
+    
+    def enviar_trabajo(self, clave, firma, funcion, *args, **kwargs):
+        """
+        Encola un trabajo y lo asocia a la sesión bajo esa clave
+        """
+        identificador = cola_trabajos().enviar(clave, funcion, *args, **kwargs)
+        st.session_state.trabajos[clave] = (identificador, firma)
+    
+    def mostrar_progreso(self, trabajo):
+        """
+        Barra de progreso que se actualiza sola mientras el trabajo sigue activo
+        """
+        @st.fragment(run_every=1.0)
+        def progreso():
+            st.progress(trabajo.progreso, text=f"⏳ {trabajo.mensaje} ({trabajo.progreso:.0%})")
+            if not trabajo.activo:
+                st.rerun()
+        
+        progreso()
+        if st.button("✖️ Cancelar", key=f"cancelar_{trabajo.identificador}"):
+            cola_trabajos().cancelar(trabajo.identificador)
+            st.rerun()
+    
+    def reporte_excel_en_segundo_plano(self):
+        """
+        Genera el reporte Excel completo en la cola de trabajos y ofrece su descarga
+        """
+        instantanea = self.instantanea_reporte()
+        firma = ((instantanea['tabla_basica'], instantanea['tabla_con_abonos'])
+                 + self.firma_abonos(st.session_state.manejo_abonos))
+        trabajo = self.trabajo_sesion('reporte_excel', firma)
+        
+        if trabajo is not None and trabajo.activo:
+            self.mostrar_progreso(trabajo)
+            return
+        
+        if trabajo is not None and trabajo.terminado_ok:
+            st.download_button(
+                label="📊 Descargar Reporte Excel Completo",
+                data=trabajo.resultado(),
+                file_name=f"reporte_completo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                help="Excel con múltiples hojas: tabla básica, con abonos, comparación y resumen"
+            )
+            return
+        
+        if trabajo is not None and trabajo.estado == FALLIDO:
+            st.error(f"❌ Error al generar el reporte: {trabajo.error()}")
+        elif trabajo is not None and trabajo.estado == CANCELADO:
+            st.info("Generación del reporte cancelada")
+        
+        if st.button("⚙️ Generar Reporte Excel Completo",
+                     help="Se genera en segundo plano; puede seguir usando la aplicación"):
+            self.enviar_trabajo(
+                'reporte_excel', firma,
+                lambda trabajo, datos: self.generar_reporte_completo_excel(datos, trabajo),
+                instantanea
+            )
+            st.rerun()
+    
     def convertir_a_csv(self, tabla):
         """
         Convierte tabla a CSV para descarga
         """
-        output = io.StringIO()
-        tabla.to_csv(output, index=False)
-        return output.getvalue()
+        return tabla_csv(tabla)
     
     def convertir_a_excel(self, tabla, nombre_hoja):
         """
         Convierte tabla a Excel para descarga
         """
-        output = io.BytesIO()
-        
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            tabla.to_excel(writer, sheet_name=nombre_hoja, index=False)
-            
-            # Agregar hoja de resumen si hay datos del crédito
-            if st.session_state.datos_credito:
-                resumen_data = {
-                    'Concepto': [
-                        'Monto del Crédito',
-                        'Tasa Original',
-                        'Tipo de Tasa',
-                        'Modalidad',
-                        'Frecuencia',
-                        'Número de Pagos',
-                        'Fecha de Inicio',
-                        'Cuota Fija',
-                        'Total Intereses',
-                        'Total a Pagar'
-                    ],
-                    'Valor': [
-                        f"${st.session_state.datos_credito['monto']:,.2f}",
-                        f"{st.session_state.datos_credito['tasa_anual_original']:.2f}%",
-                        st.session_state.datos_credito['tipo_tasa'],
-                        st.session_state.datos_credito['modalidad'],
-                        st.session_state.datos_credito['frecuencia_texto'],
-                        st.session_state.datos_credito['num_pagos'],
-                        st.session_state.datos_credito['fecha_inicio'],
-                        f"${st.session_state.datos_credito['cuota_fija']:,.2f}",
-                        f"${tabla['Interés'].sum():,.2f}",
-                        f"${tabla['Cuota'].sum():,.2f}"
-                    ]
-                }
-                
-                resumen_df = pd.DataFrame(resumen_data)
-                resumen_df.to_excel(writer, sheet_name='Resumen', index=False)
-        
-        return output.getvalue()
+        datos_credito = st.session_state.datos_credito
+        return tabla_excel(tabla, nombre_hoja, datos_credito,
+                           self.resumen_tabla(tabla) if datos_credito else None)
     
     def generar_reporte_completo_csv(self):
         """
         Genera un reporte CSV completo con ambas tablas y comparación
         """
-        output = io.StringIO()
-        
-        # Encabezado del reporte
-        output.write("REPORTE COMPLETO DE AMORTIZACIÓN\n")
-        output.write("=" * 50 + "\n")
-        output.write(f"Generado el: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        # Información del crédito
-        if st.session_state.datos_credito:
-            output.write("INFORMACIÓN DEL CRÉDITO\n")
-            output.write("-" * 30 + "\n")
-            output.write(f"Monto: ${st.session_state.datos_credito['monto']:,.2f}\n")
-            output.write(f"Tasa: {st.session_state.datos_credito['tasa_anual_original']:.2f}% ({st.session_state.datos_credito['tipo_tasa']} {st.session_state.datos_credito['modalidad']})\n")
-            output.write(f"Frecuencia: {st.session_state.datos_credito['frecuencia_texto']}\n")
-            output.write(f"Plazo: {st.session_state.datos_credito['num_pagos']} pagos\n")
-            output.write(f"Cuota Fija: ${st.session_state.datos_credito['cuota_fija']:,.2f}\n\n")
-        
-        # Resumen comparativo
-        if (st.session_state.tabla_basica is not None and 
-            st.session_state.tabla_con_abonos is not None):
-            
-            tabla_basica = st.session_state.tabla_basica
-            tabla_abonos = st.session_state.tabla_con_abonos
-            
-            output.write("RESUMEN COMPARATIVO\n")
-            output.write("-" * 30 + "\n")
-            output.write(f"Sin abonos - Períodos: {len(tabla_basica)}, Intereses: ${tabla_basica['Interés'].sum():,.2f}\n")
-            output.write(f"Con abonos - Períodos: {len(tabla_abonos)}, Intereses: ${tabla_abonos['Interés'].sum():,.2f}\n")
-            output.write(f"Ahorro en intereses: ${tabla_basica['Interés'].sum() - tabla_abonos['Interés'].sum():,.2f}\n")
-            output.write(f"Ahorro en tiempo: {len(tabla_basica) - len(tabla_abonos)} períodos\n\n")
-        
-        # Tabla básica
-        output.write("TABLA BÁSICA\n")
-        output.write("-" * 20 + "\n")
-        if st.session_state.tabla_basica is not None:
-            st.session_state.tabla_basica.to_csv(output, index=False)
-        
-        output.write("\n\nTABLA CON ABONOS\n")
-        output.write("-" * 20 + "\n")
-        if st.session_state.tabla_con_abonos is not None:
-            st.session_state.tabla_con_abonos.to_csv(output, index=False)
-        
-        return output.getvalue()
+        ambas = (st.session_state.tabla_basica is not None
+                 and st.session_state.tabla_con_abonos is not None)
+        return reporte_csv(
+            st.session_state.datos_credito,
+            st.session_state.tabla_basica,
+            st.session_state.tabla_con_abonos,
+            self.resumen_comparacion() if ambas else None
+        )
     
-    def generar_reporte_completo_excel(self):
+    def instantanea_reporte(self):
         """
-        Genera un reporte Excel completo con múltiples hojas
+        Copia de los datos que necesita el reporte Excel, para generarlo fuera
+        del hilo del script (los trabajos no pueden leer st.session_state)
         """
-        output = io.BytesIO()
-        
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Hoja de resumen
-            if st.session_state.datos_credito:
-                resumen_credito = {
-                    'Concepto': [
-                        'Monto del Crédito',
-                        'Tasa Original',
-                        'Tipo de Tasa',
-                        'Modalidad',
-                        'Frecuencia',
-                        'Número de Pagos',
-                        'Fecha de Inicio',
-                        'Cuota Fija'
-                    ],
-                    'Valor': [
-                        f"${st.session_state.datos_credito['monto']:,.2f}",
-                        f"{st.session_state.datos_credito['tasa_anual_original']:.2f}%",
-                        st.session_state.datos_credito['tipo_tasa'],
-                        st.session_state.datos_credito['modalidad'],
-                        st.session_state.datos_credito['frecuencia_texto'],
-                        st.session_state.datos_credito['num_pagos'],
-                        st.session_state.datos_credito['fecha_inicio'],
-                        f"${st.session_state.datos_credito['cuota_fija']:,.2f}"
-                    ]
-                }
-                resumen_df = pd.DataFrame(resumen_credito)
-                resumen_df.to_excel(writer, sheet_name='1_Resumen_Credito', index=False)
-            
-            # Hoja de comparación
-            if (st.session_state.tabla_basica is not None and 
-                st.session_state.tabla_con_abonos is not None):
-                
-                tabla_basica = st.session_state.tabla_basica
-                tabla_abonos = st.session_state.tabla_con_abonos
-                
-                comparacion_data = {
-                    'Concepto': [
-                        'Períodos Totales',
-                        'Total Cuotas',
-                        'Total Intereses',
-                        'Total Abonos Extra',
-                        'Total Pagado',
-                        'Ahorro en Intereses',
-                        'Ahorro en Tiempo (períodos)',
-                        'Porcentaje de Ahorro'
-                    ],
-                    'Sin Abonos': [
-                        len(tabla_basica),
-                        f"${tabla_basica['Cuota'].sum():,.2f}",
-                        f"${tabla_basica['Interés'].sum():,.2f}",
-                        "$0.00",
-                        f"${tabla_basica['Cuota'].sum():,.2f}",
-                        "-",
-                        "-",
-                        "-"
-                    ],
-                    'Con Abonos': [
-                        len(tabla_abonos),
-                        f"${tabla_abonos['Cuota'].sum():,.2f}",
-                        f"${tabla_abonos['Interés'].sum():,.2f}",
-                        f"${tabla_abonos['Abono_Extra'].sum():,.2f}",
-                        f"${tabla_abonos['Cuota'].sum() + tabla_abonos['Abono_Extra'].sum():,.2f}",
-                        f"${tabla_basica['Interés'].sum() - tabla_abonos['Interés'].sum():,.2f}",
-                        f"{len(tabla_basica) - len(tabla_abonos)}",
-                        f"{((tabla_basica['Interés'].sum() - tabla_abonos['Interés'].sum()) / tabla_basica['Interés'].sum()) * 100:.1f}%"
-                    ]
-                }
-                comparacion_df = pd.DataFrame(comparacion_data)
-                comparacion_df.to_excel(writer, sheet_name='2_Comparacion', index=False)
-            
-            # Hoja tabla básica
-            if st.session_state.tabla_basica is not None:
-                st.session_state.tabla_basica.to_excel(writer, sheet_name='3_Tabla_Basica', index=False)
-            
-            # Hoja tabla con abonos
-            if st.session_state.tabla_con_abonos is not None:
-                st.session_state.tabla_con_abonos.to_excel(writer, sheet_name='4_Tabla_con_Abonos', index=False)
-            
-            # Hoja de abonos configurados
-            if st.session_state.manejo_abonos:
-                abonos_data = {
-                    'Tipo': [],
-                    'Período': [],
-                    'Monto': [],
-                    'Frecuencia': [],
-                    'Descripción': []
-                }
-                
-                # Abonos programados
-                for abono in st.session_state.manejo_abonos.abonos_programados:
-                    abonos_data['Tipo'].append('Programado')
-                    abonos_data['Período'].append(abono['periodo_inicio'])
-                    abonos_data['Monto'].append(f"${abono['monto']:,.2f}")
-                    abonos_data['Frecuencia'].append(f"Cada {abono['frecuencia']} períodos")
-                    abonos_data['Descripción'].append(f"Desde período {abono['periodo_inicio']}")
-                
-                # Abonos ad-hoc
-                for abono in st.session_state.manejo_abonos.abonos_adhoc:
-                    abonos_data['Tipo'].append('Ad-hoc')
-                    abonos_data['Período'].append(abono['periodo'])
-                    abonos_data['Monto'].append(f"${abono['monto']:,.2f}")
-                    abonos_data['Frecuencia'].append('Una vez')
-                    abonos_data['Descripción'].append(f"Solo en período {abono['periodo']}")
-                
-                if abonos_data['Tipo']:  # Solo si hay abonos
-                    abonos_df = pd.DataFrame(abonos_data)
-                    abonos_df.to_excel(writer, sheet_name='5_Abonos_Configurados', index=False)
+        manejo = st.session_state.manejo_abonos
+        return {
+            'datos_credito': dict(st.session_state.datos_credito),
+            'tabla_basica': st.session_state.tabla_basica,
+            'tabla_con_abonos': st.session_state.tabla_con_abonos,
+            'abonos_programados': list(manejo.abonos_programados) if manejo else [],
+            'abonos_adhoc': list(manejo.abonos_adhoc) if manejo else [],
+            'indice_abonos': self.indice_abonos() if manejo else None,
+            'resumen': (self.resumen_comparacion()
+                        if st.session_state.tabla_basica is not None
+                        and st.session_state.tabla_con_abonos is not None else None),
+        }
+    
+    def generar_reporte_completo_excel(self, instantanea=None, trabajo=None):
+        """
+        Genera un reporte Excel completo con múltiples hojas
         
-        return output.getvalue()
+        Sin instantánea usa el estado de la sesión; con un trabajo de la cola
+        reporta el avance por hoja y atiende la cancelación.
+        """
+        if instantanea is None:
+            instantanea = self.instantanea_reporte()
+        return reporte_excel(
+            instantanea['datos_credito'],
+            instantanea['tabla_basica'],
+            instantanea['tabla_con_abonos'],
+            indice_abonos=instantanea['indice_abonos'],
+            resumen=instantanea['resumen'],
+            reportar=trabajo.reportar if trabajo is not None else None
+        )
     
     def calculadora_tasas(self):
         """
@@ -1064,18 +1872,10 @@ class AplicativoWeb:
                 if st.button("💰 Calcular Equivalentes"):
                     st.write("**Tasas Equivalentes:**")
                     
-                    equivalentes = {
-                        "Anual": tasa_base * 100,
-                        "Semestral": ConversionTasas.tasa_equivalente(tasa_base, 1, 2) * 100,
-                        "Trimestral": ConversionTasas.tasa_equivalente(tasa_base, 1, 4) * 100,
-                        "Mensual": ConversionTasas.tasa_equivalente(tasa_base, 1, 12) * 100,
-                        "Quincenal": ConversionTasas.tasa_equivalente(tasa_base, 1, 24) * 100,
-                        "Semanal": ConversionTasas.tasa_equivalente(tasa_base, 1, 52) * 100,
-                        "Diaria": ConversionTasas.tasa_equivalente(tasa_base, 1, 365) * 100
-                    }
-                    
-                    for periodo, tasa in equivalentes.items():
-                        st.metric(periodo, f"{tasa:.4f}%")
+                    # Conversiones memoizadas, compartidas con el motor y los lotes
+                    for periodo, periodos_anio in FRECUENCIAS_EQUIVALENTES.items():
+                        tasa = conversion_tasa(tasa_base, "Efectiva", "Vencida", 1, periodos_anio)
+                        st.metric(periodo, f"{tasa*100:.4f}%")
         
         with tab4:
             st.write("**Calculadora Completa de Tasas**")
@@ -1096,31 +1896,13 @@ class AplicativoWeb:
                 
                 if st.form_submit_button("🧮 Calcular Conversión Completa"):
                     try:
-                        # Proceso de conversión completo
-                        tasa_trabajo = tasa_entrada
-                        
-                        # Paso 1: Convertir a efectiva si es nominal
-                        if tipo_entrada == "Nominal":
-                            tasa_trabajo = ConversionTasas.nominal_a_efectiva(tasa_trabajo, freq_entrada)
-                            st.info(f"Paso 1: Nominal → Efectiva = {tasa_trabajo*100:.4f}%")
-                        
-                        # Paso 2: Convertir de anticipada a vencida si es necesario
-                        if modalidad_entrada == "Anticipada" and modalidad_salida == "Vencida":
-                            tasa_trabajo = ConversionTasas.anticipada_a_vencida(tasa_trabajo)
-                            st.info(f"Paso 2: Anticipada → Vencida = {tasa_trabajo*100:.4f}%")
-                        elif modalidad_entrada == "Vencida" and modalidad_salida == "Anticipada":
-                            tasa_trabajo = ConversionTasas.vencida_a_anticipada(tasa_trabajo)
-                            st.info(f"Paso 2: Vencida → Anticipada = {tasa_trabajo*100:.4f}%")
-                        
-                        # Paso 3: Convertir a la frecuencia deseada
-                        if freq_entrada != freq_salida:
-                            tasa_trabajo = ConversionTasas.tasa_equivalente(tasa_trabajo, 1, freq_salida)
-                            st.info(f"Paso 3: Cambio de frecuencia = {tasa_trabajo*100:.4f}%")
-                        
-                        # Paso 4: Convertir a nominal si es necesario
-                        if tipo_salida == "Nominal":
-                            tasa_trabajo = ConversionTasas.efectiva_a_nominal(tasa_trabajo, freq_salida)
-                            st.info(f"Paso 4: Efectiva → Nominal = {tasa_trabajo*100:.4f}%")
+                        # Proceso de conversión completo (pasos 1 a 4 según el caso)
+                        tasa_trabajo, pasos = conversion_completa(
+                            tasa_entrada, tipo_entrada, modalidad_entrada, freq_entrada,
+                            tipo_salida, modalidad_salida, freq_salida
+                        )
+                        for descripcion, valor in pasos:
+                            st.info(f"{descripcion} = {valor*100:.4f}%")
                         
                         st.success(f"🎯 **Resultado Final: {tasa_trabajo*100:.4f}%**")
                         
@@ -1143,29 +1925,25 @@ class AplicativoWeb:
             self.mostrar_resumen_credito()
             st.markdown("---")
             
-            # Tabs principales
-            tab1, tab2, tab3, tab4, tab5 = st.tabs([
-                "💰 Abonos Extras", 
-                "📊 Tablas de Amortización", 
-                "📥 Descargas", 
-                "🧮 Calculadora de Tasas",
-                "📖 Ayuda"
-            ])
-            
-            with tab1:
-                self.configurar_abonos()
-            
-            with tab2:
-                self.generar_y_mostrar_tablas()
-            
-            with tab3:
-                self.seccion_descargas()
-            
-            with tab4:
-                self.calculadora_tasas()
+            # Tabs principales: solo se ejecuta la pestaña visible, de modo que
+            # las ocultas no construyen tablas ni gráficos en cada interacción
+            secciones = {
+                "💰 Abonos Extras": self.configurar_abonos,
+                "📊 Tablas de Amortización": self.generar_y_mostrar_tablas,
+                "🗂️ Escenarios": self.espacio_escenarios,
+                "🔁 Refinanciación": self.analisis_refinanciacion,
+                "📈 Sensibilidad": self.analisis_sensibilidad,
+                "📂 Portafolio": self.proyeccion_portafolio,
+                "📥 Descargas": self.seccion_descargas,
+                "🧮 Calculadora de Tasas": self.calculadora_tasas,
+                "📖 Ayuda": self.mostrar_ayuda
+            }
+            tabs = st.tabs(list(secciones), key="pestana_principal", on_change="rerun")
             
-            with tab5:
-                self.mostrar_ayuda()
+            for tab, seccion in zip(tabs, secciones.values()):
+                if tab.open:
+                    with tab:
+                        seccion()
         
         else:
             # Mensaje de bienvenida
@@ -1174,6 +1952,10 @@ class AplicativoWeb:
             # Mostrar calculadora de tasas como preview
             with st.expander("🧮 Calculadora de Tasas (Vista Previa)", expanded=True):
                 self.calculadora_tasas()
+            
+            # La proyección de portafolio no depende del crédito de la barra lateral
+            with st.expander("📂 Proyección de Portafolio"):
+                self.proyeccion_portafolio()
     
     def mostrar_ayuda(self):
         """
@@ -0,0 +1,87 @@
+"""
+Benchmark de arranque del aplicativo
+Mide el costo de importación de los módulos con `python -X importtime` en un
+proceso limpio, tal como lo paga una réplica nueva en su primera vista
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+
+def medir_importacion(modulo):
+    """
+    Importa un módulo en un intérprete nuevo y retorna (tiempo_total, registros)
+
+    Cada registro es (propio_us, acumulado_us, nombre) según el formato de
+    -X importtime; el tiempo total es el tiempo de pared del proceso.
+    """
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True,
+        text=True
+    )
+    total = time.perf_counter() - inicio
+
+    if proceso.returncode != 0:
+        error = proceso.stderr.strip().splitlines()
+        raise RuntimeError(f"No se pudo importar {modulo}: {error[-1] if error else ''}")
+
+    registros = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        registros.append((int(propio), int(acumulado), nombre.rstrip()))
+    return total, registros
+
+
+def resumen_paquetes(registros):
+    """
+    Costo acumulado de cargar cada paquete raíz (incluye sus dependencias)
+
+    El primer registro de un paquete contiene el acumulado de todo lo que
+    arrastra, sin importar qué módulo lo importó.
+    """
+    paquetes = {}
+    for _, acumulado, nombre in registros:
+        raiz = nombre.strip().split(".")[0]
+        paquetes[raiz] = max(paquetes.get(raiz, 0), acumulado)
+    return sorted(paquetes.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    """
+    Ejecuta el benchmark desde la línea de comandos
+    """
+    parser = argparse.ArgumentParser(description="Tiempo de importación en frío")
+    parser.add_argument("modulos", nargs="*", default=["app_streamlit"],
+                        help="Módulos a medir (por defecto el aplicativo)")
+    parser.add_argument("--repeticiones", type=int, default=5,
+                        help="Procesos limpios por módulo")
+    parser.add_argument("--top", type=int, default=15,
+                        help="Paquetes más costosos a mostrar")
+    args = parser.parse_args()
+
+    for modulo in args.modulos:
+        mediciones = [medir_importacion(modulo) for _ in range(args.repeticiones)]
+        tiempos = sorted(total for total, _ in mediciones)
+        mediana = tiempos[len(tiempos) // 2]
+
+        # El desglose se toma de la corrida con el tiempo mediano
+        _, registros = next(m for m in mediciones if m[0] == mediana)
+
+        print(f"\n{modulo}")
+        print("=" * 50)
+        print(f"Proceso completo (mediana de {args.repeticiones}): {mediana * 1000:,.1f} ms")
+        print(f"Mínimo: {tiempos[0] * 1000:,.1f} ms  Máximo: {tiempos[-1] * 1000:,.1f} ms")
+        print("-" * 50)
+        print(f"{'Paquete':<30}{'Acumulado (ms)':>20}")
+        for paquete, acumulado in resumen_paquetes(registros)[:args.top]:
+            print(f"{paquete:<30}{acumulado / 1000:>20,.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Prueba de carga del aplicativo
+Simula N analistas concurrentes con el arnés AppTest de Streamlit (sin
+navegador): cada sesión configura un crédito, agrega abonos, genera ambas
+tablas, abre la comparación y genera el reporte Excel. Reporta la latencia
+p50/p95/p99 de cada paso y la memoria por sesión, como base para dimensionar
+cuántas sesiones atiende una réplica.
+
+AppTest usa estado global de Streamlit y no admite varias sesiones en hilos
+de un mismo proceso, así que cada sesión corre en su propio proceso. Una
+réplica real ejecuta todas sus sesiones en un intérprete (un núcleo efectivo
+por el GIL): `--nucleos` restringe los procesos a esos núcleos para que la
+contención se parezca a la de la réplica. Cada proceso tiene su propia cola de
+trabajos, de modo que la latencia del reporte Excel no incluye la espera por
+la cola compartida de la réplica (dos hilos).
+
+Uso: python prueba_carga.py --sesiones 16 --repeticiones 3 --pagos 360 --nucleos 1
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+import resource
+import time
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+RUTA_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_streamlit.py")
+
+PASOS = ("configurar", "abonos", "tabla_basica", "tabla_abonos", "comparacion", "reporte_excel")
+
+# Intervalo con el que se consulta el reporte en segundo plano (la vista real
+# lo consulta cada segundo; aquí se usa menos para no inflar la latencia)
+INTERVALO_SONDEO = 0.1
+
+
+def memoria_residente():
+    """
+    Memoria residente del proceso en bytes (psutil si está instalado, si no /proc)
+    """
+    try:
+        import psutil
+    except ImportError:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    return psutil.Process().memory_info().rss
+
+
+def _widget(elementos, etiqueta):
+    """
+    Primer widget de la lista cuya etiqueta contiene `etiqueta`
+    """
+    for elemento in elementos:
+        if etiqueta in elemento.label:
+            return elemento
+    raise LookupError(f"No se encontró el widget '{etiqueta}'")
+
+
+def _ejecutar(app):
+    """
+    Ejecuta el script y falla si el aplicativo mostró una excepción
+    """
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+
+
+class SesionSimulada:
+    """
+    Un analista recorriendo el flujo principal del aplicativo
+    """
+
+    def __init__(self, pagos, timeout):
+        """
+        Crea la sesión; el script se ejecuta por primera vez en `configurar`
+        """
+        self.pagos = pagos
+        self.timeout = timeout
+        self.app = AppTest.from_file(RUTA_APP, default_timeout=timeout)
+
+    def configurar(self):
+        app = self.app
+        _ejecutar(app)
+        _widget(app.number_input, "Monto del Crédito").set_value(200_000_000.0)
+        _widget(app.number_input, "Tasa Anual").set_value(12.0)
+        _widget(app.number_input, "Número de Pagos").set_value(self.pagos)
+        _widget(app.button, "Configurar Crédito").click()
+        _ejecutar(app)
+
+    def abonos(self):
+        app = self.app
+        app.session_state['pestana_principal'] = "💰 Abonos Extras"
+        _ejecutar(app)
+        _widget(app.number_input, "Cada cuántos períodos").set_value(6)
+        _widget(app.button, "Agregar Abono Programado").click()
+        _ejecutar(app)
+        _widget(app.number_input, "Período del Abono").set_value(12)
+        _widget(app.button, "Agregar Abono Ad-hoc").click()
+        _ejecutar(app)
+
+    def tabla_basica(self):
+        app = self.app
+        app.session_state['pestana_principal'] = "📊 Tablas de Amortización"
+        _ejecutar(app)
+        _widget(app.button, "Generar Tabla Básica").click()
+        _ejecutar(app)
+
+    def tabla_abonos(self):
+        app = self.app
+        app.session_state['pestana_tablas'] = "💰 Tabla con Abonos"
+        _widget(app.button, "Generar Tabla con Abonos").click()
+        _ejecutar(app)
+
+    def comparacion(self):
+        app = self.app
+        app.session_state['pestana_tablas'] = "📊 Comparación"
+        _ejecutar(app)
+
+    def reporte_excel(self):
+        """
+        Desde el clic hasta que la descarga está disponible (incluye la cola)
+        """
+        app = self.app
+        app.session_state['pestana_principal'] = "📥 Descargas"
+        _ejecutar(app)
+        _widget(app.button, "Generar Reporte Excel Completo").click()
+        _ejecutar(app)
+        limite = time.perf_counter() + self.timeout
+        while not any("Reporte Excel" in boton.label for boton in app.get('download_button')):
+            if time.perf_counter() > limite:
+                raise TimeoutError("El reporte Excel no terminó a tiempo")
+            time.sleep(INTERVALO_SONDEO)
+            _ejecutar(app)
+
+    def recorrer(self, repeticiones):
+        """
+        Ejecuta el flujo `repeticiones` veces
+
+        Returns:
+            (latencias por paso en segundos, errores por paso)
+        """
+        latencias = {paso: [] for paso in PASOS}
+        errores = {paso: [] for paso in PASOS}
+        for _ in range(repeticiones):
+            for paso in PASOS:
+                inicio = time.perf_counter()
+                try:
+                    getattr(self, paso)()
+                except Exception as e:
+                    # Un paso fallido deja la sesión en un estado incierto
+                    errores[paso].append(f"{type(e).__name__}: {e}")
+                    break
+                latencias[paso].append(time.perf_counter() - inicio)
+        return latencias, errores
+
+
+def _fijar_nucleos(nucleos):
+    """
+    Restringe el proceso a los primeros `nucleos` núcleos (solo Linux; 0 no restringe)
+    """
+    if nucleos and hasattr(os, "sched_setaffinity"):
+        disponibles = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, disponibles[:nucleos])
+
+
+def _proceso_sesion(pagos, repeticiones, timeout, nucleos, barrera, resultados):
+    """
+    Proceso de una sesión: calienta, espera a las demás y recorre el flujo
+    """
+    _fijar_nucleos(nucleos)
+
+    # Recorrido de calentamiento: las importaciones y cachés del proceso son
+    # costo de la réplica, no de cada sesión. La sesión de calentamiento sigue
+    # viva para que la sesión medida no reutilice la memoria que ella libere
+    calentamiento = SesionSimulada(pagos, timeout)
+    calentamiento.recorrer(1)
+    gc.collect()
+    base = memoria_residente()
+
+    sesion = SesionSimulada(pagos, timeout)
+    barrera.wait()
+    inicio = time.time()
+    latencias, errores = sesion.recorrer(repeticiones)
+    fin = time.time()
+
+    # La sesión sigue viva: la diferencia es lo que retiene
+    gc.collect()
+    resultados.put({
+        'latencias': latencias,
+        'errores': errores,
+        'memoria_sesion': memoria_residente() - base,
+        'memoria_maxima': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'inicio': inicio,
+        'fin': fin,
+    })
+
+
+def prueba_carga(sesiones, repeticiones, pagos, timeout, nucleos=1):
+    """
+    Corre `sesiones` sesiones concurrentes, una por proceso
+
+    Returns:
+        dict con latencias y errores por paso, memoria por sesión (mediana, en
+        bytes), memoria máxima de un proceso y duración de la fase concurrente
+    """
+    contexto = multiprocessing.get_context("spawn")
+    barrera = contexto.Barrier(sesiones)
+    cola = contexto.Queue()
+    procesos = [
+        contexto.Process(target=_proceso_sesion,
+                         args=(pagos, repeticiones, timeout, nucleos, barrera, cola))
+        for _ in range(sesiones)
+    ]
+    for proceso in procesos:
+        proceso.start()
+    try:
+        # Los resultados se leen antes de join: un proceso no termina mientras
+        # su resultado siga en la cola
+        reportes = [cola.get(timeout=timeout * (repeticiones + 1) * len(PASOS)) for _ in procesos]
+    finally:
+        for proceso in procesos:
+            proceso.join(timeout=1)
+            if proceso.is_alive():
+                proceso.terminate()
+
+    return {
+        'latencias': {paso: [valor for r in reportes for valor in r['latencias'][paso]] for paso in PASOS},
+        'errores': {paso: [error for r in reportes for error in r['errores'][paso]] for paso in PASOS},
+        'memoria_sesion': float(np.median([r['memoria_sesion'] for r in reportes])),
+        'memoria_maxima': max(r['memoria_maxima'] for r in reportes),
+        'duracion': max(r['fin'] for r in reportes) - min(r['inicio'] for r in reportes),
+    }
+
+
+def main():
+    """
+    Ejecuta la prueba desde la línea de comandos
+    """
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones concurrentes")
+    parser.add_argument("--sesiones", type=int, default=8, help="Sesiones concurrentes")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Recorridos del flujo por sesión")
+    parser.add_argument("--pagos", type=int, default=360, help="Número de pagos del crédito")
+    parser.add_argument("--nucleos", type=int, default=1,
+                        help="Núcleos para todas las sesiones, como una réplica (0: sin restricción)")
+    parser.add_argument("--timeout", type=float, default=120, help="Segundos máximos por ejecución")
+    args = parser.parse_args()
+
+    resultado = prueba_carga(args.sesiones, args.repeticiones, args.pagos, args.timeout, args.nucleos)
+    latencias, errores = resultado['latencias'], resultado['errores']
+
+    print(f"\n{args.sesiones} sesiones × {args.repeticiones} recorridos, crédito de {args.pagos} pagos")
+    print("=" * 70)
+    print(f"{'Paso':<16}{'n':>6}{'fallas':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'máx (ms)':>10}")
+    for paso in PASOS:
+        valores = np.array(latencias[paso]) * 1000
+        if len(valores):
+            p50, p95, p99 = np.percentile(valores, [50, 95, 99])
+            cifras = f"{p50:>10,.0f}{p95:>10,.0f}{p99:>10,.0f}{valores.max():>10,.0f}"
+        else:
+            cifras = f"{'-':>10}" * 4
+        print(f"{paso:<16}{len(valores):>6}{len(errores[paso]):>8}{cifras}")
+    print("-" * 70)
+    recorridos = len(latencias[PASOS[-1]])
+    duracion = resultado['duracion']
+    print(f"Duración: {duracion:,.1f} s ({recorridos / duracion:,.2f} recorridos completos/s)")
+    print(f"Memoria por sesión (mediana): {resultado['memoria_sesion'] / 2**20:,.1f} MB")
+    print(f"Memoria máxima de un proceso: {resultado['memoria_maxima'] / 2**20:,.1f} MB")
+    for paso in PASOS:
+        if errores[paso]:
+            print(f"⚠️  {paso}: {errores[paso][0]}")
+
+
+if __name__ == "__main__":
+    main()
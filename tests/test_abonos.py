@@ -0,0 +1,74 @@
+"""
+Abonos extras en todos los sistemas de amortización
+"""
+
+import numpy as np
+import pytest
+
+from amortizacion.abonos import columnas_con_abonos
+from amortizacion.credito import Credito
+from amortizacion.kernel import NUMBA_DISPONIBLE
+from amortizacion.motor import COLUMNAS_MONTO, MotorAmortizacion
+
+
+def lote_mixto(n=200, semilla=0):
+    rng = np.random.default_rng(semilla)
+    num_pagos = rng.integers(2, 240, n)
+    return MotorAmortizacion(
+        monto=rng.uniform(1e3, 1e7, n).round(2),
+        tasa_periodo=rng.uniform(0.001, 0.05, n),
+        num_pagos=num_pagos,
+        sistema=rng.choice(['frances', 'aleman', 'americano'], n),
+        periodos_gracia=np.minimum(rng.integers(0, 6, n), num_pagos - 1),
+        tipo_gracia=rng.choice(['capital', 'total'], n)
+    )
+
+
+@pytest.mark.parametrize("usar_numba", [False] + ([True] if NUMBA_DISPONIBLE else []))
+def test_sin_abonos_reproduce_el_motor(usar_numba):
+    motor = lote_mixto()
+    tasas, cuota, pago_interes = motor.plan_pagos()
+    columnas, periodos = columnas_con_abonos(motor.monto, tasas, motor.num_pagos,
+                                             np.zeros((motor.num_creditos, motor.max_pagos)), cuota,
+                                             usar_numba=usar_numba, pago_interes=pago_interes)
+    np.testing.assert_array_equal(periodos, motor.num_pagos)
+    for nombre in COLUMNAS_MONTO:
+        np.testing.assert_allclose(columnas[nombre], motor.columnas()[nombre], atol=0.0101)
+
+
+def test_numpy_y_numba_coinciden():
+    if not NUMBA_DISPONIBLE:
+        pytest.skip("Numba no está instalado")
+    motor = lote_mixto(semilla=1)
+    tasas, cuota, pago_interes = motor.plan_pagos()
+    abonos = np.where(np.random.default_rng(1).random((motor.num_creditos, motor.max_pagos)) < 0.1,
+                      50_000.0, 0.0)
+    numpy, periodos_numpy = columnas_con_abonos(motor.monto, tasas, motor.num_pagos, abonos, cuota,
+                                                usar_numba=False, pago_interes=pago_interes)
+    numba, periodos_numba = columnas_con_abonos(motor.monto, tasas, motor.num_pagos, abonos, cuota,
+                                                usar_numba=True, pago_interes=pago_interes)
+    np.testing.assert_array_equal(periodos_numpy, periodos_numba)
+    for nombre in COLUMNAS_MONTO:
+        np.testing.assert_array_equal(numpy[nombre], numba[nombre])
+
+
+@pytest.mark.parametrize("sistema,gracia,tipo_gracia", [
+    ("aleman", 0, "Capital"), ("americano", 0, "Capital"),
+    ("frances", 3, "Capital"), ("aleman", 3, "Total"),
+])
+def test_abonos_reducen_el_plazo(sistema, gracia, tipo_gracia):
+    credito = Credito({'monto': 1_000_000.0, 'tasa_anual_original': 12.0, 'num_pagos': 24,
+                       'fecha_inicio': '2025-01-15', 'sistema': sistema, 'periodos_gracia': gracia,
+                       'tipo_gracia': tipo_gracia})
+    basica = credito.tabla_basica()
+    tabla = credito.tabla_con_abonos(credito.indice_abonos([{'periodo_inicio': 2, 'monto': 150_000.0,
+                                                              'frecuencia': 3}]))
+    assert len(tabla) < len(basica)
+    assert tabla['Interés'].sum() < basica['Interés'].sum()
+    assert tabla['Saldo_Final'].iloc[-1] == pytest.approx(0.0, abs=0.01)
+    np.testing.assert_allclose(tabla['Saldo_Inicial'] - tabla['Capital'] - tabla['Abono_Extra'],
+                               tabla['Saldo_Final'], atol=0.011)
+    # Antes del primer abono la tabla coincide con la básica
+    np.testing.assert_allclose(tabla['Cuota'].iloc[:2], basica['Cuota'].iloc[:2], atol=0.01)
+    if sistema == "aleman" and gracia == 0:
+        np.testing.assert_allclose(tabla['Capital'].iloc[:-1], basica['Capital'].iloc[0], atol=0.01)
@@ -0,0 +1,60 @@
+"""
+Capas de cargos por período
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from amortizacion.cargos import (
+    COLUMNA_TOTAL, CapaCargo, CargoFijo, ImpuestoInteres, SeguroSaldo,
+    aplicar_cargos, calcular_cargos, columnas_cargos, total_cargos
+)
+from amortizacion.motor import MotorAmortizacion
+
+
+def test_capa_base_es_abstracta():
+    with pytest.raises(TypeError):
+        CapaCargo(1.0)
+
+
+def test_capas_sobre_arreglos():
+    cargos = calcular_cargos([1000.0, 500.0], [10.0, 5.0],
+                             [CargoFijo(2.0), SeguroSaldo(0.001), ImpuestoInteres(0.19)])
+    np.testing.assert_allclose(cargos['Comisión'], [2.0, 2.0])
+    np.testing.assert_allclose(cargos['Seguro'], [1.0, 0.5])
+    np.testing.assert_allclose(cargos['Impuesto'], [1.9, 0.95])
+    np.testing.assert_allclose(cargos[COLUMNA_TOTAL], [4.9, 3.45])
+
+
+def test_nombres_repetidos():
+    with pytest.raises(ValueError, match="Comisión"):
+        calcular_cargos([1.0], [1.0], [CargoFijo(1.0), CargoFijo(2.0)])
+    cargos = calcular_cargos([1.0], [1.0], [CargoFijo(1.0), CargoFijo(2.0, nombre='Estudio')])
+    np.testing.assert_allclose(cargos[COLUMNA_TOTAL], [3.0])
+
+
+def test_matrices_sin_cargos_despues_del_ultimo_pago():
+    motor = MotorAmortizacion([1000.0, 1000.0], 0.01, [2, 4])
+    columnas = motor.columnas()
+    with pytest.raises(ValueError):
+        calcular_cargos(columnas['Saldo_Inicial'], columnas['Interés'], [CargoFijo(1.0)])
+
+    cargos = calcular_cargos(columnas['Saldo_Inicial'], columnas['Interés'],
+                             [CargoFijo([1.0, 3.0])], num_pagos=motor.num_pagos)
+    np.testing.assert_allclose(cargos['Comisión'], [[1, 1, 0, 0], [3, 3, 3, 3]])
+
+
+def test_tabla_larga_con_valor_por_credito():
+    tabla = pd.DataFrame({
+        'Crédito': [0, 0, 1],
+        'Saldo_Inicial': [100.0, 50.0, 200.0],
+        'Interés': [1.0, 0.5, 2.0],
+        'Saldo_Final': [50.0, 0.0, 0.0],
+    })
+    resultado = aplicar_cargos(tabla, [SeguroSaldo([0.01, 0.02])])
+    np.testing.assert_allclose(resultado['Seguro'], [1.0, 0.5, 4.0])
+    assert columnas_cargos(resultado) == ['Seguro', COLUMNA_TOTAL]
+    assert total_cargos(resultado) == pytest.approx(5.5)
+    assert aplicar_cargos(tabla, []) is tabla
+    assert total_cargos(tabla) == 0.0
@@ -0,0 +1,42 @@
+"""
+Archivos CSV y Excel de las tablas y reportes
+"""
+
+import io
+
+import pandas as pd
+import pytest
+
+from amortizacion.credito import Credito
+from amortizacion.exportacion import reporte_csv, tabla_excel
+from amortizacion.resumen import ResumenTabla
+
+pytest.importorskip("openpyxl")
+
+DATOS = {
+    'monto': 1_000_000.0, 'tasa_anual_original': 12.0, 'tipo_tasa': 'Efectiva',
+    'modalidad': 'Vencida', 'frecuencia': 12, 'frecuencia_texto': 'Mensual',
+    'num_pagos': 12, 'fecha_inicio': '2025-01-01', 'comision': 1000.0,
+    'seguro': 0.01, 'impuesto': 19.0,
+}
+
+
+def test_total_a_pagar_incluye_cargos():
+    credito = Credito(DATOS)
+    tabla = credito.tabla_basica()
+    datos = dict(credito.datos, cuota_fija=float(tabla['Cuota'].iloc[0]))
+
+    hoja = pd.read_excel(io.BytesIO(tabla_excel(tabla, 'Tabla', datos)), sheet_name='Resumen')
+    total = hoja.set_index('Concepto').loc['Total a Pagar', 'Valor']
+    esperado = ResumenTabla.desde_tabla(tabla).total_pagado
+    assert esperado > tabla['Cuota'].sum()
+    assert total == f"${esperado:,.2f}"
+
+
+def test_reporte_csv_con_ambas_tablas():
+    credito = Credito(DATOS)
+    tabla = credito.tabla_basica()
+    datos = dict(credito.datos, cuota_fija=float(tabla['Cuota'].iloc[0]))
+    reporte = reporte_csv(datos, tabla, tabla)
+    assert "RESUMEN COMPARATIVO" in reporte
+    assert "Ahorro en tiempo: 0 períodos" in reporte
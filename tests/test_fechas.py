@@ -0,0 +1,82 @@
+"""
+Calendario de pagos y bases de conteo de días
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from amortizacion.cli import main
+from amortizacion.credito import Credito
+from amortizacion.fechas import CalendarioPagos, cargar_festivos, dias_30_360
+
+DATOS = {'monto': 1_000_000.0, 'tasa_anual_original': 12.0, 'num_pagos': 12, 'fecha_inicio': '2025-01-31'}
+
+
+def test_fin_de_mes_y_dia_habil():
+    calendario = CalendarioPagos(12, ajuste='ninguno')
+    fechas = calendario.fechas('2025-01-31', 3)[0]
+    np.testing.assert_array_equal(fechas, np.array(['2025-02-28', '2025-03-31', '2025-04-30'],
+                                                   dtype='datetime64[D]'))
+
+    # 2025-05-31 es sábado: pasa al lunes, salvo con la convención modificada
+    assert CalendarioPagos(12).fechas('2025-04-30', 1)[0, 0] == np.datetime64('2025-06-02')
+    assert (CalendarioPagos(12, ajuste='siguiente_modificado').fechas('2025-04-30', 1)[0, 0]
+            == np.datetime64('2025-05-30'))
+
+
+def test_festivos(tmp_path):
+    ruta = tmp_path / "festivos.txt"
+    ruta.write_text("# festivos\n2025-03-03, lunes\n\n2025-03-04\n")
+    festivos = cargar_festivos(str(ruta))
+    assert len(festivos) == 2
+    # 2025-03-01 es sábado y los dos días hábiles siguientes son festivos
+    assert CalendarioPagos(12, festivos=str(ruta)).fechas('2025-02-01', 1)[0, 0] == np.datetime64('2025-03-05')
+    assert CalendarioPagos(12).fechas('2025-02-01', 1)[0, 0] == np.datetime64('2025-03-03')
+    assert len(cargar_festivos(str(tmp_path / "no_existe.txt"))) == 0
+
+
+def test_fracciones_anio():
+    assert CalendarioPagos(4).fracciones_anio('2025-01-15', 2).tolist() == [[0.25, 0.25]]
+    actual = CalendarioPagos(12, ajuste='ninguno', base_dias='actual/365').fracciones_anio('2025-01-15', 2)
+    np.testing.assert_allclose(actual, [[31 / 365, 28 / 365]])
+    treinta = CalendarioPagos(12, base_dias='30/360').fracciones_anio(['2025-01-31', '2025-01-15'], 2)
+    np.testing.assert_allclose(treinta, [[28 / 360, 33 / 360], [30 / 360, 30 / 360]])
+    assert dias_30_360(np.datetime64('2025-01-30'), np.datetime64('2025-03-31')) == 60
+
+
+def test_parametros_invalidos():
+    with pytest.raises(ValueError):
+        CalendarioPagos(5)
+    with pytest.raises(ValueError):
+        CalendarioPagos(12, ajuste='otro')
+    with pytest.raises(ValueError):
+        CalendarioPagos(12, base_dias='actual/360')
+
+
+def test_credito_con_base_de_dias():
+    iguales = Credito(DATOS).tabla_basica()
+    credito = Credito(dict(DATOS, base_dias='actual/365'))
+    tabla = credito.tabla_basica()
+    assert not credito.frances_simple
+    assert tabla['Saldo_Final'].iloc[-1] == 0
+    assert not np.allclose(tabla['Interés'], iguales['Interés'])
+
+    # Los abonos recorren la misma tasa por período que la tabla básica
+    con_abonos = credito.tabla_con_abonos(credito.indice_abonos(abonos_adhoc=[{'periodo': 2, 'monto': 500_000.0}]))
+    assert len(con_abonos) < len(tabla)
+    np.testing.assert_allclose(con_abonos['Interés'].iloc[:2], tabla['Interés'].iloc[:2], atol=0.01)
+    with pytest.raises(ValueError):
+        credito.extracto([1])
+
+
+def test_cli_base_dias(tmp_path):
+    salida = tmp_path / "tabla.csv"
+    argumentos = ["tabla", "--monto", "1000000", "--tasa", "12", "--pagos", "12",
+                  "--fecha-inicio", "2025-01-31", "--salida", str(salida)]
+    assert main(argumentos + ["--base-dias", "30/360"]) == 0
+    tabla = pd.read_csv(salida)
+    esperada = Credito(dict(DATOS, base_dias='30/360')).tabla_basica()
+    np.testing.assert_allclose(tabla['Interés'], esperada['Interés'])
+    with pytest.raises(SystemExit):
+        main(argumentos + ["--base-dias", "actual/360"])
@@ -0,0 +1,73 @@
+"""
+Créditos en unidades indexadas y su conversión a moneda local
+"""
+
+import numpy as np
+import pytest
+
+from amortizacion.cargos import COLUMNA_TOTAL, CargoFijo, SeguroSaldo
+from amortizacion.credito import Credito
+from amortizacion.monedas import (
+    COLUMNA_VALOR, CurvaIndice, aplicar_cargos_en_unidad, cargar_curvas, columnas_locales
+)
+
+CURVA = CurvaIndice('UVR', ['2025-01-01', '2026-01-01'], [380.0, 400.0])
+
+DATOS = {
+    'monto': 100_000.0, 'tasa_anual_original': 8.0, 'num_pagos': 24,
+    'fecha_inicio': '2025-01-01', 'unidad': 'UVR',
+}
+
+
+def test_curva_interpolacion_geometrica_y_extrapolacion():
+    medio = CURVA.valores_en('2025-07-02')[()]
+    assert 380.0 < medio < 390.0
+    assert medio == pytest.approx(380.0 * (400.0 / 380.0) ** (182 / 365))
+    assert CURVA.valores_en('2027-01-01')[()] == pytest.approx(400.0 ** 2 / 380.0)
+    assert CurvaIndice('USD', ['2025-01-01'], [4000.0]).valores_en(['2030-01-01'])[0] == 4000.0
+
+
+def test_curva_invalida():
+    with pytest.raises(ValueError):
+        CurvaIndice('UVR', [], [])
+    with pytest.raises(ValueError):
+        CurvaIndice('UVR', ['2025-01-01'], [0.0])
+
+
+def test_cargar_curvas(tmp_path):
+    ruta = tmp_path / "curvas.csv"
+    ruta.write_text("unidad,fecha,valor\n# comentario\nUVR, 2025-01-01, 380\nUVR,2026-01-01,400\n"
+                    "USD,2025-01-01,4000\n")
+    curvas = cargar_curvas(str(ruta))
+    assert sorted(curvas) == ['USD', 'UVR']
+    assert len(curvas['UVR']) == 2
+    assert cargar_curvas(str(tmp_path / "no_existe.csv")) == {}
+
+
+def test_tabla_en_unidades_con_columnas_locales():
+    tabla = Credito(DATOS, curvas={'UVR': CURVA}).tabla_basica()
+    valor = CURVA.valor_publicado(tabla['Fecha'].to_numpy(dtype='datetime64[D]'))
+    np.testing.assert_array_equal(tabla[COLUMNA_VALOR], valor)
+    np.testing.assert_allclose(tabla['Cuota_Local'], np.round(tabla['Cuota'] * valor, 2))
+    assert 'Saldo_Final_Local' in columnas_locales(tabla)
+
+    with pytest.raises(ValueError, match="UVR"):
+        Credito(DATOS)
+
+
+def test_comision_fija_en_moneda_local():
+    credito = Credito(dict(DATOS, comision=1000.0, seguro=0.01), curvas={'UVR': CURVA})
+    tabla = credito.tabla_basica()
+    np.testing.assert_array_equal(tabla['Comisión_Local'], 1000.0)
+    np.testing.assert_allclose(tabla['Comisión'], np.round(1000.0 / tabla[COLUMNA_VALOR], 2))
+    np.testing.assert_allclose(tabla['Total_Cargos_Local'],
+                               np.round(tabla['Comisión_Local'] + tabla['Seguro_Local'], 2))
+
+
+def test_cargos_sin_curva_en_moneda_local():
+    tabla = Credito(dict(DATOS, unidad='')).motor.tabla()
+    capas = [CargoFijo(1000.0), SeguroSaldo(0.0001)]
+    resultado = aplicar_cargos_en_unidad(tabla, capas, None)
+    np.testing.assert_array_equal(resultado['Comisión'], 1000.0)
+    assert COLUMNA_TOTAL in resultado.columns
+    assert columnas_locales(resultado) == []
@@ -0,0 +1,48 @@
+"""
+Modo exacto del motor: cuota nivelada con residuo en la última cuota
+"""
+
+import numpy as np
+
+from amortizacion.motor import COLUMNAS_MONTO, MotorAmortizacion
+
+MONTOS = [1_000_000.0, 500_000.0, 123_456.78, 1e9]
+TASAS = [0.01, 0.007, 0.08, 0.09]
+PAGOS = [36, 240, 600, 600]
+
+
+def test_cuota_nivelada_con_residuo_al_final():
+    columnas = MotorAmortizacion(MONTOS[:2], TASAS[:2], PAGOS[:2], exacto=True).columnas()
+    for fila, num_pagos in enumerate(PAGOS[:2]):
+        cuotas = columnas['Cuota'][fila, :num_pagos]
+        assert len(np.unique(cuotas[:-1])) == 1
+        assert columnas['Saldo_Final'][fila, num_pagos - 1] == 0
+    # A 240 pagos el redondeo de la cuota acumula más de un centavo en la última
+    assert columnas['Cuota'][1, 239] != columnas['Cuota'][1, 0]
+
+
+def test_renivelacion_sin_saldos_negativos():
+    motor = MotorAmortizacion(MONTOS, TASAS, PAGOS, exacto=True)
+    columnas = motor.columnas()
+    assert (columnas['Saldo_Final'] >= 0).all()
+    np.testing.assert_array_equal(columnas['Saldo_Inicial'] - columnas['Capital'], columnas['Saldo_Final'])
+    for fila, num_pagos in enumerate(PAGOS):
+        cuotas = columnas['Cuota'][fila, :num_pagos]
+        # El residuo nunca supera el 1% de la cuota más un par de centavos de redondeo
+        assert abs(cuotas[-1] - cuotas[-2]) <= cuotas[-2] / 100 + 2
+
+
+def test_cuota_recalculada_como_opcion():
+    nivelada = MotorAmortizacion(MONTOS, TASAS, PAGOS, exacto=True).columnas()
+    recalculada = MotorAmortizacion(MONTOS, TASAS, PAGOS, exacto=True, cuota_nivelada=False).columnas()
+    assert recalculada['Cuota'][1, 239] - recalculada['Cuota'][1, 0] <= 1
+    assert (recalculada['Saldo_Final'] >= 0).all()
+    np.testing.assert_array_equal(nivelada['Cuota'][0, :35], recalculada['Cuota'][0, :35])
+
+    # Fuera del modo exacto y del sistema francés la opción no cambia nada
+    aleman = dict(sistema='aleman', exacto=True)
+    for parametros in ({}, aleman):
+        uno = MotorAmortizacion(MONTOS, TASAS, PAGOS, **parametros).columnas()
+        otro = MotorAmortizacion(MONTOS, TASAS, PAGOS, cuota_nivelada=False, **parametros).columnas()
+        for nombre in COLUMNAS_MONTO:
+            np.testing.assert_array_equal(uno[nombre], otro[nombre])
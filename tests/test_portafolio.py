@@ -0,0 +1,50 @@
+"""
+Proyección de portafolios en serie y con el motor paralelo
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from amortizacion.motor import MotorAmortizacion
+from amortizacion.portafolio import columnas_bloque, normalizar_bloque, proyectar_portafolio
+from amortizacion.tasas import tasa_periodo
+
+
+def portafolio_mixto(n=300, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'monto': rng.uniform(1e3, 1e6, n).round(2),
+        'tasa_anual': rng.uniform(0.05, 0.35, n),
+        'num_pagos': rng.integers(6, 240, n),
+        'frecuencia': rng.choice([12, 4, 1], n),
+        'abono_periodico': np.where(rng.random(n) < 0.4, rng.uniform(10, 5000, n).round(2), 0.0),
+        'abono_cada': rng.integers(1, 6, n),
+        'fecha_inicio': '2025-03-10',
+    })
+
+
+def test_creditos_sin_abonos_usan_la_forma_cerrada():
+    bloque, _ = normalizar_bloque(portafolio_mixto())
+    columnas = columnas_bloque(bloque)
+    sin_abonos = np.flatnonzero(bloque['abono_periodico'].to_numpy() == 0)
+    solos = bloque.iloc[sin_abonos]
+    tasa = tasa_periodo(solos['tasa_anual'].to_numpy(), "Efectiva", "Vencida",
+                        solos['frecuencia'].to_numpy(dtype=float))
+    motor = MotorAmortizacion(solos['monto'].to_numpy(), tasa, solos['num_pagos'].to_numpy()).columnas()
+    ancho = motor['Cuota'].shape[1]
+    for nombre, valores in motor.items():
+        np.testing.assert_array_equal(columnas[nombre][sin_abonos, :ancho], valores)
+    assert (columnas['Abono_Extra'][sin_abonos] == 0).all()
+
+
+@pytest.mark.parametrize("agrupacion", ["periodo", "mes"])
+def test_serie_igual_a_paralelo(agrupacion):
+    portafolio = portafolio_mixto()
+    serie, resumen_serie = proyectar_portafolio(portafolio, agrupacion, fecha_base='2025-01-01',
+                                                presupuesto_mb=1)
+    paralelo, resumen_paralelo = proyectar_portafolio(portafolio, agrupacion, fecha_base='2025-01-01',
+                                                      presupuesto_mb=1, procesos=2)
+    assert resumen_serie == resumen_paralelo
+    assert resumen_serie['bloques'] > 1
+    pd.testing.assert_frame_equal(serie, paralelo)
@@ -0,0 +1,84 @@
+"""
+Refinanciación de un crédito existente contra una grilla de ofertas
+"""
+
+import numpy as np
+import pytest
+
+from amortizacion.credito import Credito
+from amortizacion.refinanciacion import AnalizadorRefinanciacion, grilla_ofertas
+
+DATOS = {'monto': 1_000_000.0, 'tasa_anual_original': 12.0, 'num_pagos': 36}
+
+
+def tabla_existente():
+    return Credito(DATOS).tabla_basica()
+
+
+def test_grilla_ofertas():
+    grilla = grilla_ofertas(tasa_anual=[0.10, 0.11], num_pagos=[24, 36, 48], comision=500.0)
+    assert list(grilla) == ['tasa_anual', 'num_pagos', 'comision']
+    assert all(len(valores) == 6 for valores in grilla.values())
+    assert set(zip(grilla['tasa_anual'], grilla['num_pagos'])) == {
+        (tasa, pagos) for tasa in (0.10, 0.11) for pagos in (24, 36, 48)
+    }
+    assert (grilla['comision'] == 500.0).all()
+
+
+def test_periodo_fuera_del_plazo():
+    tabla = tabla_existente()
+    with pytest.raises(ValueError):
+        AnalizadorRefinanciacion(tabla, len(tabla), 12)
+    with pytest.raises(ValueError):
+        AnalizadorRefinanciacion(tabla, -1, 12)
+
+
+def test_misma_oferta_no_ahorra():
+    tabla = tabla_existente()
+    analizador = AnalizadorRefinanciacion(tabla, 12, 12)
+    assert analizador.saldo == tabla['Saldo_Inicial'].iloc[12]
+    assert len(analizador.flujos_actuales) == 24
+
+    # Refinanciar el saldo a la misma tasa y plazo restante reproduce las cuotas
+    resultado = analizador.evaluar(0.12, 24)
+    assert resultado['Cuota Nueva'].iloc[0] == pytest.approx(tabla['Cuota'].iloc[0], abs=0.01)
+    assert resultado['Ahorro VPN'].iloc[0] == pytest.approx(0.0, abs=0.5)
+
+
+def test_ofertas_ordenadas_y_vpn():
+    analizador = AnalizadorRefinanciacion(tabla_existente(), 6, 12)
+    grilla = grilla_ofertas(tasa_anual=[0.08, 0.10, 0.14], num_pagos=[24, 30], comision=[0.0, 20_000.0])
+    resultado = analizador.evaluar(**grilla)
+    assert len(resultado) == 12
+    assert resultado['Ahorro VPN'].is_monotonic_decreasing
+
+    # El VPN del lote coincide con descontar cada oferta por separado
+    for _, oferta in resultado.iterrows():
+        pagos = int(oferta['Número de Pagos'])
+        flujos = np.zeros(max(pagos, len(analizador.flujos_actuales)))
+        flujos[:len(analizador.flujos_actuales)] += analizador.flujos_actuales
+        flujos[:pagos] -= oferta['Cuota Nueva']
+        descuento = (1 + analizador.tasa_descuento) ** -np.arange(1, len(flujos) + 1)
+        assert oferta['Ahorro VPN'] == pytest.approx(flujos @ descuento - oferta['Comisión'])
+
+    # Sin comisión y con menor tasa el ahorro es inmediato; con comisión se recupera después
+    mejor = resultado[(resultado['Tasa Anual (%)'] == 8.0) & (resultado['Número de Pagos'] == 30)]
+    sin_comision, con_comision = (mejor.sort_values('Comisión')['Período de Equilibrio']).tolist()
+    assert sin_comision == 0.0
+    assert con_comision > 1
+    caras = resultado[resultado['Tasa Anual (%)'] == 14.0]
+    assert (caras['Ahorro VPN'] < 0).all()
+
+
+def test_comision_financiada_y_abonos():
+    analizador = AnalizadorRefinanciacion(tabla_existente(), 0, 12)
+    contado = analizador.evaluar(0.10, 36, comision_pct=0.01)
+    financiada = analizador.evaluar(0.10, 36, comision_pct=0.01, financiar_comision=True)
+    assert contado['Comisión'].iloc[0] == pytest.approx(10_000.0)
+    assert financiada['Cuota Nueva'].iloc[0] > contado['Cuota Nueva'].iloc[0]
+    assert financiada['Total Pagado Nuevo'].iloc[0] == pytest.approx(financiada['Cuota Nueva'].iloc[0] * 36)
+
+    credito = Credito(DATOS)
+    con_abonos = credito.tabla_con_abonos(credito.indice_abonos(abonos_adhoc=[{'periodo': 3, 'monto': 50_000.0}]))
+    flujos = AnalizadorRefinanciacion(con_abonos, 0, 12).flujos_actuales
+    np.testing.assert_allclose(flujos, con_abonos['Cuota'] + con_abonos['Abono_Extra'])
@@ -0,0 +1,119 @@
+"""
+Formato binario de sesiones: varints, columnas en centavos o float64 y secciones
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from amortizacion.credito import Credito
+from amortizacion.escenarios import ConjuntoEscenarios
+from amortizacion.sesiones import (
+    MAGIA, VERSION, cargar_sesion, codificar_varints, decodificar_varints, guardar_sesion
+)
+
+DATOS = {
+    'monto': 1_000_000.0, 'tasa_anual_original': 12.0, 'num_pagos': 24,
+    'fecha_inicio': '2025-01-31', 'comision': 1000.0, 'seguro': 0.01, 'impuesto': 19.0,
+}
+PROGRAMADOS = [{'periodo_inicio': 3, 'monto': 25_000.5, 'frecuencia': 6},
+               {'periodo_inicio': 1, 'monto': 1_000.0, 'frecuencia': 1}]
+ADHOC = [{'periodo': 10, 'monto': 200_000.0}, {'periodo': 4, 'monto': 0.01}]
+
+
+def sesion_completa(comprimir=True):
+    credito = Credito(DATOS)
+    basica = credito.tabla_basica()
+    con_abonos = credito.tabla_con_abonos(credito.indice_abonos(PROGRAMADOS, ADHOC))
+    con_abonos.attrs['exacto'] = True
+
+    # Columnas que no caben en centavos: más decimales, NaN y texto
+    otra = basica.head(5).copy()
+    otra['Fecha'] = pd.to_datetime(otra['Fecha'])
+    otra['Valor_Unidad'] = [380.1234, 381.5, np.nan, np.inf, -2.125]
+    otra['Nota'] = ['a', 'ñ', '', 'x y', '1']
+
+    escenarios = ConjuntoEscenarios()
+    escenarios.agregar('Base', 1_000_000, 0.01, 24)
+    escenarios.agregar('Con abonos', 500_000.5, 0.0125, 36, 4, PROGRAMADOS, ADHOC)
+
+    tablas = {'basica': basica, 'con_abonos': con_abonos, 'otra': otra}
+    contenido = guardar_sesion(DATOS, PROGRAMADOS, ADHOC, tablas, escenarios, comprimir=comprimir)
+    return contenido, tablas, escenarios
+
+
+def test_varints_ida_y_vuelta():
+    valores = np.array([0, 1, -1, 63, -64, 64, 127, 128, 300, -300, 2 ** 40, -(2 ** 40),
+                        np.iinfo(np.int64).max, np.iinfo(np.int64).min], dtype=np.int64)
+    datos = codificar_varints(valores)
+    decodificados, posicion = decodificar_varints(datos, len(valores))
+    np.testing.assert_array_equal(decodificados, valores)
+    assert posicion == len(datos)
+    assert len(codificar_varints([0, -1, 1])) == 3
+
+    with pytest.raises(ValueError):
+        decodificar_varints(datos[:-1], len(valores))
+
+
+@pytest.mark.parametrize("comprimir", [True, False])
+def test_sesion_ida_y_vuelta(comprimir):
+    contenido, tablas, escenarios = sesion_completa(comprimir)
+    assert contenido[:4] == MAGIA
+    sesion = cargar_sesion(contenido)
+
+    assert sesion['datos_credito'] == DATOS
+    assert sesion['abonos_programados'] == PROGRAMADOS
+    assert sesion['abonos_adhoc'] == ADHOC
+
+    assert list(sesion['tablas']) == list(tablas)
+    for nombre, tabla in tablas.items():
+        restaurada = sesion['tablas'][nombre]
+        pd.testing.assert_frame_equal(restaurada, tabla, check_dtype=False)
+        assert restaurada.attrs['exacto'] == bool(tabla.attrs.get('exacto'))
+    assert 'Total_Cargos' in sesion['tablas']['basica']
+    assert sesion['tablas']['con_abonos']['Abono_Extra'].sum() > 0
+    assert pd.api.types.is_datetime64_any_dtype(sesion['tablas']['otra']['Fecha'])
+    assert isinstance(sesion['tablas']['basica']['Fecha'].iloc[0], str)
+
+    restaurados = sesion['escenarios']
+    assert restaurados.nombres == escenarios.nombres
+    for atributo in ('monto', 'tasa_periodo', 'num_pagos', 'frecuencia'):
+        np.testing.assert_array_equal(getattr(restaurados, atributo), getattr(escenarios, atributo))
+    np.testing.assert_array_equal(restaurados.abonos_densos(), escenarios.abonos_densos())
+    pd.testing.assert_frame_equal(restaurados.metricas(), escenarios.metricas())
+
+
+def test_sesion_vacia_y_secciones_desconocidas():
+    sesion = cargar_sesion(guardar_sesion({}))
+    assert sesion == {'datos_credito': {}, 'abonos_programados': [], 'abonos_adhoc': [],
+                      'tablas': {}, 'escenarios': None}
+
+    # Una sección de una versión futura con etiqueta desconocida se ignora
+    contenido = guardar_sesion(DATOS, comprimir=False) + codificar_varints([99, 3]) + b'abc'
+    assert cargar_sesion(contenido)['datos_credito'] == DATOS
+
+
+def test_encabezado_invalido():
+    contenido, _, _ = sesion_completa()
+    with pytest.raises(ValueError, match="no es una sesión"):
+        cargar_sesion(b'XXXX' + contenido[4:])
+    with pytest.raises(ValueError, match="no es una sesión"):
+        cargar_sesion(contenido[:5])
+    with pytest.raises(ValueError, match="Versión"):
+        cargar_sesion(MAGIA + bytes([VERSION + 1]) + contenido[5:])
+
+
+@pytest.mark.parametrize("comprimir", [True, False])
+def test_archivo_truncado(comprimir):
+    contenido, _, _ = sesion_completa(comprimir)
+    for largo in (7, len(contenido) // 3, len(contenido) // 2, len(contenido) - 1):
+        with pytest.raises(ValueError):
+            cargar_sesion(contenido[:largo])
+
+
+def test_archivo_danado():
+    contenido, _, _ = sesion_completa()
+    danado = bytearray(contenido)
+    danado[len(danado) // 2] ^= 0xFF
+    with pytest.raises(ValueError):
+        cargar_sesion(bytes(danado))
@@ -0,0 +1,108 @@
+"""
+Cola de trabajos en segundo plano: progreso, errores, cancelación y depuración
+"""
+
+import threading
+import time
+
+import pytest
+
+from amortizacion.trabajos import (
+    CANCELADO, COMPLETADO, EN_CURSO, FALLIDO, PENDIENTE, ColaTrabajos, Trabajo, TrabajoCancelado
+)
+
+
+@pytest.fixture
+def cola():
+    cola = ColaTrabajos(max_hilos=1, max_terminados=2)
+    yield cola
+    cola.cerrar()
+
+
+def esperar(trabajo, limite=10.0):
+    fin = time.time() + limite
+    while trabajo.activo:
+        assert time.time() < fin, f"{trabajo} no terminó"
+        time.sleep(0.005)
+    return trabajo
+
+
+def bloqueado(trabajo, iniciado, liberar):
+    iniciado.set()
+    while not liberar.wait(0.005):
+        trabajo.reportar(0.5, "Esperando")
+    return "listo"
+
+
+def test_trabajo_completado(cola):
+    def sumar(trabajo, a, b=0):
+        trabajo.reportar(2.0, "Sumando")
+        assert trabajo.progreso == 1.0
+        trabajo.reportar(-1.0)
+        assert (trabajo.progreso, trabajo.mensaje) == (0.0, "Sumando")
+        return a + b
+
+    identificador = cola.enviar("suma", sumar, 2, b=3)
+    trabajo = esperar(cola.obtener(identificador))
+    assert identificador.startswith("suma-")
+    assert trabajo.estado == COMPLETADO and trabajo.terminado_ok
+    assert trabajo.resultado() == 5
+    assert trabajo.error() is None
+    assert (trabajo.progreso, trabajo.mensaje) == (1.0, "Completado")
+    assert trabajo.terminado >= trabajo.creado
+
+
+def test_trabajo_fallido(cola):
+    def fallar(trabajo):
+        raise ZeroDivisionError("sin datos")
+
+    trabajo = esperar(cola.obtener(cola.enviar("falla", fallar)))
+    assert trabajo.estado == FALLIDO
+    assert isinstance(trabajo.error(), ZeroDivisionError)
+    assert trabajo.resultado() is None
+    assert trabajo.terminado is not None
+
+
+def test_cancelar_en_curso_y_pendiente(cola):
+    iniciado, liberar = threading.Event(), threading.Event()
+    primero = cola.obtener(cola.enviar("largo", bloqueado, iniciado, liberar))
+    assert iniciado.wait(10)
+    segundo = cola.obtener(cola.enviar("espera", lambda trabajo: "no debería correr"))
+    assert primero.estado == EN_CURSO
+    assert segundo.estado == PENDIENTE
+
+    # El pendiente no llega a ejecutarse y el que está en curso se detiene en su próximo reporte
+    assert cola.cancelar(segundo.identificador)
+    assert cola.cancelar(primero.identificador)
+    assert esperar(primero).estado == CANCELADO
+    assert esperar(segundo).estado == CANCELADO
+    assert primero.resultado() is None and primero.error() is None
+    assert segundo.mensaje == "En cola"
+    assert not cola.cancelar("no-existe")
+
+
+def test_registro_descartar_y_depurar(cola):
+    identificadores = [cola.enviar(f"t{i}", lambda trabajo, i=i: i) for i in range(3)]
+    for identificador in identificadores:
+        esperar(cola.obtener(identificador))
+    assert [t.resultado() for t in cola.trabajos(identificadores + ["otro"])] == [0, 1, 2]
+
+    cola.descartar(identificadores[0])
+    assert cola.obtener(identificadores[0]) is None
+
+    # Al enviar uno nuevo solo se conservan los dos terminados más recientes
+    esperar(cola.obtener(cola.enviar("t3", lambda trabajo: 3)))
+    iniciado, liberar = threading.Event(), threading.Event()
+    activo = cola.enviar("t4", bloqueado, iniciado, liberar)
+    assert [t.identificador for t in cola.trabajos()] == [identificadores[2], "t3-4", activo]
+    liberar.set()
+    assert esperar(cola.obtener(activo)).resultado() == "listo"
+
+
+def test_trabajo_sin_futuro():
+    trabajo = Trabajo("x-1", "x")
+    assert trabajo.estado == PENDIENTE and trabajo.activo
+    trabajo._cancelar.set()
+    assert trabajo.estado == CANCELADO
+    with pytest.raises(TrabajoCancelado):
+        trabajo.reportar(0.5)
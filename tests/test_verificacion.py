@@ -0,0 +1,14 @@
+"""
+Verificación por propiedades del motor como prueba de pytest
+Equivale a python tests/verificacion.py con menos casos por semilla
+"""
+
+import pytest
+
+from verificacion import verificar
+
+
+@pytest.mark.parametrize("semilla", [0, 1, 2])
+def test_variantes_sin_fallas(semilla):
+    fallas = verificar(casos=120, semilla=semilla, repeticiones=1, mostrar=lambda *_: None)
+    assert {comprobacion: lista[:5] for comprobacion, lista in fallas.items() if lista} == {}
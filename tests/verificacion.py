@@ -0,0 +1,758 @@
+"""
+Verificación por propiedades de las variantes del motor
+Genera créditos aleatorios dentro de los límites del formulario (todas las
+combinaciones de tipo de tasa, modalidad y frecuencia) con planes de abonos,
+ejecuta cada variante del motor sobre los mismos casos y compara cada columna
+al centavo contra una referencia escalar escrita desde cero; el motor se
+compara además en todos los sistemas, tipos de gracia y bases de días contra
+una referencia en aritmética decimal. También revisa los invariantes del
+README (saldo final cero y conservación de balances) y mide el rendimiento
+de cada variante
+
+Uso (con el paquete instalado): python tests/verificacion.py --casos 500 --semilla 7
+Con pytest se ejecuta desde tests/test_verificacion.py
+"""
+
+import argparse
+import math
+import sys
+import time
+from decimal import ROUND_FLOOR, Decimal, localcontext
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from amortizacion.abonos import columnas_con_abonos, tabla_con_abonos
+from amortizacion.escenarios import ConjuntoEscenarios
+from amortizacion.extractos import extracto_indice
+from amortizacion.fechas import BASES_DIAS, CalendarioPagos
+from amortizacion.indice_abonos import IndiceAbonos
+from amortizacion.kernel import NUMBA_DISPONIBLE, SALDO_MINIMO, recurrencia_eventos
+from amortizacion.mora import simular_mora
+from amortizacion.motor import (
+    COLUMNAS_MONTO, SISTEMAS, TIPOS_GRACIA, MotorAmortizacion, a_centavos, cuota_fija
+)
+from amortizacion.portafolio import proyectar_portafolio
+from amortizacion.tasas import (
+    FRECUENCIAS, efectiva_anual, nominal_a_efectiva, tabla_equivalencias, tasa_periodo
+)
+from amortizacion.validacion import ValidadorLotes
+
+TIPOS_TASA = ("Nominal", "Efectiva")
+MODALIDADES = ("Vencida", "Anticipada")
+
+# Diferencia máxima admitida por celda: las variantes redondean cada columna
+# por separado, así que una diferencia de un ulp puede mover un centavo
+TOLERANCIA_CENTAVOS = 1
+
+# Límites del formulario del aplicativo
+PLAZO_MAXIMO = 600
+TASA_ANUAL_MINIMA = 0.001
+TASA_ANUAL_MAXIMA = 1.0
+
+# Tasa efectiva anual más alta que producen las tasas vencidas del formulario
+# (100% nominal mensual). Las anticipadas divergen cerca del 100% (iₐ/(1-iₐ))
+# y se acotan a esta misma tasa vencida equivalente
+TASA_EFECTIVA_MAXIMA = float(nominal_a_efectiva(TASA_ANUAL_MAXIMA, 12))
+
+# La gracia total capitaliza intereses: sus períodos se acotan para que el
+# saldo no pase de este monto. Cerca de 10¹³ pesos el redondeo de cada columna
+# a 2 decimales en punto flotante ya no conserva el balance al centavo
+SALDO_MAXIMO = 1e12
+
+# Crecimiento (1+r)ⁿ hasta el que se comparan al centavo las variantes con la
+# cuota fija de punto flotante: el saldo depende de esa cuota con un factor
+# (1+r)ᵏ, así que más allá dos algoritmos correctos (recurrencia hacia
+# adelante y forma cerrada) difieren en más de un centavo. Los casos más
+# grandes se generan igual y solo se les revisan los invariantes; el motor se
+# compara en todo el rango contra referencia_motor
+FACTOR_MAXIMO = 1e4
+
+
+def tasa_periodo_escalar(tasa_anual, tipo_tasa, modalidad, frecuencia):
+    """
+    Tasa por período con las fórmulas de ConversionTasas, en punto flotante escalar
+    """
+    tasa = tasa_anual
+    if tipo_tasa == "Nominal":
+        tasa = (1 + tasa / frecuencia) ** frecuencia - 1
+    if modalidad == "Anticipada":
+        tasa = tasa / (1 - tasa)
+    return (1 + tasa) ** (1 / frecuencia) - 1
+
+
+def cuota_escalar(monto, tasa, num_pagos):
+    """
+    PMT = PV·r / (1 - (1+r)⁻ⁿ), o PV/n sin intereses
+    """
+    if tasa == 0:
+        return monto / num_pagos
+    return monto * tasa / (1 - (1 + tasa) ** -num_pagos)
+
+
+def referencia_escalar(monto, tasa, num_pagos, programados, adhoc, cuota):
+    """
+    Tabla de referencia de un crédito, período a período en Python puro
+
+    Aplica los abonos como ManejoAbonos: un programado aplica en su período
+    de inicio y cada `frecuencia` períodos; un ad-hoc, en su período. Retorna
+    la lista de filas (Saldo_Inicial, ..., Saldo_Final) sin redondear.
+    """
+    filas = []
+    saldo = monto
+    for periodo in range(1, num_pagos + 1):
+        if saldo <= SALDO_MINIMO:
+            break
+        abono_periodo = sum(abono['monto'] for abono in programados
+                            if periodo >= abono['periodo_inicio']
+                            and (periodo - abono['periodo_inicio']) % abono['frecuencia'] == 0)
+        abono_periodo += sum(abono['monto'] for abono in adhoc if abono['periodo'] == periodo)
+
+        interes = saldo * tasa
+        pago = saldo + interes if periodo == num_pagos else min(cuota, saldo + interes)
+        capital = pago - interes
+        restante = saldo - capital
+        abono_periodo = min(abono_periodo, restante)
+        filas.append((saldo, pago, interes, capital, abono_periodo, restante - abono_periodo))
+        saldo = restante - abono_periodo
+    return filas
+
+
+def referencia_mora_escalar(cuotas, pagos, tasa_mora):
+    """
+    Saldo vencido e interés de mora de un crédito, período a período
+
+    Cada pago cubre primero lo vencido con su mora y luego la cuota; el exceso
+    sobre lo exigible no se aplica.
+    """
+    vencido = 0.0
+    filas = []
+    for cuota, pago in zip(cuotas, pagos):
+        interes = vencido * tasa_mora
+        vencido = max(vencido + interes + cuota - pago, 0.0)
+        filas.append((interes, vencido))
+    return filas
+
+
+def tasas_credito(credito, tasa):
+    """
+    Tasa de cada período como Decimal; con base de días, la de su fracción de año
+    """
+    if credito['base_dias'] is None:
+        return [Decimal(tasa)] * credito['num_pagos']
+    calendario = CalendarioPagos(credito['frecuencia'], base_dias=credito['base_dias'])
+    fracciones = calendario.fracciones_anio(np.datetime64(credito['fecha_inicio']), credito['num_pagos'])[0]
+    return [(1 + Decimal(tasa)) ** (Decimal(float(fraccion)) * credito['frecuencia']) - 1
+            for fraccion in fracciones]
+
+
+def _centavo(valor):
+    """
+    Redondeo al centavo entero como el modo exacto del motor: ⌊x + 0.5⌋
+    """
+    return (valor + Decimal('0.5')).to_integral_value(rounding=ROUND_FLOOR)
+
+
+def referencia_motor(credito, exacto=False):
+    """
+    Tabla de un crédito sin abonos en cualquier sistema, en aritmética decimal
+
+    Cada período amortiza el saldo sobre los períodos restantes: en el francés
+    la cuota es Bₖ/Aₖ, con Aₖ la anualidad de las tasas restantes, y en el
+    alemán el capital es Bₖ entre los períodos restantes (sin redondeo es la
+    misma cuota y el mismo capital en cada período). La precisión crece con
+    (1+r)ⁿ, así que la recurrencia es exacta al centavo aun donde la de punto
+    flotante pierde todos los dígitos. Con `exacto` los montos van en
+    centavos y el interés, la cuota y el capital se redondean al centavo como
+    en el modo exacto del motor, incluida la cuota nivelada del francés que se
+    renivela cuando el residuo (Bₖ - C·Aₖ)·Gₖ supera el 1% de la cuota.
+    Retorna la lista de filas (Saldo_Inicial, ..., Saldo_Final) en pesos.
+    """
+    num_pagos, gracia = credito['num_pagos'], credito['periodos_gracia']
+    tasa = tasa_periodo_escalar(credito['tasa_anual'], credito['tipo_tasa'],
+                                credito['modalidad'], credito['frecuencia'])
+    redondear = _centavo if exacto else (lambda valor: valor)
+    filas = []
+    with localcontext() as contexto:
+        # Las bases de días alargan algunos períodos: margen sobre log₁₀(1+r)ⁿ
+        contexto.prec = 40 + math.ceil(1.1 * num_pagos * math.log10(1 + tasa))
+        tasas = tasas_credito(credito, tasa)
+        anualidades = [Decimal(0)] * (num_pagos + 1)
+        crecimientos = [Decimal(1)] * (num_pagos + 1)
+        for periodo in range(num_pagos - 1, gracia - 1, -1):
+            anualidades[periodo] = (1 + anualidades[periodo + 1]) / (1 + tasas[periodo])
+            crecimientos[periodo] = (1 + tasas[periodo]) * crecimientos[periodo + 1]
+
+        escala = 100 if exacto else 1
+        saldo = redondear(Decimal(credito['monto']) * escala)
+        cuota = Decimal(0)
+        for periodo, tasa_k in enumerate(tasas):
+            interes = redondear(saldo * tasa_k)
+            if periodo == num_pagos - 1:
+                capital = saldo
+            elif periodo < gracia:
+                capital = -interes if credito['tipo_gracia'] == 'total' else Decimal(0)
+            elif credito['sistema'] == 'frances':
+                residuo = (saldo - cuota * anualidades[periodo]) * crecimientos[periodo]
+                if not exacto or abs(residuo) > cuota / 100:
+                    cuota = redondear(saldo / anualidades[periodo])
+                capital = cuota - interes
+            elif credito['sistema'] == 'aleman':
+                capital = redondear(saldo / (num_pagos - periodo))
+            else:
+                capital = Decimal(0)
+            filas.append(tuple(float(valor / escala) for valor in
+                               (saldo, interes + capital, interes, capital, Decimal(0), saldo - capital)))
+            saldo -= capital
+    return filas
+
+
+def tasa_anual_aleatoria(rng, tipo_tasa, modalidad, frecuencia):
+    """
+    Tasa anual dentro del rango del formulario
+
+    Se vuelve a sortear si su tasa efectiva vencida supera TASA_EFECTIVA_MAXIMA
+    (solo ocurre con tasas anticipadas).
+    """
+    while True:
+        tasa_anual = round(float(rng.uniform(TASA_ANUAL_MINIMA, TASA_ANUAL_MAXIMA)), 6)
+        if 0 < efectiva_anual(tasa_anual, tipo_tasa, modalidad, frecuencia) <= TASA_EFECTIVA_MAXIMA:
+            return tasa_anual
+
+
+def generar_casos(rng, cantidad, max_pagos=PLAZO_MAXIMO):
+    """
+    Créditos aleatorios que recorren todas las combinaciones de tasa y frecuencia
+
+    Cada caso es un dict con los datos del formulario del aplicativo y sus
+    listas de abonos (incluye abonos fuera del plazo y casos sin abonos). Tasa
+    y plazo cubren todo el rango del formulario.
+    """
+    combinaciones = list(product(TIPOS_TASA, MODALIDADES, FRECUENCIAS.values()))
+    casos = []
+    for i in range(cantidad):
+        tipo_tasa, modalidad, frecuencia = combinaciones[i % len(combinaciones)]
+        monto = round(float(np.exp(rng.uniform(np.log(1e3), np.log(1e9)))), 2)
+        tasa_anual = tasa_anual_aleatoria(rng, tipo_tasa, modalidad, frecuencia)
+        num_pagos = int(rng.integers(1, max_pagos + 1))
+        programados = [
+            {'periodo_inicio': int(rng.integers(1, num_pagos + 6)),
+             'monto': round(float(rng.uniform(0, 0.05) * monto), 2),
+             'frecuencia': int(rng.integers(1, 13))}
+            for _ in range(rng.integers(0, 3))
+        ]
+        adhoc = [
+            {'periodo': int(rng.integers(1, num_pagos + 6)),
+             'monto': round(float(rng.uniform(0, 0.3) * monto), 2)}
+            for _ in range(rng.integers(0, 4))
+        ]
+        casos.append({
+            'monto': monto,
+            'tasa_anual': tasa_anual,
+            'tipo_tasa': tipo_tasa,
+            'modalidad': modalidad,
+            'frecuencia': frecuencia,
+            'num_pagos': num_pagos,
+            'abonos_programados': programados,
+            'abonos_adhoc': adhoc,
+        })
+    return casos
+
+
+def generar_creditos(rng, cantidad, max_pagos=PLAZO_MAXIMO):
+    """
+    Créditos sin abonos en todos los sistemas, tipos de gracia y bases de días
+
+    Parten de generar_casos; la mitad tiene períodos de gracia, y los de gracia
+    total se acotan para que el saldo capitalizado no supere SALDO_MAXIMO.
+    """
+    combinaciones = list(product(SISTEMAS, TIPOS_GRACIA, (None,) + BASES_DIAS))
+    creditos = []
+    for i, caso in enumerate(generar_casos(rng, cantidad, max_pagos)):
+        sistema, tipo_gracia, base_dias = combinaciones[i % len(combinaciones)]
+        gracia = int(rng.integers(0, caso['num_pagos'])) if rng.random() < 0.5 else 0
+        if tipo_gracia == 'total':
+            tasa = tasa_periodo_escalar(caso['tasa_anual'], caso['tipo_tasa'],
+                                        caso['modalidad'], caso['frecuencia'])
+            gracia = min(gracia, int(math.log(SALDO_MAXIMO / caso['monto']) / math.log1p(tasa)))
+        inicio = np.datetime64('2020-01-01') + np.timedelta64(int(rng.integers(0, 3650)), 'D')
+        creditos.append(dict(caso, abonos_programados=[], abonos_adhoc=[], sistema=sistema,
+                             periodos_gracia=gracia, tipo_gracia=tipo_gracia,
+                             base_dias=base_dias, fecha_inicio=str(inicio)))
+    return creditos
+
+
+def plan_portafolio(caso):
+    """
+    Caso reducido al único abono periódico que admite un archivo de portafolio
+    """
+    programados = caso['abonos_programados'][:1]
+    return dict(caso, abonos_programados=programados, abonos_adhoc=[])
+
+
+class Lote:
+    """
+    Arreglos de un conjunto de casos, listos para las variantes vectorizadas
+    """
+
+    def __init__(self, casos):
+        self.casos = casos
+        self.monto = np.array([caso['monto'] for caso in casos], dtype=float)
+        self.num_pagos = np.array([caso['num_pagos'] for caso in casos], dtype=np.int64)
+        self.tasa = tasa_periodo(
+            [caso['tasa_anual'] for caso in casos],
+            [caso['tipo_tasa'] for caso in casos],
+            [caso['modalidad'] for caso in casos],
+            [caso['frecuencia'] for caso in casos],
+        )
+        self.cuota = cuota_fija(self.monto, self.tasa, self.num_pagos)
+        self.max_pagos = int(self.num_pagos.max())
+        self.indices = [
+            IndiceAbonos(caso['abonos_programados'], caso['abonos_adhoc'], caso['num_pagos'])
+            for caso in casos
+        ]
+        self.sin_abonos = np.array([indice.vacio for indice in self.indices])
+        self.comparables = self.num_pagos * np.log1p(self.tasa) <= math.log(FACTOR_MAXIMO)
+
+    def abonos(self):
+        """
+        Matriz densa (casos × períodos) de abonos
+        """
+        abonos = np.zeros((len(self.casos), self.max_pagos))
+        for fila, indice in enumerate(self.indices):
+            abonos[fila, :indice.num_pagos] = indice.por_periodo
+        return abonos
+
+
+def _matrices(tablas, max_pagos):
+    """
+    Filas por crédito → (columnas (L, N) redondeadas, períodos), como columnas_con_abonos
+    """
+    columnas = {nombre: np.zeros((len(tablas), max_pagos)) for nombre in COLUMNAS_MONTO}
+    periodos = np.zeros(len(tablas), dtype=np.int64)
+    for fila, tabla in enumerate(tablas):
+        valores = np.asarray(tabla, dtype=float).reshape(-1, len(COLUMNAS_MONTO))
+        periodos[fila] = len(valores)
+        for posicion, nombre in enumerate(COLUMNAS_MONTO):
+            columnas[nombre][fila, :len(valores)] = np.round(valores[:, posicion], 2)
+    return columnas, periodos
+
+
+# --- Variantes -------------------------------------------------------------
+# Cada variante recibe un Lote y retorna (columnas, períodos) para los casos
+# que soporta, junto con la máscara de esos casos
+
+
+def variante_referencia(lote):
+    """
+    Referencia escalar, con tasa y cuota calculadas también en escalar
+    """
+    tablas = []
+    for caso in lote.casos:
+        tasa = tasa_periodo_escalar(caso['tasa_anual'], caso['tipo_tasa'], caso['modalidad'], caso['frecuencia'])
+        cuota = cuota_escalar(caso['monto'], tasa, caso['num_pagos'])
+        tablas.append(referencia_escalar(caso['monto'], tasa, caso['num_pagos'],
+                                         caso['abonos_programados'], caso['abonos_adhoc'], cuota))
+    return _matrices(tablas, lote.max_pagos), np.ones(len(lote.casos), dtype=bool)
+
+
+def variante_kernel_numpy(lote):
+    """
+    Recurrencia por lote de columnas_con_abonos con el kernel NumPy
+    """
+    resultado = columnas_con_abonos(lote.monto, lote.tasa, lote.num_pagos, lote.abonos(),
+                                    lote.cuota, usar_numba=False)
+    return resultado, np.ones(len(lote.casos), dtype=bool)
+
+
+def variante_kernel_numba(lote):
+    """
+    Recurrencia por lote con el kernel compilado
+    """
+    resultado = columnas_con_abonos(lote.monto, lote.tasa, lote.num_pagos, lote.abonos(),
+                                    lote.cuota, usar_numba=True)
+    return resultado, np.ones(len(lote.casos), dtype=bool)
+
+
+def variante_kernel_eventos(lote):
+    """
+    Forma cerrada por eventos de abono, sin bucle por período
+    """
+    columnas, periodos = recurrencia_eventos(lote.monto, lote.tasa, lote.num_pagos,
+                                             lote.abonos(), lote.cuota)
+    columnas = {nombre: np.round(valor, 2) for nombre, valor in zip(COLUMNAS_MONTO, columnas)}
+    return (columnas, periodos), np.ones(len(lote.casos), dtype=bool)
+
+
+def variante_tabla_con_abonos(lote):
+    """
+    Una tabla por crédito desde su IndiceAbonos, como la pestaña de abonos
+    """
+    tablas = [
+        tabla_con_abonos(monto, tasa, n, indice, cuota)[COLUMNAS_MONTO].to_numpy()
+        for monto, tasa, n, indice, cuota in zip(lote.monto, lote.tasa, lote.num_pagos,
+                                                 lote.indices, lote.cuota)
+    ]
+    return _matrices(tablas, lote.max_pagos), np.ones(len(lote.casos), dtype=bool)
+
+
+def variante_extractos(lote):
+    """
+    Todos los períodos de cada crédito como extractos en forma cerrada
+    """
+    periodos = np.arange(1, lote.max_pagos + 1)
+    tablas = [
+        extracto_indice(monto, tasa, n, indice, periodos, cuota)[COLUMNAS_MONTO].to_numpy()
+        for monto, tasa, n, indice, cuota in zip(lote.monto, lote.tasa, lote.num_pagos,
+                                                 lote.indices, lote.cuota)
+    ]
+    return _matrices(tablas, lote.max_pagos), np.ones(len(lote.casos), dtype=bool)
+
+
+def variante_escenarios(lote):
+    """
+    Todos los casos como escenarios de un ConjuntoEscenarios
+    """
+    escenarios = ConjuntoEscenarios()
+    for posicion, (caso, tasa) in enumerate(zip(lote.casos, lote.tasa)):
+        escenarios.agregar(f"caso {posicion}", caso['monto'], tasa, caso['num_pagos'],
+                           caso['frecuencia'], caso['abonos_programados'], caso['abonos_adhoc'])
+    columnas, periodos = escenarios.calcular()
+    relleno = lote.max_pagos - columnas['Cuota'].shape[1]
+    columnas = {nombre: np.pad(valor, ((0, 0), (0, relleno))) for nombre, valor in columnas.items()}
+    return (columnas, periodos), np.ones(len(lote.casos), dtype=bool)
+
+
+def variante_motor(lote):
+    """
+    Forma cerrada del motor: solo aplica a los casos sin abonos
+    """
+    mascara = lote.sin_abonos
+    motor = MotorAmortizacion(lote.monto[mascara], lote.tasa[mascara], lote.num_pagos[mascara])
+    columnas = motor.columnas()
+    relleno = lote.max_pagos - motor.max_pagos if mascara.any() else lote.max_pagos
+    columnas = {nombre: np.pad(columnas[nombre], ((0, 0), (0, relleno))) for nombre in COLUMNAS_MONTO}
+    return (columnas, lote.num_pagos[mascara]), mascara
+
+
+def variantes_disponibles():
+    """
+    Variantes a comparar contra la referencia escalar
+    """
+    variantes = {
+        'kernel_numpy': variante_kernel_numpy,
+        'kernel_eventos': variante_kernel_eventos,
+        'tabla_con_abonos': variante_tabla_con_abonos,
+        'escenarios': variante_escenarios,
+        'extractos': variante_extractos,
+        'motor': variante_motor,
+    }
+    if NUMBA_DISPONIBLE:
+        variantes['kernel_numba'] = variante_kernel_numba
+    return variantes
+
+
+# --- Propiedades -----------------------------------------------------------
+
+
+def diferencias(referencia, resultado, mascara, comparables):
+    """
+    Casos comparables que no coinciden con la referencia al centavo
+
+    `mascara` marca los casos que cubre la variante (una fila de `resultado`
+    por caso) y `comparables`, los que se comparan (ver FACTOR_MAXIMO).
+
+    Returns:
+        lista de (caso, motivo)
+    """
+    (columnas_ref, periodos_ref), (columnas, periodos) = referencia, resultado
+    casos = np.flatnonzero(mascara)
+    filas = np.flatnonzero(comparables[casos])
+    casos = casos[filas]
+    fallas = [(int(caso), f"períodos {periodos[fila]} ≠ {periodos_ref[caso]}")
+              for fila, caso in zip(filas, casos) if periodos[fila] != periodos_ref[caso]]
+
+    for nombre in COLUMNAS_MONTO:
+        diferencia = np.abs(a_centavos(columnas[nombre][filas]) - a_centavos(columnas_ref[nombre][casos]))
+        for fila in np.flatnonzero(diferencia.max(axis=1, initial=0) > TOLERANCIA_CENTAVOS):
+            fallas.append((int(casos[fila]), f"{nombre}: {diferencia[fila].max()} centavos"))
+    return fallas
+
+
+def tabla_larga(columnas, periodos):
+    """
+    Tabla en formato largo (columna 'Crédito') de los períodos efectivos
+    """
+    creditos, max_pagos = columnas['Cuota'].shape
+    validos = np.arange(max_pagos)[None, :] < periodos[:, None]
+    tabla = pd.DataFrame({nombre: columnas[nombre][validos] for nombre in COLUMNAS_MONTO})
+    tabla.insert(0, 'Crédito', np.repeat(np.arange(creditos), periodos))
+    return tabla
+
+
+def invariantes(columnas, periodos, casos, exacto=False):
+    """
+    Reglas de conservación del README (incluye saldo final cero)
+
+    Returns:
+        lista de (caso, regla) con las reglas incumplidas
+    """
+    tabla = tabla_larga(columnas, periodos)
+    tabla.attrs['exacto'] = exacto
+    errores = ValidadorLotes.validar_conservacion(tabla)
+    fallas = []
+    for regla in errores.columns:
+        for credito in np.unique(tabla.loc[errores[regla].to_numpy(), 'Crédito']):
+            fallas.append((int(casos[credito]), regla))
+    return fallas
+
+
+def verificar_tasas(lote):
+    """
+    Tasa vectorizada frente a la escalar (a nivel de redondeo de punto flotante)
+    """
+    escalar = np.array([
+        tasa_periodo_escalar(caso['tasa_anual'], caso['tipo_tasa'], caso['modalidad'], caso['frecuencia'])
+        for caso in lote.casos
+    ])
+    fallas = [(int(caso), "tasa_periodo") for caso in
+              np.flatnonzero(~np.isclose(lote.tasa, escalar, rtol=1e-12, atol=0))]
+
+    # Ruta escalar memoizada y tabla de equivalencias frente a la vectorizada
+    memoizada = np.array([
+        tasa_periodo(caso['tasa_anual'], caso['tipo_tasa'], caso['modalidad'], caso['frecuencia'])
+        for caso in lote.casos
+    ])
+    fallas += [(int(caso), "tasa_periodo memoizada") for caso in
+               np.flatnonzero(~np.isclose(lote.tasa, memoizada, rtol=1e-12, atol=0))]
+    tipos, modalidades, frecuencias = (np.array([caso[clave] for caso in lote.casos])
+                                       for clave in ('tipo_tasa', 'modalidad', 'frecuencia'))
+    tabla = tabla_equivalencias([caso['tasa_anual'] for caso in lote.casos], tipos, modalidades,
+                                frecuencias, frecuencias=FRECUENCIAS).to_numpy()
+    columna = {periodos: posicion for posicion, periodos in enumerate(FRECUENCIAS.values())}
+    equivalente = tabla[np.arange(len(tabla)), [columna[f] for f in frecuencias]]
+    fallas += [(int(caso), "tabla_equivalencias") for caso in
+               np.flatnonzero(~np.isclose(lote.tasa, equivalente, rtol=1e-12, atol=0))]
+    return fallas
+
+
+def verificar_sistemas(creditos):
+    """
+    Motor en punto flotante y en modo exacto frente a referencia_motor
+
+    Cubre todos los sistemas, tipos de gracia y bases de días (un motor por
+    frecuencia y base, con su calendario). El modo exacto se compara con la
+    referencia redondeada al centavo y debe conservar el balance sin
+    tolerancia.
+
+    Returns:
+        (fallas en punto flotante, fallas en modo exacto)
+    """
+    grupos = {}
+    for posicion, credito in enumerate(creditos):
+        grupos.setdefault((credito['frecuencia'], credito['base_dias']), []).append(posicion)
+
+    fallas_flotante, fallas_exacto = [], []
+    for (frecuencia, base_dias), posiciones in grupos.items():
+        grupo = [creditos[posicion] for posicion in posiciones]
+        parametros = {
+            'monto': [credito['monto'] for credito in grupo],
+            'tasa_periodo': [tasa_periodo_escalar(credito['tasa_anual'], credito['tipo_tasa'],
+                                                  credito['modalidad'], frecuencia) for credito in grupo],
+            'num_pagos': [credito['num_pagos'] for credito in grupo],
+            'fecha_inicio': np.array([credito['fecha_inicio'] for credito in grupo], dtype='datetime64[D]'),
+            'calendario': None if base_dias is None else CalendarioPagos(frecuencia, base_dias=base_dias),
+            'sistema': [credito['sistema'] for credito in grupo],
+            'periodos_gracia': [credito['periodos_gracia'] for credito in grupo],
+            'tipo_gracia': [credito['tipo_gracia'] for credito in grupo],
+        }
+        flotante = MotorAmortizacion(**parametros).columnas()
+        exacto = MotorAmortizacion(**parametros, exacto=True).columnas()
+
+        for fila, (posicion, credito) in enumerate(zip(posiciones, grupo)):
+            num_pagos = credito['num_pagos']
+            esperado = a_centavos(np.array(referencia_motor(credito)))
+            esperado_exacto = a_centavos(np.array(referencia_motor(credito, exacto=True)))
+            # Los saldos capitalizados en la gracia total llegan a 10¹⁴ centavos,
+            # donde n productos en punto flotante ya mueven algunos centavos. En
+            # modo exacto el interés sale de saldo·tasa en punto flotante: a esa
+            # escala el producto puede redondear al centavo vecino y la gracia
+            # capitaliza la diferencia; con la cuota nivelada del francés cada
+            # centavo de diferencia crece además con (1+r) hasta el último pago.
+            # Ambas tolerancias son relativas al monto más grande del crédito
+            escala = np.abs(esperado).max()
+            tolerancia = max(TOLERANCIA_CENTAVOS, num_pagos * np.finfo(float).eps * escala)
+            crecimiento = 1.0
+            if credito['sistema'] == 'frances':
+                # Las bases de días alargan algunos períodos, como en referencia_motor
+                plazo = num_pagos - credito['periodos_gracia']
+                crecimiento = (1 + parametros['tasa_periodo'][fila]) ** (1.1 * plazo)
+            tolerancia_exacto = max(TOLERANCIA_CENTAVOS, 1e-12 * escala * crecimiento)
+            for columna, nombre in enumerate(COLUMNAS_MONTO):
+                diferencia = np.abs(a_centavos(flotante[nombre][fila, :num_pagos]) - esperado[:, columna])
+                if (diferencia > tolerancia).any():
+                    fallas_flotante.append((posicion, f"{nombre}: {diferencia.max()} centavos"))
+                diferencia = np.abs(exacto[nombre][fila, :num_pagos] - esperado_exacto[:, columna])
+                if (diferencia > tolerancia_exacto).any():
+                    fallas_exacto.append((posicion, f"{nombre}: {diferencia.max()} centavos"))
+
+        num_pagos, posiciones = np.array(parametros['num_pagos']), np.array(posiciones)
+        fallas_flotante += invariantes(flotante, num_pagos, posiciones)
+        fallas_exacto += invariantes({nombre: exacto[nombre] / 100 for nombre in COLUMNAS_MONTO},
+                                     num_pagos, posiciones, exacto=True)
+    return fallas_flotante, fallas_exacto
+
+
+def verificar_portafolio(casos):
+    """
+    Flujos agregados del portafolio frente a la suma de las referencias
+
+    Los casos se reducen a un abono periódico, que es lo que admite el archivo,
+    y se toman solo los comparables al centavo (ver FACTOR_MAXIMO).
+    """
+    reducidos = [plan_portafolio(caso) for caso in casos]
+    reducidos = [caso for caso, comparable in zip(reducidos, Lote(reducidos).comparables) if comparable]
+    lote = Lote(reducidos)
+    (columnas, _), _ = variante_referencia(lote)
+
+    archivo = pd.DataFrame({
+        'monto': [caso['monto'] for caso in reducidos],
+        'tasa_anual': [caso['tasa_anual'] for caso in reducidos],
+        'num_pagos': [caso['num_pagos'] for caso in reducidos],
+        'frecuencia': [caso['frecuencia'] for caso in reducidos],
+        'tipo_tasa': [caso['tipo_tasa'] for caso in reducidos],
+        'modalidad': [caso['modalidad'] for caso in reducidos],
+        'abono_periodico': [caso['abonos_programados'][0]['monto'] if caso['abonos_programados'] else 0.0
+                            for caso in reducidos],
+        'abono_cada': [caso['abonos_programados'][0]['frecuencia'] if caso['abonos_programados'] else 1
+                       for caso in reducidos],
+        'abono_desde': [caso['abonos_programados'][0]['periodo_inicio'] if caso['abonos_programados'] else 1
+                        for caso in reducidos],
+    })
+    proyeccion, resumen = proyectar_portafolio(archivo)
+    fallas = [(-1, f"{resumen['rechazados']} créditos rechazados")] if resumen['rechazados'] else []
+
+    # Cada crédito aporta a lo sumo un centavo de diferencia por período
+    tolerancia = TOLERANCIA_CENTAVOS * len(casos)
+    for nombre in ('Cuota', 'Interés', 'Capital', 'Abono_Extra'):
+        esperado = a_centavos(columnas[nombre].sum(axis=0))
+        obtenido = np.zeros_like(esperado)
+        calculado = a_centavos(proyeccion[nombre].to_numpy())
+        obtenido[:len(calculado)] = calculado[:len(esperado)]
+        diferencia = np.abs(obtenido - esperado).max(initial=0)
+        if diferencia > tolerancia:
+            fallas.append((-1, f"portafolio {nombre}: {diferencia} centavos"))
+    return fallas
+
+
+def verificar_mora(lote, rng):
+    """
+    Mora vectorizada frente a la referencia escalar, con patrones booleanos y de montos
+
+    El patrón cubre 12 períodos más que el plazo para proyectar la mora
+    posterior al vencimiento.
+    """
+    fallas = []
+    mora = rng.uniform(0, 0.03, len(lote.casos))
+    forma = (len(lote.casos), int(lote.num_pagos.max()) + 12)
+    cuotas = np.pad(MotorAmortizacion(lote.monto, lote.tasa, lote.num_pagos).columnas()['Cuota'],
+                    ((0, 0), (0, 12)))
+    patrones = {
+        'booleano': rng.random(forma) < 0.8,
+        'montos': np.round(rng.uniform(0, 1.5, forma) * cuotas, 2),
+    }
+    for patron, pagos in patrones.items():
+        columnas = simular_mora(lote.monto, lote.tasa, lote.num_pagos, pagos, mora)
+        aplicados = np.where(pagos, cuotas, 0.0) if pagos.dtype == bool else pagos
+        for caso in range(len(lote.casos)):
+            esperado = np.round(np.array(referencia_mora_escalar(cuotas[caso], aplicados[caso], mora[caso])) * 100)
+            for posicion, nombre in enumerate(('Interés_Mora', 'Saldo_Vencido')):
+                # La mora capitalizada a lo largo de 600 períodos pasa del rango
+                # de int64 en centavos y de la resolución del centavo en un
+                # double: centavos en punto flotante y tolerancia también relativa
+                diferencia = np.abs(np.round(columnas[nombre][caso] * 100) - esperado[:, posicion])
+                tolerancia = np.maximum(TOLERANCIA_CENTAVOS, 1e-13 * esperado[:, posicion])
+                if (diferencia > tolerancia).any():
+                    fallas.append((caso, f"mora {patron} {nombre}: {diferencia.max()} centavos"))
+    return fallas
+
+
+# --- Ejecución -------------------------------------------------------------
+
+
+def medir(funcion, lote, repeticiones):
+    """
+    Mejor tiempo de `repeticiones` ejecuciones y el resultado de la última
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(lote)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def verificar(casos=300, semilla=0, repeticiones=3, max_pagos=PLAZO_MAXIMO, mostrar=print):
+    """
+    Ejecuta todas las propiedades y retorna {comprobación: lista de fallas}
+    """
+    rng = np.random.default_rng(semilla)
+    lote = Lote(generar_casos(rng, casos, max_pagos))
+    fallas = {'tasas': verificar_tasas(lote)}
+
+    tiempo, (referencia, _) = medir(variante_referencia, lote, 1)
+    periodos_totales = int(referencia[1].sum())
+    mostrar(f"{'Variante':<20}{'Casos':>8}{'Tiempo (ms)':>14}{'Créditos/s':>14}{'Períodos/s':>14}")
+    mostrar(f"{'referencia':<20}{casos:>8}{tiempo * 1000:>14,.1f}"
+            f"{casos / tiempo:>14,.0f}{periodos_totales / tiempo:>14,.0f}")
+    fallas['referencia: invariantes'] = invariantes(*referencia, np.arange(casos))
+
+    for nombre, variante in variantes_disponibles().items():
+        if nombre == 'kernel_numba':
+            variante(Lote(lote.casos[:1]))  # compilación fuera de la medición
+        tiempo, (resultado, mascara) = medir(variante, lote, repeticiones)
+        cubiertos = int(mascara.sum())
+        periodos = int(resultado[1].sum())
+        mostrar(f"{nombre:<20}{cubiertos:>8}{tiempo * 1000:>14,.1f}"
+                f"{cubiertos / tiempo:>14,.0f}{periodos / tiempo:>14,.0f}")
+        fallas[nombre] = diferencias(referencia, resultado, mascara, lote.comparables)
+        fallas[f"{nombre}: invariantes"] = invariantes(*resultado, np.flatnonzero(mascara))
+
+    fallas['sistemas'], fallas['sistemas: modo exacto'] = verificar_sistemas(
+        generar_creditos(rng, casos, max_pagos))
+    fallas['portafolio'] = verificar_portafolio(lote.casos)
+    fallas['mora'] = verificar_mora(lote, rng)
+    return fallas
+
+
+def main():
+    """
+    Ejecuta la verificación desde la línea de comandos; el código de salida
+    es 1 si alguna propiedad falla
+    """
+    parser = argparse.ArgumentParser(description="Equivalencia e invariantes de las variantes del motor")
+    parser.add_argument("--casos", type=int, default=300, help="Créditos aleatorios a generar")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del generador")
+    parser.add_argument("--repeticiones", type=int, default=3,
+                        help="Ejecuciones por variante para medir el rendimiento")
+    parser.add_argument("--max-pagos", type=int, default=PLAZO_MAXIMO, help="Plazo máximo de los casos")
+    args = parser.parse_args()
+
+    print(f"\nVerificación: {args.casos} casos, semilla {args.semilla}"
+          f"{'' if NUMBA_DISPONIBLE else ' (sin Numba)'}")
+    print("=" * 70)
+    fallas = verificar(args.casos, args.semilla, args.repeticiones, args.max_pagos)
+    print("-" * 70)
+
+    total = 0
+    for comprobacion, lista in fallas.items():
+        total += len(lista)
+        print(f"{comprobacion:<40}{'OK' if not lista else f'{len(lista)} fallas':>30}")
+        for caso, motivo in lista[:5]:
+            print(f"    caso {caso}: {motivo}")
+    return 1 if total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())